@@ -1,34 +1,79 @@
-from fastapi import FastAPI, HTTPException, Depends, Request # type: ignore
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, Request # type: ignore
 from fastapi.middleware.cors import CORSMiddleware # type: ignore
 from fastapi.responses import JSONResponse # type: ignore
+from starlette.routing import Match # type: ignore
+from api.core.serialization import FastJSONResponse
+from api.core.rate_limiter import RateLimiter
+from api.core.metrics import RequestMetrics
+from utils.logging import get_logger
 from typing import Dict, List, Optional
 import uvicorn # type: ignore
 import logging
 import json
+import math
 import time
 from datetime import datetime
 
 class APIManager:
-    def __init__(self):
+    def __init__(self, rate_limits: Optional[Dict[str, Dict]] = None):
+        self._rate_limits = rate_limits
+        # 通过 include_router/add_route 注册的路由，重建应用时重新挂载
+        self._routers: List[APIRouter] = []
+        self._custom_routes: List[tuple] = []
+        self.request_metrics = RequestMetrics()
+        self.logger = self._setup_logger()
+        self.build_app()
+
+    def build_app(self) -> FastAPI:
+        """
+        (重新)构建应用：重新加载配置和限流规则，挂载中间件、内置路由和已注册的路由
+
+        预派生模式下 SIGHUP 重载时调用，新工作进程使用新构建的应用。
+        """
+        self.config = self._load_config()
+        self.rate_limiter = RateLimiter(
+            self._rate_limits if self._rate_limits is not None
+            else self.config.get('rate_limits', {})
+        )
         self.app = FastAPI(
             title="AVESG API",
             description="Advanced Voice Enabled System Gateway API",
-            version="1.0.0"
+            version="1.0.0",
+            default_response_class=FastJSONResponse
         )
         self.setup_middleware()
         self.setup_routes()
-        self.logger = self._setup_logger()
+        for router in self._routers:
+            self.app.include_router(router)
+        for path, endpoint, method in self._custom_routes:
+            self.app.add_api_route(path, endpoint, methods=[method])
+        return self.app
         
     def _setup_logger(self) -> logging.Logger:
-        logger = logging.getLogger('api_manager')
-        logger.setLevel(logging.DEBUG)
-        handler = logging.FileHandler('logs/api.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('api_manager', 'api.log')
+
+    def _load_config(self) -> Dict:
+        """加载API配置"""
+        try:
+            with open('config/system_config.json', 'r', encoding='utf-8') as f:
+                return json.load(f).get('api', {})
+        except Exception:
+            return {}
+
+    def _route_template(self, request: Request) -> Optional[str]:
+        """请求对应的路由模板(中间件在路由匹配之前执行，scope 中还没有 route)"""
+        for route in request.app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return getattr(route, 'path', None)
+        return None
+
+    def _client_key(self, request: Request) -> str:
+        """限流客户端标识：优先 user_id，其次客户端IP"""
+        user_id = request.headers.get('x-user-id') or request.query_params.get('user_id')
+        if user_id:
+            return f"user:{user_id}"
+        return f"ip:{request.client.host if request.client else 'unknown'}"
         
     def setup_middleware(self):
         """设置中间件"""
@@ -40,16 +85,51 @@ class APIManager:
             allow_headers=["*"],
         )
         
+        @self.app.middleware("http")
+        async def rate_limit(request: Request, call_next):
+            """按路由的客户端限流和并发配额中间件(限流规则按路由模板匹配，如 /items/{id})"""
+            path = self._route_template(request) or request.url.path
+            if self.rate_limiter.get_limit(path) is None:
+                return await call_next(request)
+            request.state.rate_limit_key = path
+
+            client = self._client_key(request)
+            allowed, retry_after = self.rate_limiter.acquire(path, client)
+            if not allowed:
+                return FastJSONResponse(
+                    status_code=429,
+                    content={
+                        "status": "error",
+                        "message": "Too many requests",
+                        "timestamp": datetime.now().isoformat()
+                    },
+                    headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+                )
+            try:
+                return await call_next(request)
+            finally:
+                self.rate_limiter.release(path, client)
+
+        # 后注册的中间件位于外层，被限流的请求同样计入延迟统计
         @self.app.middleware("http")
         async def log_requests(request: Request, call_next):
-            """请求日志中间件"""
-            start_time = time.time()
+            """请求计时中间件"""
+            start_time = time.perf_counter_ns()
             response = await call_next(request)
-            duration = time.time() - start_time
-            
+            duration_ns = time.perf_counter_ns() - start_time
+
+            # 使用路由模板而不是实际路径，避免路径参数导致指标基数膨胀；
+            # 被限流拒绝的请求没有进入路由，按限流时匹配的路由模板记录
+            route = request.scope.get('route')
+            route_path = (getattr(route, 'path', None)
+                          or getattr(request.state, 'rate_limit_key', None)
+                          or '<unmatched>')
+            self.request_metrics.record(
+                request.method, route_path, response.status_code, duration_ns
+            )
             self.logger.info(
-                f"Method: {request.method} Path: {request.url.path} "
-                f"Duration: {duration:.2f}s Status: {response.status_code}"
+                "Method: %s Path: %s Duration: %.2fms Status: %s",
+                request.method, request.url.path, duration_ns / 1e6, response.status_code
             )
             return response
             
@@ -65,16 +145,56 @@ class APIManager:
                 "status": "healthy",
                 "timestamp": datetime.now().isoformat()
             }
+
+        @self.app.get("/metrics")
+        async def metrics():
+            return {
+                "latency": self.request_metrics.snapshot(),
+                "rate_limits": self.rate_limiter.get_metrics(),
+                "timestamp": datetime.now().isoformat()
+            }
+
+        @self.app.get("/metrics/latency")
+        async def latency_metrics():
+            return {
+                "latency": self.request_metrics.snapshot(),
+                "timestamp": datetime.now().isoformat()
+            }
             
+    def include_router(self, router: APIRouter):
+        """挂载路由模块(重建应用时自动重新挂载)"""
+        self._routers.append(router)
+        self.app.include_router(router)
+
     def add_route(self, path: str, endpoint, methods: List[str]):
         """添加自定义路由"""
         for method in methods:
+            self._custom_routes.append((path, endpoint, method))
             self.app.add_api_route(
                 path,
                 endpoint,
                 methods=[method]
             )
             
-    def run(self, host: str = "0.0.0.0", port: int = 8000):
-        """运行API服务器"""
-        uvicorn.run(self.app, host=host, port=port) 
\ No newline at end of file
+    def run(self, host: str = "0.0.0.0", port: int = 8000, workers: Optional[int] = None):
+        """
+        运行API服务器
+
+        Args:
+            workers: 工作进程数，默认读取配置 api.workers；大于 1 时使用预派生多进程模式，
+                     已加载的模型在工作进程间写时复制共享
+        """
+        workers = workers or int(self.config.get('workers', 1))
+        if workers > 1:
+            from api.core.worker_pool import PreforkServer
+            built = [False]
+
+            def app_factory() -> FastAPI:
+                # 首次启动沿用已构建的应用，之后每次 SIGHUP 重新构建
+                if built[0]:
+                    return self.build_app()
+                built[0] = True
+                return self.app
+            PreforkServer(app_factory, host=host, port=port, workers=workers).run()
+        else:
+            uvicorn.run(self.app, host=host, port=port) 
\ No newline at end of file
@@ -0,0 +1,104 @@
+from typing import Dict, List, Tuple
+import threading
+import time
+
+class LatencyHistogram:
+    """
+    HDR 风格的对数-线性直方图
+
+    每个 2 的幂区间再均分为 2**sub_bucket_bits 个子桶，相对误差不超过 1/2**sub_bucket_bits。
+    记录为 O(1)，内存占用只与数值的量级有关，与样本数无关。
+    """
+    def __init__(self, sub_bucket_bits: int = 7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self.sub_bucket_count = 1 << sub_bucket_bits
+        self.counts: List[int] = [0] * (2 * self.sub_bucket_count)
+        self.total = 0
+        self.sum = 0
+        self.min = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        if value < 2 * self.sub_bucket_count:
+            return value
+        exponent = value.bit_length() - self.sub_bucket_bits - 1
+        return exponent * self.sub_bucket_count + (value >> exponent)
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < 2 * self.sub_bucket_count:
+            return index
+        exponent = index // self.sub_bucket_count - 1
+        top = index % self.sub_bucket_count + self.sub_bucket_count
+        return ((top + 1) << exponent) - 1
+
+    def record(self, value: int):
+        """记录一个非负整数值"""
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        if self.total == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.total += 1
+        self.sum += value
+
+    def value_at_percentiles(self, percentiles: Tuple[float, ...]) -> List[int]:
+        """一次遍历计算多个分位数(percentiles 需升序)"""
+        results = []
+        if self.total == 0:
+            return [0] * len(percentiles)
+        targets = [max(1, int(p / 100.0 * self.total + 0.5)) for p in percentiles]
+        cumulative = 0
+        target_index = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            cumulative += count
+            while target_index < len(targets) and cumulative >= targets[target_index]:
+                results.append(min(self._highest_equivalent(index), self.max))
+                target_index += 1
+            if target_index == len(targets):
+                break
+        return results
+
+class RequestMetrics:
+    """按路由和状态码聚合的请求延迟直方图"""
+    PERCENTILES = (50.0, 90.0, 99.0)
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str, int], LatencyHistogram] = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status_code: int, duration_ns: int):
+        key = (method, route, status_code)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        histogram.record(duration_ns)
+
+    def snapshot(self) -> Dict:
+        """获取各路由的分位数延迟(毫秒)和吞吐量"""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        routes: Dict[str, Dict] = {}
+        for (method, route, status_code), histogram in list(self.histograms.items()):
+            p50, p90, p99 = histogram.value_at_percentiles(self.PERCENTILES)
+            routes.setdefault(f"{method} {route}", {})[str(status_code)] = {
+                'count': histogram.total,
+                'throughput_rps': histogram.total / elapsed,
+                'mean_ms': histogram.sum / histogram.total / 1e6,
+                'p50_ms': p50 / 1e6,
+                'p90_ms': p90 / 1e6,
+                'p99_ms': p99 / 1e6,
+                'max_ms': histogram.max / 1e6
+            }
+        total = sum(h.total for h in self.histograms.values())
+        return {
+            'uptime_seconds': elapsed,
+            'total_requests': total,
+            'throughput_rps': total / elapsed,
+            'routes': routes
+        }
@@ -0,0 +1,147 @@
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import math
+import time
+
+@dataclass
+class RouteLimit:
+    rate: float = 0.0           # 每秒补充的令牌数，0 表示不限速
+    burst: int = 1              # 令牌桶容量
+    max_concurrency: int = 0    # 单客户端最大并发请求数，0 表示不限制
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'RouteLimit':
+        rate = float(config.get('rate', 0.0))
+        return cls(
+            rate=rate,
+            burst=int(config.get('burst', max(1, math.ceil(rate)))),
+            max_concurrency=int(config.get('max_concurrency', 0))
+        )
+
+class TokenBucket:
+    """令牌桶，按需惰性补充令牌"""
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def try_acquire(self, now: float) -> float:
+        """
+        尝试获取一个令牌
+
+        Returns:
+            float: 0 表示获取成功，否则为需要等待的秒数
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+class _ClientState:
+    __slots__ = ('bucket', 'in_flight')
+
+    def __init__(self, limit: RouteLimit):
+        self.bucket = TokenBucket(limit.rate, limit.burst) if limit.rate > 0 else None
+        self.in_flight = 0
+
+class RateLimiter:
+    """
+    按路由配置的客户端限流器
+
+    每个 (路由, 客户端) 拥有独立的令牌桶和并发计数，查找与更新均为 O(1)。
+    路由以模板为键(如 /items/{id})，由调用方把请求解析为路由模板后传入；
+    WebSocket 路由不经过 HTTP 中间件，由处理函数按连接调用 acquire/release。
+    客户端状态按 LRU 淘汰，内存占用受 max_clients 约束。
+    """
+    def __init__(self, route_limits: Optional[Dict[str, Dict]] = None,
+                 max_clients: int = 100000):
+        route_limits = route_limits or {}
+        self.default_limit = (RouteLimit.from_config(route_limits['*'])
+                              if '*' in route_limits else None)
+        self.route_limits: Dict[str, RouteLimit] = {
+            path: RouteLimit.from_config(config)
+            for path, config in route_limits.items() if path != '*'
+        }
+        self.max_clients = max_clients
+        self._clients: 'OrderedDict[Tuple[str, str], _ClientState]' = OrderedDict()
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def get_limit(self, path: str) -> Optional[RouteLimit]:
+        return self.route_limits.get(path, self.default_limit)
+
+    def _count(self, path: str, key: str):
+        counters = self.counters.get(path)
+        if counters is None:
+            counters = self.counters[path] = {
+                'allowed': 0, 'rate_limited': 0, 'concurrency_limited': 0
+            }
+        counters[key] += 1
+
+    def _state(self, path: str, client: str, limit: RouteLimit) -> _ClientState:
+        key = (path, client)
+        state = self._clients.get(key)
+        if state is None:
+            state = self._clients[key] = _ClientState(limit)
+            if len(self._clients) > self.max_clients:
+                self._evict(keep=key)
+        else:
+            self._clients.move_to_end(key)
+        return state
+
+    def _evict(self, keep: Tuple[str, str]):
+        """从最久未使用的开始淘汰没有进行中请求的客户端，直到不超过 max_clients"""
+        excess = len(self._clients) - self.max_clients
+        victims = []
+        for key, state in self._clients.items():
+            if len(victims) >= excess:
+                break
+            if state.in_flight == 0 and key != keep:
+                victims.append(key)
+        for key in victims:
+            del self._clients[key]
+
+    def acquire(self, path: str, client: str) -> Tuple[bool, float]:
+        """
+        请求开始时调用
+
+        Returns:
+            Tuple[bool, float]: (是否放行, 建议的重试等待秒数)
+        """
+        limit = self.get_limit(path)
+        if limit is None:
+            return True, 0.0
+
+        state = self._state(path, client, limit)
+        if limit.max_concurrency and state.in_flight >= limit.max_concurrency:
+            self._count(path, 'concurrency_limited')
+            return False, 1.0
+
+        if state.bucket is not None:
+            wait = state.bucket.try_acquire(time.monotonic())
+            if wait > 0:
+                self._count(path, 'rate_limited')
+                return False, wait
+
+        state.in_flight += 1
+        self._count(path, 'allowed')
+        return True, 0.0
+
+    def release(self, path: str, client: str):
+        """请求结束时调用(仅对 acquire 放行的请求)"""
+        state = self._clients.get((path, client))
+        if state is not None and state.in_flight > 0:
+            state.in_flight -= 1
+
+    def get_metrics(self) -> Dict:
+        """获取限流计数"""
+        return {
+            'routes': {path: dict(counters) for path, counters in self.counters.items()},
+            'tracked_clients': len(self._clients),
+            'in_flight': sum(state.in_flight for state in self._clients.values())
+        }
@@ -0,0 +1,86 @@
+from fastapi.responses import JSONResponse # type: ignore
+from typing import Any
+from dataclasses import is_dataclass, fields
+from datetime import datetime, date
+from enum import Enum
+import numpy as np # type: ignore
+import math
+import json
+
+try:
+    import orjson # type: ignore
+except ImportError:  # 可选依赖，未安装时回退到标准库 json
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+def json_default(obj: Any) -> Any:
+    """标准 JSON 编码器无法处理的类型转换"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8', errors='replace')
+    # 兼容 scipy 稀疏矩阵等带 toarray 的对象
+    if hasattr(obj, 'toarray'):
+        return obj.toarray().tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        """序列化为 UTF-8 JSON 字节串"""
+        return orjson.dumps(obj, default=json_default, option=_ORJSON_OPTIONS)
+else:
+    class _NullNonFiniteEncoder(json.JSONEncoder):
+        """NaN/Infinity 编码为 null(与 orjson 一致)，只能使用纯 Python 编码路径"""
+        def iterencode(self, o, _one_shot=False):
+            def floatstr(value, _repr=float.__repr__):
+                return _repr(value) if math.isfinite(value) else 'null'
+            return json.encoder._make_iterencode(
+                {} if self.check_circular else None, self.default,
+                json.encoder.encode_basestring, self.indent, floatstr,
+                self.key_separator, self.item_separator, self.sort_keys,
+                self.skipkeys, _one_shot
+            )(o, 0)
+
+    _json_encoder = json.JSONEncoder(
+        default=json_default,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        allow_nan=False
+    )
+    _null_non_finite_encoder = _NullNonFiniteEncoder(
+        default=json_default,
+        ensure_ascii=False,
+        separators=(',', ':')
+    )
+
+    def dumps(obj: Any) -> bytes:
+        """序列化为 UTF-8 JSON 字节串"""
+        try:
+            return _json_encoder.encode(obj).encode('utf-8')
+        except ValueError:
+            # 含 NaN/Infinity(C 编码器拒绝)：改用慢速路径把非有限浮点数编码为 null
+            return _null_non_finite_encoder.encode(obj).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """
+    支持 NumPy 数组、dataclass 和枚举的 JSON 响应
+
+    安装 orjson 时使用 orjson 编码，否则回退到紧凑格式的标准库编码器。
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
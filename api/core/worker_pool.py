@@ -0,0 +1,276 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from datetime import datetime
+import multiprocessing
+import logging
+import signal
+import socket
+import time
+import gc
+import os
+import uvicorn # type: ignore
+from utils.logging import set_process_log_suffix
+
+# 心跳表每个槽位的字段
+_PID, _STARTED, _HEARTBEAT, _RSS, _FIELDS = 0, 1, 2, 3, 4
+
+class PreforkServer:
+    """
+    预派生(pre-fork)多进程 API 服务
+
+    主进程先调用 app_factory 构建应用(加载全部模型)，再 fork 出 N 个 uvicorn 工作进程，
+    模型内存通过写时复制在各进程间共享。主进程负责:
+        - 重启意外退出或心跳超时的工作进程
+        - SIGHUP 平滑重载: 重新构建应用后逐个替换工作进程，新进程就绪后再停止旧进程
+        - SIGTERM/SIGINT 优雅关闭
+    每个工作进程的 PID、心跳和 RSS 写入共享内存，可通过 /health/workers 查询。
+    心跳由 uvicorn 主循环在启动完成(lifespan startup 结束、开始接受连接)后发出，
+    首次心跳即表示就绪；事件循环被阻塞时心跳随之停止。
+    仅支持提供 os.fork 的平台。
+    """
+    def __init__(
+        self,
+        app_factory: Callable[[], Any],
+        host: str = "0.0.0.0",
+        port: int = 8000,
+        workers: int = 2,
+        heartbeat_interval: float = 1.0,
+        heartbeat_timeout: float = 30.0,
+        graceful_timeout: float = 30.0,
+        log_level: str = "info"
+    ):
+        if not hasattr(os, 'fork'):
+            raise RuntimeError("PreforkServer requires os.fork")
+        self.app_factory = app_factory
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.graceful_timeout = graceful_timeout
+        self.log_level = log_level
+        self.logger = logging.getLogger('prefork_server')
+
+        # 平滑重载期间新旧进程同时存在，槽位数为工作进程数的两倍
+        self.slots = workers * 2
+        self.health_table = multiprocessing.Array('d', self.slots * _FIELDS, lock=False)
+        self.app = None
+        self.socket: Optional[socket.socket] = None
+        self.children: Dict[int, int] = {}  # pid -> slot
+        self._should_exit = False
+        self._should_reload = False
+
+    # ---------- 主进程 ----------
+
+    def _build_app(self):
+        """在主进程中构建应用并冻结当前对象，减少 fork 后的写时复制"""
+        app = self.app_factory()
+        self._install_health_route(app)
+        gc.collect()
+        gc.freeze()
+        return app
+
+    def _install_health_route(self, app):
+        paths = {getattr(route, 'path', None) for route in app.router.routes}
+        if '/health/workers' in paths:
+            return
+
+        @app.get("/health/workers")
+        async def worker_health():
+            return {
+                "pid": os.getpid(),
+                "workers": self.get_worker_health(),
+                "timestamp": datetime.now().isoformat()
+            }
+
+    def _bind_socket(self) -> socket.socket:
+        family = socket.AF_INET6 if ':' in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _free_slot(self) -> int:
+        used = set(self.children.values())
+        for slot in range(self.slots):
+            if slot not in used:
+                return slot
+        raise RuntimeError("No free worker slot")
+
+    def _spawn_worker(self) -> int:
+        slot = self._free_slot()
+        base = slot * _FIELDS
+        for field in range(_FIELDS):
+            self.health_table[base + field] = 0.0
+
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker(slot)
+            except BaseException:
+                self.logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+
+        self.health_table[base + _PID] = pid
+        self.health_table[base + _STARTED] = time.time()
+        self.children[pid] = slot
+        self.logger.info(f"Spawned worker pid={pid} slot={slot}")
+        return pid
+
+    def _is_ready(self, pid: int) -> bool:
+        slot = self.children.get(pid)
+        return slot is not None and self.health_table[slot * _FIELDS + _HEARTBEAT] > 0
+
+    def _stop_worker(self, pid: int, sig: int = signal.SIGTERM):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self) -> List[int]:
+        """回收已退出的工作进程"""
+        exited = []
+        while self.children:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            slot = self.children.pop(pid, None)
+            if slot is not None:
+                self.health_table[slot * _FIELDS + _PID] = 0.0
+                exited.append(pid)
+        return exited
+
+    def _check_heartbeats(self):
+        """终止心跳超时的工作进程，由主循环重新拉起"""
+        now = time.time()
+        for pid, slot in list(self.children.items()):
+            heartbeat = self.health_table[slot * _FIELDS + _HEARTBEAT]
+            started = self.health_table[slot * _FIELDS + _STARTED]
+            last_seen = heartbeat or started
+            if now - last_seen > self.heartbeat_timeout:
+                self.logger.warning(f"Worker pid={pid} missed heartbeat, killing")
+                self._stop_worker(pid, signal.SIGKILL)
+
+    def _reload(self):
+        """平滑重载：重新构建应用，逐个用新进程替换旧进程"""
+        self.logger.info("Reloading workers")
+        gc.unfreeze()
+        self.app = self._build_app()
+        for old_pid in list(self.children):
+            new_pid = self._spawn_worker()
+            deadline = time.monotonic() + self.heartbeat_timeout
+            while not self._is_ready(new_pid) and time.monotonic() < deadline:
+                time.sleep(0.05)
+                self._reap()
+                if new_pid not in self.children:
+                    break
+            self._stop_worker(old_pid)
+
+    def _handle_signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self._should_reload = True
+        else:
+            self._should_exit = True
+
+    def _shutdown(self):
+        for pid in list(self.children):
+            self._stop_worker(pid)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.05)
+        for pid in list(self.children):
+            self._stop_worker(pid, signal.SIGKILL)
+        self._reap()
+        if self.socket:
+            self.socket.close()
+
+    def run(self):
+        """启动主进程循环(阻塞)"""
+        self.app = self._build_app()
+        self.socket = self._bind_socket()
+
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+        signal.signal(signal.SIGHUP, self._handle_signal)
+
+        for _ in range(self.workers):
+            self._spawn_worker()
+        self.logger.info(
+            f"Prefork server listening on {self.host}:{self.port} with {self.workers} workers"
+        )
+
+        try:
+            while not self._should_exit:
+                if self._should_reload:
+                    self._should_reload = False
+                    self._reload()
+                self._reap()
+                self._check_heartbeats()
+                while len(self.children) < self.workers and not self._should_exit:
+                    self._spawn_worker()
+                time.sleep(0.2)
+        finally:
+            self._shutdown()
+
+    # ---------- 工作进程 ----------
+
+    def _run_worker(self, slot: int):
+        # 按槽位写各自的日志文件，避免多个进程各自轮转同一个文件
+        set_process_log_suffix(f"worker{slot}")
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+        # callback_notify 在 uvicorn 事件循环中调用(约每秒检查一次)，启动完成前不会调用
+        config = uvicorn.Config(
+            self.app,
+            log_level=self.log_level,
+            callback_notify=self._heartbeat_callback(slot),
+            timeout_notify=self.heartbeat_interval
+        )
+        uvicorn.Server(config).run(sockets=[self.socket])
+
+    def _heartbeat_callback(self, slot: int) -> Callable[[], Awaitable[None]]:
+        try:
+            import psutil # type: ignore
+            process = psutil.Process()
+        except ImportError:
+            process = None
+        base = slot * _FIELDS
+
+        async def heartbeat():
+            if process is not None:
+                self.health_table[base + _RSS] = process.memory_info().rss
+            self.health_table[base + _HEARTBEAT] = time.time()
+        return heartbeat
+
+    # ---------- 健康状态 ----------
+
+    def get_worker_health(self) -> List[Dict]:
+        """读取共享心跳表(任意进程均可调用)"""
+        now = time.time()
+        workers = []
+        for slot in range(self.slots):
+            base = slot * _FIELDS
+            pid = int(self.health_table[base + _PID])
+            if not pid:
+                continue
+            heartbeat = self.health_table[base + _HEARTBEAT]
+            age = now - heartbeat if heartbeat else None
+            workers.append({
+                'slot': slot,
+                'pid': pid,
+                'uptime_seconds': now - self.health_table[base + _STARTED],
+                'heartbeat_age_seconds': age,
+                'rss_mb': self.health_table[base + _RSS] / (1024 * 1024),
+                'healthy': age is not None and age < self.heartbeat_timeout
+            })
+        return workers
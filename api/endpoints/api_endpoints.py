@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, Request, Depends # type: ignore
-from fastapi.responses import JSONResponse # type: ignore
+from api.core.serialization import FastJSONResponse
 from pydantic import BaseModel # type: ignore
 from typing import Dict, List, Optional, Any
 import time
@@ -90,7 +90,7 @@ class APIEndpoints:
                     context=request.context,
                     user_id=request.user_id
                 )
-                return JSONResponse(
+                return FastJSONResponse(
                     status_code=200,
                     content={
                         "status": "success",
@@ -111,7 +111,7 @@ class APIEndpoints:
                     sample_rate=request.sample_rate,
                     user_id=request.user_id
                 )
-                return JSONResponse(
+                return FastJSONResponse(
                     status_code=200,
                     content={
                         "status": "success",
@@ -130,7 +130,7 @@ class APIEndpoints:
                     query=request.query,
                     user_id=request.user_id
                 )
-                return JSONResponse(
+                return FastJSONResponse(
                     status_code=200,
                     content={
                         "status": "success",
@@ -146,7 +146,7 @@ class APIEndpoints:
         async def get_learning_status():
             try:
                 result = self.system_manager.get_learning_status()
-                return JSONResponse(
+                return FastJSONResponse(
                     status_code=200,
                     content={
                         "status": "success",
@@ -192,7 +192,7 @@ class APIEndpoints:
                     async with session.get(url, headers=headers, params=params) as response:
                         if response.status == 200:
                             result = await response.json()
-                            return JSONResponse(
+                            return FastJSONResponse(
                                 status_code=200,
                                 content={
                                     "status": "success",
@@ -230,7 +230,7 @@ class APIEndpoints:
                     async with session.get(url, headers=headers, params=params) as response:
                         if response.status == 200:
                             result = await response.json()
-                            return JSONResponse(
+                            return FastJSONResponse(
                                 status_code=200,
                                 content={
                                     "status": "success",
@@ -273,7 +273,7 @@ class APIEndpoints:
                     async with session.get(url, headers=headers, params=params) as response:
                         if response.status == 200:
                             result = await response.json()
-                            return JSONResponse(
+                            return FastJSONResponse(
                                 status_code=200,
                                 content={
                                     "status": "success",
@@ -317,7 +317,7 @@ class APIEndpoints:
                     async with session.get(url, headers=headers, params=params) as response:
                         if response.status == 200:
                             result = await response.json()
-                            return JSONResponse(
+                            return FastJSONResponse(
                                 status_code=200,
                                 content={
                                     "status": "success",
@@ -1,93 +1,224 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Sequence
 import aiohttp # type: ignore
 import asyncio
 import json
 import logging
+import random
+from utils.logging import get_logger
 from datetime import datetime
 
 class RequestHandler:
-    def __init__(self):
-        self.logger = logging.getLogger('request_handler')
-        self.setup_logging()
-        self.session = None
+    # 默认允许重试的幂等方法
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+    # 可重试的响应状态码
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
 
-    def setup_logging(self):
-        handler = logging.FileHandler('logs/requests.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(logging.INFO)
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        max_concurrency: int = 64,
+        max_connections: int = 100,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.1,
+        backoff_max: float = 5.0
+    ):
+        self.logger = get_logger('request_handler', 'requests.log', level=logging.INFO)
+        self.base_url = base_url.rstrip('/')
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.session = None
+        self.semaphore = None
 
     async def initialize(self):
-        """初始化异步会话"""
+        """初始化异步会话(复用连接池)"""
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                }
+            )
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
 
     async def close(self):
         """关闭会话"""
         if self.session:
             await self.session.close()
             self.session = None
+            self.semaphore = None
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """指数退避(全抖动)，服务端给出 Retry-After 时优先使用"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _read_body(self, response) -> Any:
+        """按内容类型解析响应体，错误响应同样返回"""
+        if response.content_type == 'application/json':
+            try:
+                return await response.json()
+            except (aiohttp.ContentTypeError, json.JSONDecodeError):
+                pass
+        return await response.text()
 
     async def send_request(
-        self, 
-        method: str, 
-        url: str, 
-        data: Optional[Dict] = None, 
-        headers: Optional[Dict] = None
+        self,
+        method: str,
+        url: str,
+        data: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        idempotent: Optional[bool] = None
     ) -> Dict:
-        """发送请求"""
-        try:
-            await self.initialize()
-            
-            default_headers = {
-                'Content-Type': 'application/json',
-                'Accept': 'application/json'
-            }
-            
-            headers = headers or default_headers
-            
-            async with self.session.request(
-                method=method,
-                url=url,
-                json=data,
-                headers=headers
-            ) as response:
-                response_data = await response.json()
-                
+        """
+        发送请求
+
+        Args:
+            timeout: 本次调用的总期限(秒，包含所有重试)，默认使用 self.timeout
+            idempotent: 是否允许重试，默认按 HTTP 方法判断
+        """
+        await self.initialize()
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in self.IDEMPOTENT_METHODS
+        max_attempts = self.max_retries + 1 if idempotent else 1
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout if timeout is not None else self.timeout)
+        attempt = 0
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                self.logger.error(f"Request deadline exceeded: {method} {url}")
+                raise asyncio.TimeoutError(f"Deadline exceeded for {method} {url}")
+
+            # 排队等待并发配额的时间同样计入期限
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), remaining)
+            except asyncio.TimeoutError:
+                self.logger.error(f"Request deadline exceeded while queued: {method} {url}")
+                raise asyncio.TimeoutError(f"Deadline exceeded for {method} {url}") from None
+
+            retry_after = None
+            try:
+                try:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError(f"Deadline exceeded for {method} {url}")
+                    async with self.session.request(
+                        method=method,
+                        url=url,
+                        json=data,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=remaining)
+                    ) as response:
+                        response_data = await self._read_body(response)
+                        status = response.status
+                        retry_after = response.headers.get('Retry-After')
+                finally:
+                    self.semaphore.release()
+
                 self.logger.info(
-                    f"Request: {method} {url} - Status: {response.status}"
+                    f"Request: {method} {url} - Status: {status} - Attempt: {attempt + 1}"
                 )
-                
-                return {
-                    'status_code': response.status,
-                    'data': response_data,
-                    'timestamp': datetime.now().isoformat()
-                }
-                
-        except Exception as e:
-            self.logger.error(f"Request failed: {str(e)}")
-            raise
+                if status not in self.RETRY_STATUSES or attempt + 1 >= max_attempts:
+                    return {
+                        'status_code': status,
+                        'data': response_data,
+                        'attempts': attempt + 1,
+                        'timestamp': datetime.now().isoformat()
+                    }
 
-    async def process_text(self, text: str, context: Optional[Dict] = None) -> Dict:
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt + 1 >= max_attempts or loop.time() >= deadline:
+                    self.logger.error(f"Request failed: {method} {url} - {str(e)}")
+                    raise
+                self.logger.warning(f"Request attempt {attempt + 1} failed: {str(e)}")
+            except Exception as e:
+                self.logger.error(f"Request failed: {str(e)}")
+                raise
+
+            delay = self._backoff(attempt, retry_after)
+            if loop.time() + delay >= deadline:
+                self.logger.error(f"Request deadline exceeded: {method} {url}")
+                raise asyncio.TimeoutError(f"Deadline exceeded for {method} {url}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def process_text(
+        self,
+        text: str,
+        context: Optional[Dict] = None,
+        timeout: Optional[float] = None
+    ) -> Dict:
         """处理文本请求"""
-        url = "http://localhost:8000/api/v1/text/process"
+        url = f"{self.base_url}/api/v1/text/process"
         data = {
             "text": text,
             "context": context
         }
-        return await self.send_request("POST", url, data)
+        return await self.send_request("POST", url, data, timeout=timeout)
+
+    async def gather_many(
+        self,
+        texts: Sequence[str],
+        contexts: Optional[Sequence[Optional[Dict]]] = None,
+        timeout: Optional[float] = None,
+        return_exceptions: bool = True
+    ) -> List[Any]:
+        """
+        并发处理多条文本，结果顺序与输入一致
+
+        实际并发数受 max_concurrency 限制；return_exceptions 为 True 时，
+        失败的请求在对应位置返回异常对象而不会中断其他请求。
+
+        Raises:
+            ValueError: contexts 与 texts 长度不一致
+        """
+        if contexts is None:
+            contexts = [None] * len(texts)
+        elif len(contexts) != len(texts):
+            raise ValueError(
+                f"contexts 长度({len(contexts)})与 texts 长度({len(texts)})不一致"
+            )
+        await self.initialize()
+        return await asyncio.gather(
+            *(self.process_text(text, context, timeout=timeout)
+              for text, context in zip(texts, contexts)),
+            return_exceptions=return_exceptions
+        )
 
     async def process_voice(
-        self, 
-        audio_data: bytes, 
-        format: str = "wav", 
+        self,
+        audio_data: bytes,
+        format: str = "wav",
         sample_rate: int = 16000
     ) -> Dict:
         """处理语音请求"""
-        url = "http://localhost:8000/api/v1/voice/process"
+        url = f"{self.base_url}/api/v1/voice/process"
         data = {
             "audio_data": audio_data,
             "format": format,
@@ -97,10 +228,10 @@ class RequestHandler:
 
     async def query_memory(self, query: Dict) -> Dict:
         """查询记忆"""
-        url = "http://localhost:8000/api/v1/memory/query"
-        return await self.send_request("POST", url, {"query": query})
+        url = f"{self.base_url}/api/v1/memory/query"
+        return await self.send_request("POST", url, {"query": query}, idempotent=True)
 
     async def get_learning_status(self) -> Dict:
         """获取学习状态"""
-        url = "http://localhost:8000/api/v1/learning/status"
-        return await self.send_request("GET", url) 
\ No newline at end of file
+        url = f"{self.base_url}/api/v1/learning/status"
+        return await self.send_request("GET", url)
@@ -1,29 +1,20 @@
 from typing import Dict, Any
-from fastapi.responses import JSONResponse # type: ignore
+from api.core.serialization import FastJSONResponse
 import json
 import logging
+from utils.logging import get_logger
 from datetime import datetime
 
 class ResponseHandler:
     def __init__(self):
-        self.logger = logging.getLogger('response_handler')
-        self.setup_logging()
-
-    def setup_logging(self):
-        handler = logging.FileHandler('logs/responses.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-        self.logger.setLevel(logging.INFO)
+        self.logger = get_logger('response_handler', 'responses.log', level=logging.INFO)
 
     def format_response(
         self, 
         data: Any, 
         status_code: int = 200, 
         message: str = "Success"
-    ) -> JSONResponse:
+    ) -> FastJSONResponse:
         """格式化响应"""
         response_data = {
             "status": "success" if status_code < 400 else "error",
@@ -36,7 +27,7 @@ class ResponseHandler:
             f"Response: status_code={status_code}, message={message}"
         )
         
-        return JSONResponse(
+        return FastJSONResponse(
             content=response_data,
             status_code=status_code
         )
@@ -45,7 +36,7 @@ class ResponseHandler:
         self, 
         error: Exception, 
         status_code: int = 500
-    ) -> JSONResponse:
+    ) -> FastJSONResponse:
         """处理错误响应"""
         error_message = str(error)
         
@@ -53,7 +44,7 @@ class ResponseHandler:
             f"Error: status_code={status_code}, message={error_message}"
         )
         
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "status": "error",
                 "message": error_message,
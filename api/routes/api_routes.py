@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends # type: ignore
 from typing import Dict, List, Optional
 from pydantic import BaseModel # type: ignore
+from api.core.serialization import FastJSONResponse
 import json
 
 class TextInput(BaseModel):
@@ -28,7 +29,7 @@ class APIRoutes:
                     input_data.text,
                     input_data.context
                 )
-                return {"status": "success", "result": result}
+                return FastJSONResponse(content={"status": "success", "result": result})
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
                 
@@ -41,7 +42,7 @@ class APIRoutes:
                     input_data.format,
                     input_data.sample_rate
                 )
-                return {"status": "success", "result": result}
+                return FastJSONResponse(content={"status": "success", "result": result})
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
                 
@@ -50,7 +51,7 @@ class APIRoutes:
         async def query_memory(query: Dict):
             try:
                 result = self.system_manager.query_memory(query)
-                return {"status": "success", "result": result}
+                return FastJSONResponse(content={"status": "success", "result": result})
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
                 
@@ -59,6 +60,6 @@ class APIRoutes:
         async def get_learning_status():
             try:
                 status = self.system_manager.get_learning_status()
-                return {"status": "success", "result": status}
+                return FastJSONResponse(content={"status": "success", "result": status})
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -1 +1,360 @@
- 
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect # type: ignore
+from typing import Dict, List, Optional, Any, Tuple
+from collections import deque
+from datetime import datetime
+import numpy as np # type: ignore
+import asyncio
+from api.core.serialization import dumps
+from api.core.rate_limiter import RateLimiter
+import json
+import time
+import logging
+
+class StreamingVAD:
+    """基于短时能量的流式语音活动检测(16-bit 单声道 PCM)"""
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        energy_threshold: float = 500.0,
+        speech_ms: int = 90,
+        silence_ms: int = 600,
+        max_segment_ms: int = 15000
+    ):
+        self.sample_rate = sample_rate
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+        self.energy_threshold = energy_threshold
+        self.speech_frames = max(1, speech_ms // frame_ms)
+        self.silence_frames = max(1, silence_ms // frame_ms)
+        self.max_segment_frames = max(1, max_segment_ms // frame_ms)
+        self.reset()
+
+    def reset(self):
+        """重置检测状态"""
+        self._pending = bytearray()
+        self._segment = bytearray()
+        self._preroll = deque(maxlen=self.speech_frames)
+        self._voiced_run = 0
+        self._silent_run = 0
+        self._segment_frames = 0
+        self.in_speech = False
+
+    def _is_voiced(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) >= self.energy_threshold
+
+    def process(self, pcm: bytes) -> List[bytes]:
+        """
+        输入任意长度的音频数据
+
+        Returns:
+            List[bytes]: 本次输入中结束的完整语音段
+        """
+        segments = []
+        self._pending.extend(pcm)
+        while len(self._pending) >= self.frame_bytes:
+            frame = bytes(self._pending[:self.frame_bytes])
+            del self._pending[:self.frame_bytes]
+            voiced = self._is_voiced(frame)
+
+            if not self.in_speech:
+                self._preroll.append(frame)
+                self._voiced_run = self._voiced_run + 1 if voiced else 0
+                if self._voiced_run >= self.speech_frames:
+                    # 连续有声帧达到阈值，语音段开始(保留起始帧)
+                    self.in_speech = True
+                    self._segment = bytearray(b''.join(self._preroll))
+                    self._segment_frames = len(self._preroll)
+                    self._preroll.clear()
+                    self._silent_run = 0
+                continue
+
+            self._segment.extend(frame)
+            self._segment_frames += 1
+            self._silent_run = 0 if voiced else self._silent_run + 1
+            if (self._silent_run >= self.silence_frames or
+                    self._segment_frames >= self.max_segment_frames):
+                segments.append(self._close_segment())
+        return segments
+
+    def flush(self) -> Optional[bytes]:
+        """结束输入，返回尚未结束的语音段"""
+        segment = self._close_segment() if self.in_speech else None
+        self._pending.clear()
+        return segment
+
+    def current_segment(self) -> bytes:
+        """获取进行中的语音段"""
+        return bytes(self._segment) if self.in_speech else b''
+
+    def _close_segment(self) -> bytes:
+        segment = bytes(self._segment)
+        self._segment = bytearray()
+        self._segment_frames = 0
+        self._silent_run = 0
+        self._voiced_run = 0
+        self.in_speech = False
+        return segment
+
+
+class SpeechRecognizerBackend:
+    """语音识别后端(speech_recognition)"""
+    def __init__(self, language: str = 'zh-CN'):
+        import speech_recognition as sr # type: ignore
+        self._sr = sr
+        self.recognizer = sr.Recognizer()
+        self.language = language
+
+    def recognize(self, pcm: bytes, sample_rate: int) -> str:
+        """识别一段 PCM 音频，无法识别时返回空字符串"""
+        audio = self._sr.AudioData(pcm, sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except self._sr.UnknownValueError:
+            return ""
+
+
+class StageLatency:
+    """流式语音各阶段延迟统计"""
+    def __init__(self, window: int = 1000):
+        self.samples: Dict[str, deque] = {}
+        self.window = window
+
+    def record(self, stage: str, duration_ms: float):
+        if stage not in self.samples:
+            self.samples[stage] = deque(maxlen=self.window)
+        self.samples[stage].append(duration_ms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for stage, values in self.samples.items():
+            if not values:
+                continue
+            data = np.fromiter(values, dtype=np.float64)
+            result[stage] = {
+                'count': int(data.size),
+                'mean_ms': float(data.mean()),
+                'p50_ms': float(np.percentile(data, 50)),
+                'p95_ms': float(np.percentile(data, 95)),
+                'max_ms': float(data.max())
+            }
+        return result
+
+
+class VoiceInteractionAPI:
+    """
+    流式语音交互接口
+
+    协议:
+        1. 客户端可先发送 {"type": "start", "sample_rate": 16000, "user_id": "..."}
+        2. 之后以二进制消息持续发送 16-bit 单声道 PCM 音频帧
+        3. 发送 {"type": "end"} 结束输入，服务端处理剩余语音段后关闭
+    服务端按语音段推送 partial / final 识别结果，final 结果附带 NLU 输出和各阶段延迟。
+    WebSocket 不经过 HTTP 限流中间件，按连接限流：配置 api.rate_limits 中本路由的
+    rate/burst 限制建立连接的速率，max_concurrency 限制单客户端的并发连接数，超出时以 1013 关闭。
+    """
+    STREAM_PATH = "/api/v1/voice/stream"
+
+    def __init__(self, system_manager, recognizer: Optional[Any] = None,
+                 partial_interval_ms: int = 500, rate_limiter: Optional[RateLimiter] = None):
+        self.router = APIRouter()
+        self.system_manager = system_manager
+        self.recognizer = recognizer
+        self.partial_interval_ms = partial_interval_ms
+        self.rate_limiter = rate_limiter or RateLimiter(self._load_rate_limits())
+        self.latency = StageLatency()
+        self.logger = logging.getLogger('voice_interaction_api')
+        self.setup_routes()
+
+    def _load_rate_limits(self) -> Dict[str, Dict]:
+        try:
+            with open('config/system_config.json', 'r', encoding='utf-8') as f:
+                return json.load(f).get('api', {}).get('rate_limits', {})
+        except Exception:
+            return {}
+
+    def _client_key(self, websocket: WebSocket) -> str:
+        """限流客户端标识：优先 user_id，其次客户端IP(与 HTTP 中间件一致)"""
+        user_id = websocket.headers.get('x-user-id') or websocket.query_params.get('user_id')
+        if user_id:
+            return f"user:{user_id}"
+        return f"ip:{websocket.client.host if websocket.client else 'unknown'}"
+
+    def _get_recognizer(self):
+        if self.recognizer is None:
+            self.recognizer = SpeechRecognizerBackend()
+        return self.recognizer
+
+    def setup_routes(self):
+        # 流式语音识别接口
+        @self.router.websocket(self.STREAM_PATH)
+        async def voice_stream(websocket: WebSocket):
+            client = self._client_key(websocket)
+            allowed, _ = self.rate_limiter.acquire(self.STREAM_PATH, client)
+            if not allowed:
+                await websocket.close(code=1013)  # Try Again Later
+                return
+            try:
+                await websocket.accept()
+                await self._handle_stream(websocket)
+            finally:
+                self.rate_limiter.release(self.STREAM_PATH, client)
+
+        # 流式语音延迟统计接口
+        @self.router.get("/api/v1/voice/stream/stats")
+        async def voice_stream_stats():
+            return {
+                "status": "success",
+                "data": self.latency.summary(),
+                "timestamp": datetime.now().isoformat()
+            }
+
+    async def _send(self, websocket: WebSocket, message: Dict):
+        """发送一条消息；中间结果和最终结果由不同任务并发发送，同一连接的发送串行化"""
+        if websocket.state.disconnected:
+            return  # 客户端已断开，结果直接丢弃
+        data = dumps(message).decode('utf-8')
+        async with websocket.state.send_lock:
+            await websocket.send_text(data)
+
+    async def _handle_stream(self, websocket: WebSocket):
+        """处理单个流式会话"""
+        sample_rate = 16000
+        user_id = None
+        vad = StreamingVAD(sample_rate=sample_rate)
+        segment_id = 0
+        last_partial = 0.0
+        partial_task: Optional[asyncio.Task] = None
+        final_tasks: List[asyncio.Task] = []
+        websocket.state.send_lock = asyncio.Lock()
+        websocket.state.disconnected = False
+
+        try:
+            while True:
+                message = await websocket.receive()
+                if message.get('type') == 'websocket.disconnect':
+                    websocket.state.disconnected = True
+                    break
+
+                if message.get('text') is not None:
+                    control = json.loads(message['text'])
+                    if control.get('type') == 'start':
+                        sample_rate = int(control.get('sample_rate', sample_rate))
+                        user_id = control.get('user_id')
+                        vad = StreamingVAD(sample_rate=sample_rate)
+                        await self._send(websocket, {"type": "ready", "sample_rate": sample_rate})
+                    elif control.get('type') == 'end':
+                        segment = vad.flush()
+                        if segment:
+                            final_tasks.append(asyncio.create_task(self._finalize_segment(
+                                websocket, segment_id, segment, sample_rate, user_id,
+                                time.perf_counter()
+                            )))
+                            segment_id += 1
+                        break
+                    continue
+
+                chunk = message.get('bytes')
+                if not chunk:
+                    continue
+
+                received = time.perf_counter()
+                segments = vad.process(chunk)
+                self.latency.record('vad', (time.perf_counter() - received) * 1000)
+
+                for segment in segments:
+                    # 语音段结束：异步识别，不阻塞后续音频接收
+                    final_tasks.append(asyncio.create_task(self._finalize_segment(
+                        websocket, segment_id, segment, sample_rate, user_id, received
+                    )))
+                    segment_id += 1
+                    last_partial = 0.0
+
+                if vad.in_speech and (received - last_partial) * 1000 >= self.partial_interval_ms:
+                    # 同一时刻只保留一个中间识别任务，避免积压
+                    if partial_task is None or partial_task.done():
+                        last_partial = received
+                        partial_task = asyncio.create_task(self._send_partial(
+                            websocket, segment_id, vad.current_segment(), sample_rate
+                        ))
+
+                final_tasks = [task for task in final_tasks if not task.done()]
+
+            if websocket.state.disconnected:
+                # 正常挂断：不再关闭连接或发送结果，未完成的识别任务在 finally 中取消
+                self.logger.info("Voice stream client disconnected")
+                return
+            if final_tasks:
+                await asyncio.gather(*final_tasks, return_exceptions=True)
+            await websocket.close()
+
+        except WebSocketDisconnect:
+            websocket.state.disconnected = True
+            self.logger.info("Voice stream client disconnected")
+        except Exception as e:
+            self.logger.error(f"Voice stream failed: {str(e)}")
+            try:
+                await websocket.close(code=1011)
+            except Exception:
+                pass  # 连接可能已经断开或关闭
+        finally:
+            if partial_task and not partial_task.done():
+                partial_task.cancel()
+            for task in final_tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _send_partial(self, websocket: WebSocket, segment_id: int,
+                            pcm: bytes, sample_rate: int):
+        """发送中间识别结果"""
+        try:
+            start = time.perf_counter()
+            text = await asyncio.to_thread(self._get_recognizer().recognize, pcm, sample_rate)
+            self.latency.record('asr_partial', (time.perf_counter() - start) * 1000)
+            if text:
+                await self._send(websocket, {
+                    "type": "partial",
+                    "segment_id": segment_id,
+                    "text": text
+                })
+        except Exception as e:
+            self.logger.warning(f"Partial recognition failed: {str(e)}")
+
+    async def _finalize_segment(self, websocket: WebSocket, segment_id: int, pcm: bytes,
+                                sample_rate: int, user_id: Optional[str], segment_end: float):
+        """识别完整语音段并推送最终结果和 NLU 输出"""
+        latency_ms: Dict[str, float] = {}
+        try:
+            start = time.perf_counter()
+            text = await asyncio.to_thread(self._get_recognizer().recognize, pcm, sample_rate)
+            latency_ms['asr'] = (time.perf_counter() - start) * 1000
+
+            nlu = None
+            if text:
+                start = time.perf_counter()
+                nlu = await asyncio.to_thread(
+                    self.system_manager.language_manager.process_input,
+                    text,
+                    {'user_id': user_id} if user_id else None
+                )
+                latency_ms['nlu'] = (time.perf_counter() - start) * 1000
+
+            latency_ms['end_to_end'] = (time.perf_counter() - segment_end) * 1000
+            for stage, value in latency_ms.items():
+                self.latency.record(stage, value)
+
+            await self._send(websocket, {
+                "type": "final",
+                "segment_id": segment_id,
+                "text": text,
+                "audio_ms": len(pcm) * 1000 // (2 * sample_rate),
+                "nlu": nlu,
+                "latency_ms": latency_ms
+            })
+        except Exception as e:
+            self.logger.error(f"Segment {segment_id} processing failed: {str(e)}")
+            await self._send(websocket, {
+                "type": "error",
+                "segment_id": segment_id,
+                "message": str(e)
+            })
@@ -0,0 +1,67 @@
+"""
+DQN 经验回放吞吐量基准测试
+
+比较改造前逐样本回放(每个样本两次 model.predict、一次 model.fit)与
+ReinforcementLearner.replay 整批回放(两次前向传播、一次 train_on_batch)
+每秒完成的回放次数。
+
+用法:
+    python -m benchmarks.bench_dqn_replay [--batch-size 32] [--replays 200] [--legacy-replays 3]
+"""
+import argparse
+import time
+import numpy as np # type: ignore
+from models.autonomous_learning.reinforcement_learning import ReinforcementLearner
+
+def legacy_replay(learner: ReinforcementLearner, batch_size: int):
+    """改造前的逐样本回放"""
+    batch = learner.memory.sample(batch_size)
+    for i in range(batch_size):
+        state = batch.states[i:i + 1]
+        next_state = batch.next_states[i:i + 1]
+        target = batch.rewards[i]
+        if not batch.dones[i]:
+            target = batch.rewards[i] + learner.gamma * np.amax(learner.model.predict(next_state, verbose=0)[0])
+        target_f = learner.model.predict(state, verbose=0)
+        target_f[0][batch.actions[i]] = target
+        learner.model.fit(state, target_f, epochs=1, verbose=0)
+
+def fill(learner: ReinforcementLearner, count: int):
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        learner.remember(rng.random(4), int(rng.integers(0, 2)), float(rng.random()),
+                         rng.random(4), bool(rng.random() < 0.05))
+
+def measure(fn, replays: int) -> float:
+    fn()  # 预热
+    start = time.perf_counter()
+    for _ in range(replays):
+        fn()
+    return replays / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="DQN 经验回放吞吐量基准测试")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--replays', type=int, default=200)
+    parser.add_argument('--legacy-replays', type=int, default=3)
+    args = parser.parse_args()
+
+    legacy = ReinforcementLearner()
+    batched = ReinforcementLearner()
+    target = ReinforcementLearner(target_update_interval=100)
+    for learner in (legacy, batched, target):
+        fill(learner, 2000)
+
+    results = {
+        'per-sample (legacy)': measure(lambda: legacy_replay(legacy, args.batch_size), args.legacy_replays),
+        'batched': measure(lambda: batched.replay(args.batch_size), args.replays),
+        'batched + target net': measure(lambda: target.replay(args.batch_size), args.replays)
+    }
+    baseline = results['per-sample (legacy)']
+    print(f"batch_size={args.batch_size}")
+    print(f"{'replay':<24}{'replays/s':>12}{'samples/s':>12}{'speedup':>10}")
+    for name, rate in results.items():
+        print(f"{name:<24}{rate:>12.2f}{rate * args.batch_size:>12.0f}{rate / baseline:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+API 响应序列化基准测试
+
+比较标准库 json 与 FastJSONResponse 编码路径在大负载(text_vector、NLU 解析树)下的
+编码耗时和负载大小。
+
+用法:
+    python -m benchmarks.bench_json_response [--vector-size 20000] [--repeat 50]
+"""
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List
+import numpy as np # type: ignore
+from api.core import serialization
+from api.core.serialization import json_default
+
+class IntentType(Enum):
+    QUESTION = "question"
+
+@dataclass
+class NLUResult:
+    text: str
+    intent: IntentType
+    entities: List[Dict]
+    sentiment: float
+    confidence: float
+    parsed_result: Dict
+
+def build_payload(vector_size: int, tokens: int) -> Dict:
+    """构造与 /api/v1/text/process 结构一致的响应负载"""
+    words = [f"词{i}" for i in range(tokens)]
+    nlu = NLUResult(
+        text=''.join(words),
+        intent=IntentType.QUESTION,
+        entities=[{'text': w, 'label': 'ORG', 'start': i, 'end': i + 2}
+                  for i, w in enumerate(words[:50])],
+        sentiment=np.float32(0.8),
+        confidence=0.5,
+        parsed_result={
+            'tokens': words,
+            'pos_tags': ['NOUN'] * tokens,
+            'dependencies': [(w, 'nsubj', words[0]) for w in words],
+            'noun_chunks': words[:20]
+        }
+    )
+    return {
+        'status': 'success',
+        'data': {
+            'processing': {
+                'original_text': nlu.text,
+                'nlu_result': nlu,
+                'tokens': words,
+                'keywords': [{'word': w, 'weight': np.float64(0.1)} for w in words[:10]],
+                'text_vector': np.random.rand(vector_size)
+            }
+        }
+    }
+
+def stdlib_encode(payload) -> bytes:
+    """FastAPI JSONResponse 默认的编码方式(补充 default 以支持 NumPy 等类型)"""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None,
+                      separators=(",", ":"), default=json_default).encode("utf-8")
+
+def bench(fn, payload, repeat: int) -> Dict:
+    body = fn(payload)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        timings.append(time.perf_counter() - start)
+    return {
+        'bytes': len(body),
+        'mean_ms': float(np.mean(timings) * 1000),
+        'p95_ms': float(np.percentile(timings, 95) * 1000)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="API 响应序列化基准测试")
+    parser.add_argument('--vector-size', type=int, default=20000)
+    parser.add_argument('--tokens', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    payload = build_payload(args.vector_size, args.tokens)
+    results = {
+        'stdlib_json': bench(stdlib_encode, payload, args.repeat),
+        f'fast_path ({serialization.JSON_BACKEND})': bench(serialization.dumps, payload, args.repeat)
+    }
+
+    baseline = results['stdlib_json']['mean_ms']
+    print(f"{'encoder':<24}{'bytes':>12}{'mean ms':>12}{'p95 ms':>12}{'speedup':>10}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['bytes']:>12}{r['mean_ms']:>12.3f}{r['p95_ms']:>12.3f}"
+              f"{baseline / r['mean_ms']:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+PDF 批量提取基准测试
+
+生成一批多页 PDF，比较单进程 PDFReader.read_pdf 逐个读取与 BatchPDFExtractor
+(进程池 + 按文档选择引擎)的总耗时和每秒页数。
+
+用法:
+    python -m benchmarks.bench_pdf_batch [--documents 8] [--pages 40] [--workers 4] [--engine auto]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pdf_reader import PDFReader
+from pdf_batch_extractor import ENGINES, BatchPDFExtractor
+from benchmarks.run_benchmarks import build_pdf
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 批量提取基准测试")
+    parser.add_argument('--documents', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--pages-per-task', type=int, default=8)
+    parser.add_argument('--engine', choices=ENGINES + ('auto',), default='auto')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for index in range(args.documents):
+            path = os.path.join(directory, f'doc{index}.pdf')
+            build_pdf(path, args.pages)
+            paths.append(path)
+        total = args.documents * args.pages
+
+        start = time.perf_counter()
+        reader = PDFReader(use_cache=False)  # 两边都不使用页面文本缓存，测量实际提取
+        for path in paths:
+            reader.read_pdf(path)
+        sequential = time.perf_counter() - start
+
+        with BatchPDFExtractor(args.workers, args.pages_per_task, args.engine,
+                               use_cache=False) as extractor:
+            start = time.perf_counter()
+            results = list(extractor.iter_pages(paths))
+            batch = time.perf_counter() - start
+            engines = sorted({r.engine for r in results if r.engine})
+            workers = extractor.workers
+
+        errors = sum(1 for r in results if r.error)
+        print(f"{args.documents} documents x {args.pages} pages")
+        print(f"  sequential pdfplumber  {sequential:7.2f}s  {total / sequential:8.1f} pages/s")
+        print(f"  batch ({workers} workers)     {batch:7.2f}s  {total / batch:8.1f} pages/s  "
+              f"({sequential / batch:.1f}x, engines={engines}, errors={errors})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+PDF 逐页提取基准测试
+
+比较改造前的做法(每次单页请求都重新打开并解析整个文件、整本提取时保留所有页面的解析缓存)
+与 PDFReader 的文档句柄缓存和 iter_pages 惰性提取：随机单页访问耗时，以及整本提取的峰值内存。
+
+用法:
+    python -m benchmarks.bench_pdf_pages [--pages 300] [--random-reads 50]
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np # type: ignore
+import pdfplumber # type: ignore
+from pdf_reader import PDFReader
+from benchmarks.run_benchmarks import build_pdf
+
+def reopen_page(path: str, page_number: int) -> str:
+    """改造前的 extract_text_from_page"""
+    with pdfplumber.open(path) as pdf:
+        return pdf.pages[page_number].extract_text()
+
+def read_all_eager(path: str) -> list:
+    """改造前的 read_pdf"""
+    with pdfplumber.open(path) as pdf:
+        return [page.extract_text() for page in pdf.pages]
+
+def peak_mb(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 逐页提取基准测试")
+    parser.add_argument('--pages', type=int, default=300)
+    parser.add_argument('--random-reads', type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.pdf')
+        build_pdf(path, args.pages)
+        order = np.random.default_rng(0).integers(0, args.pages, args.random_reads)
+
+        start = time.perf_counter()
+        for page_number in order:
+            reopen_page(path, int(page_number))
+        reopen = (time.perf_counter() - start) / len(order)
+
+        reader = PDFReader(use_cache=False)  # 只比较文档句柄缓存，不使用页面文本缓存
+        start = time.perf_counter()
+        for page_number in order:
+            reader.extract_text_from_page(path, int(page_number))
+        cached = (time.perf_counter() - start) / len(order)
+        reader.close()
+
+        print(f"random page access ({args.pages} pages):")
+        print(f"  reopen per call  {1000 * reopen:8.2f} ms/page")
+        print(f"  cached handle    {1000 * cached:8.2f} ms/page  ({reopen / cached:.1f}x)")
+
+        eager = peak_mb(lambda: read_all_eager(path))
+        lazy = peak_mb(lambda: sum(len(text) for _, text in PDFReader(use_cache=False).iter_pages(path)))
+        print("full document peak memory (tracemalloc):")
+        print(f"  eager read_pdf   {eager:8.1f} MB")
+        print(f"  iter_pages       {lazy:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+经验回放采样基准测试
+
+比较原先基于 Python 元组列表的 Memory(采样后再逐字段 np.array 转换)
+与预分配数组的 ReplayBuffer 在存储和采样成批训练数据上的耗时。
+
+用法:
+    python -m benchmarks.bench_replay [--capacity 1000000] [--batch-size 32] [--samples 2000]
+"""
+import argparse
+import time
+import numpy as np # type: ignore
+from models.autonomous_learning.replay_buffer import ReplayBuffer
+
+class ListMemory:
+    """改造前的 learning_robot.Memory"""
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.memory = []
+        self.position = 0
+
+    def store(self, experience):
+        if len(self.memory) < self.capacity:
+            self.memory.append(experience)
+        else:
+            self.memory[self.position] = experience
+        self.position = (self.position + 1) % self.capacity
+
+    def sample(self, batch_size: int):
+        indices = np.random.choice(len(self.memory), batch_size, replace=False)
+        experiences = [self.memory[i] for i in indices]
+        return (
+            np.array([exp[0] for exp in experiences]),
+            np.array([exp[1] for exp in experiences]),
+            np.array([exp[2] for exp in experiences]),
+            np.array([exp[3] for exp in experiences])
+        )
+
+def timed(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="经验回放采样基准测试")
+    parser.add_argument('--capacity', type=int, default=1000000)
+    parser.add_argument('--state-dim', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--samples', type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n = args.capacity
+    states = rng.random((n, args.state_dim), dtype=np.float32)
+    actions = rng.integers(0, 4, n)
+    rewards = rng.random(n, dtype=np.float32)
+
+    start = time.perf_counter()
+    memory = ListMemory(n)
+    for i in range(n):
+        memory.store((states[i], int(actions[i]), float(rewards[i]), states[(i + 1) % n]))
+    list_fill = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer = ReplayBuffer(capacity=n, state_dim=args.state_dim)
+    buffer.store_batch(states, actions, rewards, np.roll(states, -1, axis=0))
+    array_fill = time.perf_counter() - start
+
+    list_us = timed(lambda: memory.sample(args.batch_size), args.samples)
+    array_us = timed(lambda: buffer.sample(args.batch_size), args.samples)
+
+    print(f"capacity={n} batch_size={args.batch_size}")
+    print(f"{'memory':<14}{'fill s':>10}{'sample us':>12}")
+    print(f"{'list Memory':<14}{list_fill:>10.2f}{list_us:>12.1f}")
+    print(f"{'ReplayBuffer':<14}{array_fill:>10.2f}{array_us:>12.1f}")
+    print(f"sampling speedup: {list_us / array_us:.1f}x")
+
+if __name__ == "__main__":
+    main()
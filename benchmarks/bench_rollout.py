@@ -0,0 +1,63 @@
+"""
+向量化数据采集基准测试
+
+比较逐条 choose_action + learn(每步一次批量为 1 的前向传播并训练)与
+RolloutDriver 同时推进 K 个环境(同步或多进程)时的经验采集吞吐量。
+
+用法:
+    python -m benchmarks.bench_rollout [--envs 8] [--transitions 4000] [--train-every 8]
+"""
+import argparse
+import functools
+import time
+from models.autonomous_learning.environments import ContextualBanditEnv
+from models.autonomous_learning.learning_robot import AutonomousLearningRobot
+from models.autonomous_learning.rollout import RolloutDriver, SyncVectorEnv, SubprocVectorEnv
+
+def single_env(transitions: int, train_every: int) -> dict:
+    robot = AutonomousLearningRobot(train_every=train_every)
+    env = ContextualBanditEnv(seed=0)
+    state = env.reset()
+    reward_sum = 0.0
+    start = time.perf_counter()
+    for _ in range(transitions):
+        action = robot.choose_action(state)
+        next_state, reward, done = env.step(action)
+        robot.learn(state, action, reward, next_state)
+        reward_sum += reward
+        state = env.reset() if done else next_state
+    elapsed = time.perf_counter() - start
+    return {'transitions_per_second': transitions / elapsed, 'mean_reward': reward_sum / transitions}
+
+def vectorized(vec_cls, envs: int, transitions: int, train_every: int) -> dict:
+    robot = AutonomousLearningRobot()
+    env_fns = [functools.partial(ContextualBanditEnv, seed=i) for i in range(envs)]
+    vec_env = vec_cls(env_fns)
+    try:
+        # 按向量步计，每 train_every 条经验训练一次
+        driver = RolloutDriver(robot, vec_env, train_every=max(1, train_every // envs))
+        return driver.run(transitions // envs)
+    finally:
+        vec_env.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="向量化数据采集基准测试")
+    parser.add_argument('--envs', type=int, default=8)
+    parser.add_argument('--transitions', type=int, default=4000)
+    parser.add_argument('--train-every', type=int, default=8)
+    args = parser.parse_args()
+
+    results = {
+        'single env': single_env(args.transitions, args.train_every),
+        f'SyncVectorEnv x{args.envs}': vectorized(SyncVectorEnv, args.envs, args.transitions, args.train_every),
+        f'SubprocVectorEnv x{args.envs}': vectorized(SubprocVectorEnv, args.envs, args.transitions, args.train_every)
+    }
+    baseline = results['single env']['transitions_per_second']
+    print(f"transitions={args.transitions} train_every={args.train_every} transitions")
+    print(f"{'driver':<24}{'transitions/s':>15}{'mean reward':>13}{'speedup':>10}")
+    for name, r in results.items():
+        print(f"{name:<24}{r['transitions_per_second']:>15.0f}{r['mean_reward']:>13.3f}"
+              f"{r['transitions_per_second'] / baseline:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
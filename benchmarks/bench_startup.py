@@ -0,0 +1,147 @@
+"""
+启动耗时报告和导入预算检查
+
+对每个子系统在全新进程中执行 `python -X importtime -c "import <module>"`，
+按顶层包汇总导入耗时，并检查:
+    - 导入耗时不超过预算(毫秒)
+    - 启动阶段没有导入 TensorFlow、torch、transformers 等重量级框架
+
+用法:
+    python -m benchmarks.bench_startup               # 输出报告
+    python -m benchmarks.bench_startup --check       # 超出预算或无法导入时以非零状态退出
+    python -m benchmarks.bench_startup --check --allow-import-errors   # 缺少可选依赖的子系统记为跳过
+    python -m benchmarks.bench_startup --top 15 --json startup.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# 子系统 -> (入口模块, 导入预算 ms)
+SUBSYSTEMS: Dict[str, tuple] = {
+    'main': ('main', 3000),
+    'learning': ('models.autonomous_learning.learning_robot', 1000),
+    'nlu': ('models.nlu.language_manager', 1000),
+    'memory': ('models.memory.memory_core', 500),
+    'api': ('api.core.api_manager', 1500),
+    'voice_api': ('api.voice_interaction_api', 1500),
+    'monitoring': ('monitoring.system_monitor', 500),
+}
+
+# 启动阶段禁止导入的重量级框架
+HEAVY_MODULES = ('tensorflow', 'keras', 'torch', 'transformers', 'spacy', 'nltk', 'sklearn')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_importtime(stderr: str) -> List[tuple]:
+    """解析 -X importtime 输出为 (模块名, self_us, cumulative_us)"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            entries.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return entries
+
+def profile_module(module: str) -> Dict:
+    """在独立进程中导入模块并统计耗时"""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    entries = parse_importtime(proc.stderr)
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in entries:
+        by_package[name.split('.')[0]] += self_us
+
+    error = None
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+        error = lines[-1] if lines else f"exit code {proc.returncode}"
+
+    return {
+        'module': module,
+        'import_ms': sum(self_us for _, self_us, _ in entries) / 1000,
+        'wall_ms': wall_ms,
+        'by_package_ms': {k: v / 1000 for k, v in
+                          sorted(by_package.items(), key=lambda kv: -kv[1])},
+        'heavy_imported': sorted({name.split('.')[0] for name, _, _ in entries} & set(HEAVY_MODULES)),
+        'error': error
+    }
+
+def check_budgets(results: Dict[str, Dict], scale: float,
+                  allow_import_errors: bool = False) -> List[str]:
+    """
+    返回未通过检查的子系统说明
+
+    无法导入的子系统无法测量，默认视为失败；allow_import_errors 为 True 时跳过
+    (由调用方单独报告)。
+    """
+    failures = []
+    for name, result in results.items():
+        if result['error']:
+            if not allow_import_errors:
+                failures.append(f"{name}: import failed: {result['error']}")
+            continue
+        budget = SUBSYSTEMS[name][1] * scale
+        if result['import_ms'] > budget:
+            failures.append(f"{name}: import {result['import_ms']:.0f}ms > budget {budget:.0f}ms")
+        if result['heavy_imported']:
+            failures.append(f"{name}: heavy frameworks imported at startup: "
+                            f"{', '.join(result['heavy_imported'])}")
+    return failures
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="启动耗时报告和导入预算检查")
+    parser.add_argument('--subsystem', action='append', choices=sorted(SUBSYSTEMS),
+                        help="只检查指定子系统(可重复)")
+    parser.add_argument('--top', type=int, default=8, help="每个子系统显示耗时最高的包数")
+    parser.add_argument('--budget-scale', type=float, default=1.0, help="预算缩放系数")
+    parser.add_argument('--json', help="将结果写入 JSON 文件")
+    parser.add_argument('--check', action='store_true', help="超出预算或无法导入时返回非零状态")
+    parser.add_argument('--allow-import-errors', action='store_true',
+                        help="无法导入的子系统记为跳过而不是失败")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.subsystem or SUBSYSTEMS:
+        module, budget = SUBSYSTEMS[name]
+        result = results[name] = profile_module(module)
+        status = ("SKIP" if args.allow_import_errors else "FAIL") if result['error'] else (
+            "OK" if result['import_ms'] <= budget * args.budget_scale and
+            not result['heavy_imported'] else "OVER")
+        print(f"\n[{status}] {name} ({module}): import {result['import_ms']:.1f}ms, "
+              f"process {result['wall_ms']:.1f}ms, budget {budget * args.budget_scale:.0f}ms")
+        if result['error']:
+            print(f"    import failed: {result['error']}")
+        for package, ms in list(result['by_package_ms'].items())[:args.top]:
+            print(f"    {package:<28}{ms:>10.1f}ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+    skipped = [name for name, result in results.items() if result['error']]
+    if skipped and args.allow_import_errors:
+        print(f"\nSkipped (import failed, not measured): {', '.join(skipped)}")
+
+    failures = check_budgets(results, args.budget_scale, args.allow_import_errors)
+    if failures:
+        print("\nBudget violations:")
+        for failure in failures:
+            print(f"  - {failure}")
+    return 1 if (args.check and failures) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+多进程服务启动基准测试
+
+在主进程中预加载一个模拟模型(大数组)，以预派生模式启动 N 个工作进程，
+测量全部工作进程就绪所需时间，并报告每个工作进程的 RSS/USS/PSS，
+用于确认模型内存通过写时复制共享而不是在每个进程中重复加载。
+
+用法:
+    python -m benchmarks.bench_worker_startup [--workers 4] [--model-mb 256]
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+import urllib.request
+import numpy as np # type: ignore
+import psutil # type: ignore
+
+def build_app(model_mb: int):
+    """构建带预加载模型的应用(在主进程中执行)"""
+    from fastapi import FastAPI # type: ignore
+    model = np.ones(model_mb * 1024 * 1024 // 8, dtype=np.float64)
+    app = FastAPI()
+
+    @app.get("/predict")
+    async def predict():
+        return {"checksum": float(model[:1024].sum())}
+
+    return app
+
+def serve(args):
+    from api.core.worker_pool import PreforkServer
+    PreforkServer(lambda: build_app(args.model_mb), host="127.0.0.1",
+                  port=args.port, workers=args.workers, log_level="warning").run()
+
+def wait_ready(port: int, workers: int, timeout: float) -> list:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health/workers", timeout=1) as r:
+                health = json.loads(r.read())['workers']
+            if sum(1 for w in health if w['healthy']) >= workers:
+                return health
+        except OSError:
+            pass
+        time.sleep(0.05)
+    raise TimeoutError("workers did not become ready")
+
+def main():
+    parser = argparse.ArgumentParser(description="多进程服务启动基准测试")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--model-mb', type=int, default=256)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    start = time.perf_counter()
+    master = psutil.Popen([sys.executable, '-m', 'benchmarks.bench_worker_startup', '--serve',
+                           '--workers', str(args.workers), '--model-mb', str(args.model_mb),
+                           '--port', str(args.port)])
+    try:
+        health = wait_ready(args.port, args.workers, args.timeout)
+        ready = time.perf_counter() - start
+
+        print(f"{args.workers} workers ready in {ready:.2f}s (model {args.model_mb} MB)")
+        print(f"{'process':<10}{'pid':>8}{'rss MB':>10}{'uss MB':>10}{'pss MB':>10}")
+        rows = [('master', master)] + [('worker', psutil.Process(w['pid'])) for w in health]
+        total_uss = 0.0
+        for name, proc in rows:
+            mem = proc.memory_full_info()
+            pss = getattr(mem, 'pss', 0) / 2 ** 20
+            total_uss += mem.uss / 2 ** 20
+            print(f"{name:<10}{proc.pid:>8}{mem.rss / 2 ** 20:>10.1f}"
+                  f"{mem.uss / 2 ** 20:>10.1f}{pss:>10.1f}")
+        print(f"total USS: {total_uss:.1f} MB "
+              f"(未共享时约 {args.model_mb * (args.workers + 1)} MB 仅模型部分)")
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=60)
+
+if __name__ == "__main__":
+    main()
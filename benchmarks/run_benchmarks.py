@@ -0,0 +1,500 @@
+"""
+核心热路径基准测试套件
+
+覆盖以下路径，结果写入 JSON 文件并与基线比较，中位耗时超出阈值即判定为回归(退出码 1):
+    memory   MemoryCore 在不同记忆规模下的 store / retrieve / consolidate
+    nlp      NLUCore / NLPProcessor 文本处理(spaCy、transformers 模型用桩替代，只测框架自身开销)
+    train    AutonomousLearner.train_on_batch
+    api      进程内 ASGI 客户端(httpx.ASGITransport)并发请求主要接口
+    pdf      从生成的多页 PDF 中提取文本
+
+基线文件格式:
+    {"thresholds": {"default": 0.25, "api.*": 0.5}, "results": {<与结果文件相同>}}
+thresholds 按 fnmatch 模式匹配基准名称，值为允许的相对增长比例。
+仓库中的 benchmarks/baseline.json 按套件设置阈值；耗时与机器相关，
+在新的 CI 机器上先用 --update-baseline 重新生成(保留阈值)。
+--ci(或环境变量 CI 为真)时缺少基线同样以退出码 1 失败，而不是只打印提示。
+
+用法:
+    python -m benchmarks.run_benchmarks [--only memory,api] [--repeat 50]
+    python -m benchmarks.run_benchmarks --memory-sizes 100,1000,10000 --output results/benchmarks.json
+    python -m benchmarks.run_benchmarks --update-baseline
+    python -m benchmarks.run_benchmarks --ci
+"""
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import argparse
+import datetime
+import platform
+import tempfile
+import asyncio
+import fnmatch
+import logging
+import json
+import time
+import sys
+import os
+import re
+import numpy as np # type: ignore
+
+DEFAULT_THRESHOLD = 0.25
+
+# ---------- 计时 ----------
+
+def summarize(samples_ns: List[int]) -> Dict:
+    """把一组耗时(纳秒)汇总为毫秒统计"""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    return {
+        'count': int(len(samples)),
+        'mean_ms': float(samples.mean()),
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'min_ms': float(samples.min()),
+        'ops_per_sec': float(1000.0 / samples.mean()) if samples.mean() > 0 else 0.0
+    }
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 3,
+            setup: Optional[Callable[[], object]] = None, max_seconds: float = 10.0) -> Dict:
+    """
+    重复执行 fn 并统计耗时
+
+    setup 在每次执行前调用，不计入耗时；总耗时超过 max_seconds 时提前结束(至少执行 3 次)。
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+        if len(samples) >= 3 and time.perf_counter() > deadline:
+            break
+    return summarize(samples)
+
+@contextmanager
+def workdir():
+    """在临时目录中运行(MemoryCore 等模块按相对路径读写 data/ 和 logs/)"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='bench-') as directory:
+        os.makedirs(os.path.join(directory, 'data'))
+        os.chdir(directory)
+        try:
+            yield directory
+        finally:
+            os.chdir(previous)
+
+# ---------- memory ----------
+
+def bench_memory(args) -> Dict[str, Dict]:
+    from models.memory.memory_core import MemoryCore, MemoryItem, MemoryType
+    results = {}
+    rng = np.random.default_rng(0)
+    tags = [f"tag{i}" for i in range(32)]
+    with workdir():
+        for size in args.memory_sizes:
+            core = MemoryCore()
+            now = datetime.datetime.now()
+            core.long_term_memory = {
+                f"ltm-{i}": MemoryItem(
+                    content={'text': f"记忆内容 {i}", 'value': i},
+                    timestamp=now, importance=float(rng.random()),
+                    memory_type=MemoryType.LONG_TERM,
+                    tags=list(rng.choice(tags, 3, replace=False)),
+                    associations=[], last_access=now
+                )
+                for i in range(size)
+            }
+
+            results[f"memory.store[{size}]"] = measure(
+                lambda: core.store_memory({'text': '新的记忆'}, MemoryType.SHORT_TERM, 0.5, ['tag1']),
+                args.repeat, max_seconds=args.max_seconds
+            )
+            results[f"memory.retrieve[{size}]"] = measure(
+                lambda: core.retrieve_memory({'tags': ['tag1', 'tag2'], 'importance': 0.5}),
+                args.repeat, max_seconds=args.max_seconds
+            )
+
+            def refill():
+                # 每次巩固前补满短期记忆，其中一半达到巩固阈值
+                core.short_term_memory.clear()
+                for i in range(core.short_term_memory.maxlen):
+                    core.short_term_memory.append(MemoryItem(
+                        content={'text': f"短期 {i}"}, timestamp=now,
+                        importance=0.9 if i % 2 else 0.1, memory_type=MemoryType.SHORT_TERM,
+                        tags=['tag1'], associations=[], last_access=now
+                    ))
+
+            results[f"memory.consolidate[{size}]"] = measure(
+                core.consolidate_memories, args.repeat, setup=refill, max_seconds=args.max_seconds
+            )
+    return results
+
+# ---------- nlp ----------
+
+class _StubToken:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos_ = 'NOUN'
+        self.dep_ = 'dep'
+        self.head = self
+
+class _StubDoc:
+    def __init__(self, text: str):
+        self.tokens = [_StubToken(t) for t in re.findall(r'[一-鿿]|\w+', text)]
+        self.ents: List = []
+        self.noun_chunks: List = []
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+class _StubJieba:
+    """jieba 未安装时的分词桩：按单字/单词切分"""
+    @staticmethod
+    def cut(text: str):
+        return iter(re.findall(r'[一-鿿]{1,2}|\w+', text))
+
+    @staticmethod
+    def extract_tags(text: str, topK: int = 20, withWeight: bool = False):
+        words = re.findall(r'[一-鿿]{1,2}|\w+', text)
+        counts: Dict[str, int] = {}
+        for word in words:
+            counts[word] = counts.get(word, 0) + 1
+        ranked = sorted(counts.items(), key=lambda item: -item[1])[:topK]
+        total = max(1, len(words))
+        return [(w, c / total) for w, c in ranked] if withWeight else [w for w, _ in ranked]
+
+def build_stub_nlu():
+    """构造模型全部替换为桩的 NLUCore"""
+    from models.nlu.nlu_core import NLUCore
+    core = NLUCore.__new__(NLUCore)
+    core.logger = logging.getLogger('nlu_core')
+    core.nlp = _StubDoc
+    core.tokenizer = None
+    core.sentiment_analyzer = lambda text: [{'label': 'positive', 'score': 0.9}]
+    core.intent_classifier = lambda text: [{'label': 'statement', 'score': 0.8}]
+    core.ner_model = lambda text: [{'word': text[:2], 'entity': 'ORG', 'score': 0.9}]
+    core.config = {'command_keywords': ['打开', '关闭', '播放']}
+    return core
+
+def bench_nlp(args) -> Dict[str, Dict]:
+    from models.nlu import nlp_processor
+    stubs = ['spacy', 'transformers']
+    try:
+        import jieba # type: ignore
+        import jieba.analyse # type: ignore
+    except ImportError:
+        nlp_processor.jieba = _StubJieba
+        nlp_processor.jieba_analyse = _StubJieba
+        stubs.append('jieba')
+
+    nlu = build_stub_nlu()
+    processor = nlp_processor.NLPProcessor.__new__(nlp_processor.NLPProcessor)
+    processor.nlu_core = nlu
+    processor.tfidf_vectorizer = nlp_processor.sklearn_text.TfidfVectorizer()
+    processor.word_vectors = {}
+    processor.stop_words = {'的', '了', '是'}
+
+    text = "今天天气怎么样，我想去公园散步，然后打开音乐播放器听一首歌。" * 4
+    results = {
+        'nlp.nlu_process_text': measure(lambda: nlu.process_text(text), args.repeat * 4,
+                                        max_seconds=args.max_seconds),
+        'nlp.processor_process_text': measure(lambda: processor.process_text(text), args.repeat * 4,
+                                              max_seconds=args.max_seconds)
+    }
+    for result in results.values():
+        result['stubs'] = stubs
+    return results
+
+# ---------- train ----------
+
+def bench_train(args) -> Dict[str, Dict]:
+    from models.autonomous_learning import AutonomousLearner
+    rng = np.random.default_rng(0)
+    learner = AutonomousLearner()
+    results = {}
+    for batch_size in (32, 256):
+        states = rng.random((batch_size, 10), dtype=np.float32)
+        actions = rng.integers(0, 4, batch_size).astype(np.int32)
+        rewards = rng.random(batch_size, dtype=np.float32)
+        results[f"train.train_on_batch[{batch_size}]"] = measure(
+            lambda: learner.train_on_batch((states, actions, rewards)),
+            args.repeat * 4, warmup=5, max_seconds=args.max_seconds
+        )
+    return results
+
+# ---------- api ----------
+
+class _StubSystemManager:
+    """返回固定结构结果的系统管理器桩"""
+    def __init__(self):
+        self.vector = np.random.default_rng(0).random(768)
+
+    def process_text(self, text, context=None, user_id=None):
+        return {'original_text': text, 'tokens': list(text[:32]), 'text_vector': self.vector}
+
+    def process_voice(self, audio_data, format=None, sample_rate=None, user_id=None):
+        return {'text': '', 'duration': 0.0}
+
+    def query_memory(self, query, user_id=None):
+        return []
+
+    def get_learning_status(self):
+        return {'steps': 0, 'epsilon': 1.0, 'status': 'idle'}
+
+def build_app():
+    from api.core.api_manager import APIManager
+    from api.endpoints.api_endpoints import APIEndpoints
+    from api.routes.api_routes import APIRoutes
+    manager = APIManager(rate_limits={})  # 关闭限流，只测请求处理开销
+    system = _StubSystemManager()
+    manager.app.include_router(APIRoutes(system).router)
+    manager.app.include_router(APIEndpoints(system).router)
+    return manager.app
+
+async def _load_test(app, method: str, path: str, body: Optional[Dict],
+                     total: int, concurrency: int) -> Dict:
+    import httpx # type: ignore
+    latencies: List[int] = []
+    errors = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter_ns()
+                response = await client.request(method, path, json=body)
+                latencies.append(time.perf_counter_ns() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        await asyncio.gather(*(request() for _ in range(min(concurrency, total))))  # 预热
+        latencies.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(total)))
+        wall = time.perf_counter() - start
+
+    result = summarize(latencies)
+    result.update({'concurrency': concurrency, 'errors': errors, 'throughput_rps': total / wall})
+    return result
+
+def bench_api(args) -> Dict[str, Dict]:
+    app = build_app()
+    cases = [
+        ('GET', '/health', None),
+        ('GET', '/api/v1/learning/status', None),
+        ('POST', '/api/v1/text/process', {'text': '今天天气怎么样', 'user_id': 'bench'}),
+        ('POST', '/process/text', {'text': '今天天气怎么样'})
+    ]
+    results = {}
+    for method, path, body in cases:
+        results[f"api.{method} {path}"] = asyncio.run(
+            _load_test(app, method, path, body, args.api_requests, args.api_concurrency)
+        )
+    return results
+
+# ---------- pdf ----------
+
+def build_pdf(path: str, pages: int, lines_per_page: int = 45):
+    """生成只含 Helvetica 文本的多页 PDF(不依赖 PDF 生成库)"""
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # 页面树，所有页面对象生成后再填写
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} line {line + 1}: the quick brown fox jumps over the lazy dog"
+                 for line in range(lines_per_page)]
+        text = b" T* ".join(f"({line}) Tj".encode('ascii') for line in lines)
+        stream = b"BT /F1 10 Tf 12 TL 50 800 Td " + text + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    with open(path, 'wb') as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(objects) + 1, xref))
+
+def bench_pdf(args) -> Dict[str, Dict]:
+    from pdf_reader import PDFReader
+    reader = PDFReader(use_cache=False)  # 测量提取本身，不读写页面文本缓存
+    logging.getLogger().setLevel(logging.WARNING)  # PDFReader 会把根日志器设为 INFO
+    with tempfile.TemporaryDirectory(prefix='bench-pdf-') as directory:
+        path = os.path.join(directory, 'bench.pdf')
+        build_pdf(path, args.pdf_pages)
+        repeat = max(3, args.repeat // 10)
+        results = {
+            f"pdf.read_pdf[{args.pdf_pages}p]": measure(
+                lambda: reader.read_pdf(path), repeat, warmup=1, max_seconds=args.max_seconds
+            ),
+            'pdf.extract_text_from_page': measure(
+                lambda: reader.extract_text_from_page(path, args.pdf_pages // 2),
+                args.repeat, max_seconds=args.max_seconds
+            )
+        }
+        pages = reader.read_pdf(path)
+        if not pages or len(pages) != args.pdf_pages:
+            raise RuntimeError(f"PDF extraction returned {len(pages or [])} pages, expected {args.pdf_pages}")
+    return results
+
+BENCHMARKS: Dict[str, Callable] = {
+    'memory': bench_memory,
+    'nlp': bench_nlp,
+    'train': bench_train,
+    'api': bench_api,
+    'pdf': bench_pdf
+}
+
+# ---------- 基线比较 ----------
+
+def threshold_for(name: str, thresholds: Dict[str, float], default: float) -> float:
+    """按最长匹配的 fnmatch 模式取阈值"""
+    matches = [pattern for pattern in thresholds if pattern != 'default' and fnmatch.fnmatch(name, pattern)]
+    if matches:
+        return thresholds[max(matches, key=len)]
+    return thresholds.get('default', default)
+
+def compare(results: Dict[str, Dict], baseline: Dict, default: float) -> List[Dict]:
+    """比较中位耗时，返回每项比较结果"""
+    thresholds = baseline.get('thresholds', {})
+    rows = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get('results', {}).get(name)
+        if previous is None or not previous.get('p50_ms'):
+            rows.append({'name': name, 'status': 'new', 'current_ms': current['p50_ms']})
+            continue
+        ratio = current['p50_ms'] / previous['p50_ms']
+        limit = threshold_for(name, thresholds, default)
+        rows.append({
+            'name': name,
+            'status': 'regression' if ratio > 1 + limit else 'ok',
+            'baseline_ms': previous['p50_ms'],
+            'current_ms': current['p50_ms'],
+            'ratio': ratio,
+            'threshold': limit
+        })
+    return rows
+
+def load_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def write_json(path: str, data: Dict):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="核心热路径基准测试套件")
+    parser.add_argument('--only', default=None, help=f"逗号分隔，可选 {','.join(BENCHMARKS)}")
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--max-seconds', type=float, default=10.0, help="每项基准的耗时上限")
+    parser.add_argument('--memory-sizes', default='100,1000,10000')
+    parser.add_argument('--api-requests', type=int, default=500)
+    parser.add_argument('--api-concurrency', type=int, default=32)
+    parser.add_argument('--pdf-pages', type=int, default=20)
+    parser.add_argument('--output', default='results/benchmarks.json')
+    parser.add_argument('--baseline', default='benchmarks/baseline.json')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="基线文件未指定时允许的中位耗时相对增长")
+    parser.add_argument('--update-baseline', action='store_true', help="用本次结果覆盖基线(保留阈值)")
+    parser.add_argument('--ci', action='store_true',
+                        default=os.environ.get('CI', '').lower() in ('1', 'true', 'yes'),
+                        help="CI 模式：缺少基线时以非零状态退出")
+    args = parser.parse_args()
+    args.memory_sizes = [int(size) for size in args.memory_sizes.split(',') if size]
+
+    selected = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+
+    results: Dict[str, Dict] = {}
+    failures: Dict[str, str] = {}
+    for name in selected:
+        start = time.perf_counter()
+        try:
+            results.update(BENCHMARKS[name](args))
+            print(f"{name}: done in {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            failures[name] = f"{type(e).__name__}: {e}"
+            print(f"{name}: FAILED ({failures[name]})")
+
+    print(f"\n{'benchmark':<42}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>12}")
+    for name, result in sorted(results.items()):
+        print(f"{name:<42}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}{result['ops_per_sec']:>12.1f}")
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+        'failures': failures
+    }
+    baseline = load_json(args.baseline)
+    regressions = []
+    if baseline is not None:
+        report['comparison'] = compare(results, baseline, args.threshold)
+        regressions = [row for row in report['comparison'] if row['status'] == 'regression']
+        print(f"\ncompared with {args.baseline}:")
+        for row in report['comparison']:
+            if row['status'] == 'new':
+                print(f"  {row['name']:<42} new")
+            else:
+                print(f"  {row['name']:<42} {row['ratio']:>6.2f}x (limit {1 + row['threshold']:.2f}x) "
+                      f"{row['status']}")
+    else:
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to create one")
+    write_json(args.output, report)
+    print(f"results written to {args.output}")
+
+    if args.update_baseline:
+        merged = (baseline or {}).get('results', {})
+        merged.update(results)
+        write_json(args.baseline, {
+            'thresholds': (baseline or {}).get('thresholds', {'default': args.threshold}),
+            'timestamp': report['timestamp'],
+            'platform': report['platform'],
+            'results': merged
+        })
+        print(f"baseline updated: {args.baseline}")
+        return
+
+    if baseline is None and args.ci:
+        print(f"CI mode requires a baseline at {args.baseline}")
+        sys.exit(1)
+    if regressions or failures:
+        print(f"{len(regressions)} regressions, {len(failures)} failed benchmarks")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
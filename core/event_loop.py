@@ -0,0 +1,240 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from collections import deque
+from enum import IntEnum
+import itertools
+import asyncio
+import inspect
+import logging
+import signal
+import time
+
+class EventPriority(IntEnum):
+    """事件优先级，数值越小越先处理"""
+    VOICE = 0
+    API = 1
+    LEARNING = 2
+    MONITORING = 3
+
+@dataclass(order=True)
+class Event:
+    priority: int
+    seq: int
+    kind: str = field(compare=False)
+    payload: Any = field(compare=False, default=None)
+    created: float = field(compare=False, default=0.0)
+
+@dataclass
+class _Handler:
+    callback: Callable
+    priority: int
+    is_async: bool
+    lock: Optional[asyncio.Lock] = None
+
+class EventScheduler:
+    """
+    基于 asyncio 的事件调度器
+
+    各类事件(语音输入、API 请求、学习步骤、监控心跳)进入同一个优先级队列，
+    由若干消费协程按优先级处理。同步处理函数在线程池中执行，不阻塞事件循环；
+    同一类事件默认串行处理，保证非线程安全的模型不会被并发调用。
+    多类事件调用同一个模型时注册为同一个 resource，共用一把锁。
+    """
+    def __init__(self, workers: int = 2, max_threads: int = 2,
+                 lag_interval: float = 0.1, max_queue: int = 10000):
+        self.workers = workers
+        self.lag_interval = lag_interval
+        self.max_queue = max_queue
+        self.handlers: Dict[str, _Handler] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.periodic: List[tuple] = []
+        self.sources: List[Callable[[], Awaitable]] = []
+        self.executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='event')
+        self.logger = logging.getLogger('event_scheduler')
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+
+        self.metrics: Dict[str, Any] = {
+            'processed': {},
+            'failed': {},
+            'dropped': 0,
+            'loop_lag_ms': {'last': 0.0, 'max': 0.0, 'mean': 0.0},
+            'queue_wait_ms': {}
+        }
+        self._lag_samples = deque(maxlen=600)
+
+    def register(self, kind: str, callback: Callable, priority: int,
+                 exclusive: bool = True, resource: Optional[str] = None):
+        """
+        注册事件处理函数(同步或异步)
+
+        exclusive 为 True 时按 resource(默认为 kind)串行处理，
+        resource 相同的各类事件共用一把锁。
+        """
+        lock = None
+        if exclusive:
+            lock = self._locks.setdefault(resource or kind, asyncio.Lock())
+        self.handlers[kind] = _Handler(
+            callback=callback,
+            priority=int(priority),
+            is_async=inspect.iscoroutinefunction(callback),
+            lock=lock
+        )
+
+    def add_periodic(self, kind: str, interval: float, callback: Callable,
+                     priority: int = EventPriority.MONITORING):
+        """注册周期性事件，按 interval 秒投递到队列"""
+        self.register(kind, callback, priority)
+        self.periodic.append((kind, interval))
+
+    def add_source(self, source: Callable[[], Awaitable]):
+        """注册长期运行的事件源协程(例如语音监听)"""
+        self.sources.append(source)
+
+    def submit(self, kind: str, payload: Any = None) -> bool:
+        """线程安全地投递事件，可从任意线程调用"""
+        if self.loop is None or self._stop is None or self._stop.is_set():
+            return False
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return self._enqueue(kind, payload)
+        self.loop.call_soon_threadsafe(self._enqueue, kind, payload)
+        return True
+
+    def _enqueue(self, kind: str, payload: Any) -> bool:
+        handler = self.handlers.get(kind)
+        if handler is None:
+            self.logger.warning(f"No handler registered for event '{kind}'")
+            return False
+        if self.queue.qsize() >= self.max_queue:
+            self.metrics['dropped'] += 1
+            return False
+        self.queue.put_nowait(Event(
+            priority=handler.priority,
+            seq=next(self._seq),
+            kind=kind,
+            payload=payload,
+            created=time.perf_counter()
+        ))
+        return True
+
+    async def _consume(self):
+        while True:
+            event = await self.queue.get()
+            try:
+                await self._dispatch(event)
+            finally:
+                self.queue.task_done()
+
+    async def _dispatch(self, event: Event):
+        handler = self.handlers[event.kind]
+        wait_ms = (time.perf_counter() - event.created) * 1000
+        stats = self.metrics['queue_wait_ms'].setdefault(event.kind, {'last': 0.0, 'max': 0.0})
+        stats['last'] = wait_ms
+        stats['max'] = max(stats['max'], wait_ms)
+        try:
+            if handler.lock is not None:
+                async with handler.lock:
+                    await self._call(handler, event.payload)
+            else:
+                await self._call(handler, event.payload)
+            processed = self.metrics['processed']
+            processed[event.kind] = processed.get(event.kind, 0) + 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            failed = self.metrics['failed']
+            failed[event.kind] = failed.get(event.kind, 0) + 1
+            self.logger.error(f"Event '{event.kind}' failed: {str(e)}")
+
+    async def _call(self, handler: _Handler, payload: Any):
+        if handler.is_async:
+            await handler.callback(payload)
+        else:
+            await self.loop.run_in_executor(self.executor, handler.callback, payload)
+
+    async def _tick(self, kind: str, interval: float):
+        next_time = self.loop.time()
+        while True:
+            next_time += interval
+            self._enqueue(kind, None)
+            await asyncio.sleep(max(0.0, next_time - self.loop.time()))
+
+    async def _measure_lag(self):
+        """测量事件循环延迟：实际唤醒时间与预期时间之差"""
+        while True:
+            start = self.loop.time()
+            await asyncio.sleep(self.lag_interval)
+            lag_ms = max(0.0, (self.loop.time() - start - self.lag_interval) * 1000)
+            self._lag_samples.append(lag_ms)
+            lag = self.metrics['loop_lag_ms']
+            lag['last'] = lag_ms
+            lag['max'] = max(lag['max'], lag_ms)
+            lag['mean'] = sum(self._lag_samples) / len(self._lag_samples)
+
+    async def _run_source(self, source: Callable[[], Awaitable]):
+        try:
+            await source()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Event source failed: {str(e)}")
+
+    def get_metrics(self) -> Dict:
+        """获取调度器指标"""
+        return {
+            **self.metrics,
+            'queue_depth': self.queue.qsize() if self.queue is not None else 0
+        }
+
+    def stop(self):
+        """请求停止(线程安全)"""
+        if self.loop is not None and self._stop is not None:
+            self.loop.call_soon_threadsafe(self._stop.set)
+
+    async def run(self, install_signal_handlers: bool = True):
+        """运行直到 stop() 被调用或收到 SIGINT/SIGTERM"""
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.PriorityQueue()
+        self._stop = asyncio.Event()
+
+        if install_signal_handlers:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    self.loop.add_signal_handler(sig, self._stop.set)
+                except (NotImplementedError, RuntimeError, ValueError):
+                    pass  # Windows 或非主线程
+
+        self._tasks = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._measure_lag()))
+        self._tasks.extend(asyncio.create_task(self._tick(kind, interval))
+                           for kind, interval in self.periodic)
+        self._tasks.extend(asyncio.create_task(self._run_source(source))
+                           for source in self.sources)
+
+        try:
+            await self._stop.wait()
+        finally:
+            await self._shutdown()
+
+    async def _shutdown(self):
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if hasattr(self.loop, 'remove_signal_handler'):
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    self.loop.remove_signal_handler(sig)
+                except (NotImplementedError, RuntimeError, ValueError):
+                    pass
@@ -2,6 +2,7 @@ from typing import Dict, List, Optional
 from models.memory.memory_core import MemoryCore
 from models.nlu.language_manager import LanguageManager
 from models.autonomous_learning.learning_core import AutonomousLearner
+from utils.logging import get_logger
 import logging
 
 class SystemManager:
@@ -12,15 +13,7 @@ class SystemManager:
         self.logger = self._setup_logger()
         
     def _setup_logger(self) -> logging.Logger:
-        logger = logging.getLogger('system_manager')
-        logger.setLevel(logging.DEBUG)
-        handler = logging.FileHandler('logs/system.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        return logger
+        return get_logger('system_manager', 'system.log')
         
     def process_text(self, text: str, context: Optional[Dict] = None) -> Dict:
         """处理文本输入"""
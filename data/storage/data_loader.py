@@ -1,10 +1,17 @@
 import os
+import io
+import wave
+import tempfile
+import threading
 import pyttsx3 # type: ignore
 import PyPDF2 # type: ignore
 import speech_recognition as sr
+from data.storage.data_cleaning import DataCleaning
+from data.storage.page_prefetcher import PagePrefetcher
+from utils.caching import get_page_cache
 
 class PDFVoiceReader:
-    def __init__(self):
+    def __init__(self, prefetch_depth=2, prefetch_max_bytes=64 * 1024 * 1024, prerender_audio=True):
         # 初始化语音引擎
         self.engine = pyttsx3.init()
         # 初始化语音识别器
@@ -15,6 +22,20 @@ class PDFVoiceReader:
         self.current_page = 0
         # PDF文件路径
         self.pdf_path = None
+        # 提取并清洗后的页面文本缓存(按文件内容哈希)，重新打开读过的PDF时不再提取
+        self.cleaner = DataCleaning()
+        self.text_cache = get_page_cache('pypdf2-clean')
+        # 后台预读：朗读当前页时提取后续页面并预渲染语音
+        # (后台线程使用独立的 PdfReader 和语音引擎，不与前台共享)
+        self.prefetcher = PagePrefetcher(
+            self._prefetch_page,
+            self._render_speech if prerender_audio else None,
+            depth=prefetch_depth,
+            max_bytes=prefetch_max_bytes
+        )
+        self._prefetch_document = None
+        self._render_engine = None
+        self._stop_playback = threading.Event()
         # 语音命令映射
         self.commands = {
             "开始阅读": self.start_reading,
@@ -28,9 +49,11 @@ class PDFVoiceReader:
         """加载PDF文件"""
         try:
             if os.path.exists(pdf_path):
+                self.prefetcher.cancel()
                 self.pdf_path = pdf_path
                 self.pdf_document = PyPDF2.PdfReader(open(pdf_path, 'rb'))
                 self.current_page = 0
+                self.prefetcher.start()
                 print(f"PDF文件加载成功，共{len(self.pdf_document.pages)}页")
                 return True
             else:
@@ -44,19 +67,78 @@ class PDFVoiceReader:
         """读取当前页面内容"""
         if self.pdf_document and self.current_page < len(self.pdf_document.pages):
             try:
-                page = self.pdf_document.pages[self.current_page]
-                text = page.extract_text()
-                return text
+                return self._extract_page(self.pdf_document, self.pdf_path, self.current_page)
             except Exception as e:
                 print(f"读取页面时出错: {str(e)}")
                 return None
         return None
 
+    def _extract_page(self, document, pdf_path, page_number):
+        """提取并清洗页面文本(经过磁盘缓存)"""
+        return self.text_cache.get_or_extract(
+            pdf_path, page_number, len(document.pages),
+            lambda: self.cleaner.clean_pdf_text(document.pages[page_number].extract_text() or '')
+        )
+
+    def _prefetch_page(self, page_number):
+        """在预读线程中提取页面，使用独立的 PdfReader(PdfReader 不是线程安全的)"""
+        pdf_path = self.pdf_path
+        if self._prefetch_document is None or self._prefetch_document[0] != pdf_path:
+            self._prefetch_document = (pdf_path, PyPDF2.PdfReader(pdf_path))
+        return self._extract_page(self._prefetch_document[1], pdf_path, page_number)
+
+    def _render_speech(self, text):
+        """在预读线程中把文本渲染为 WAV 数据，失败时返回 None(朗读时改为实时合成)"""
+        if self._render_engine is None:
+            # pyttsx3.init() 按驱动返回同一个引擎，预渲染需要独立实例
+            self._render_engine = pyttsx3.Engine()
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            self._render_engine.save_to_file(text, path)
+            self._render_engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read() or None
+        finally:
+            os.remove(path)
+
+    def _play_audio(self, audio):
+        """播放预渲染的 WAV 数据，无法播放时返回 False"""
+        try:
+            import pyaudio # type: ignore
+            with wave.open(io.BytesIO(audio)) as wav:
+                player = pyaudio.PyAudio()
+                stream = player.open(
+                    format=player.get_format_from_width(wav.getsampwidth()),
+                    channels=wav.getnchannels(),
+                    rate=wav.getframerate(),
+                    output=True
+                )
+                self._stop_playback.clear()
+                try:
+                    data = wav.readframes(1024)
+                    while data and not self._stop_playback.is_set():
+                        stream.write(data)
+                        data = wav.readframes(1024)
+                finally:
+                    stream.stop_stream()
+                    stream.close()
+                    player.terminate()
+            return True
+        except Exception as e:
+            print(f"播放预渲染语音失败，改为实时合成: {str(e)}")
+            return False
+
     def start_reading(self):
         """开始阅读当前页面"""
-        text = self.read_current_page()
+        prefetched = self.prefetcher.get(self.current_page)
+        text = prefetched.text if prefetched and prefetched.text else self.read_current_page()
         if text:
             print(f"正在阅读第{self.current_page + 1}页")
+            # 朗读期间后台预读后续页面
+            self.prefetcher.update(self.current_page, len(self.pdf_document.pages))
+            if prefetched and prefetched.audio and self._play_audio(prefetched.audio):
+                return
             self.engine.say(text)
             self.engine.runAndWait()
         else:
@@ -64,6 +146,7 @@ class PDFVoiceReader:
 
     def stop_reading(self):
         """停止阅读"""
+        self._stop_playback.set()
         self.engine.stop()
         print("已停止阅读")
 
@@ -90,6 +173,8 @@ class PDFVoiceReader:
         if self.pdf_document:
             page_number = int(page_number) - 1
             if 0 <= page_number < len(self.pdf_document.pages):
+                # 跳页后原来的预读结果不再需要
+                self.prefetcher.cancel()
                 self.current_page = page_number
                 print(f"已跳转到第{page_number + 1}页")
                 self.start_reading()
@@ -152,6 +237,7 @@ class PDFVoiceReader:
                     print("请先加载PDF文件")
             elif choice == "3":
                 print("感谢使用，再见！")
+                self.prefetcher.stop()
                 break
             else:
                 print("无效的选项")
@@ -0,0 +1,190 @@
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+import threading
+import logging
+
+class PrefetchedPage(NamedTuple):
+    """预取完成的页面：清洗后的文本和预渲染的语音(未渲染时为 None)"""
+    page_number: int
+    text: Optional[str]
+    audio: Optional[bytes]
+    nbytes: int
+
+class PagePrefetcher:
+    """
+    页面预读
+
+    后台线程按顺序提取当前页之后 depth 页的文本，并可选地预渲染语音，
+    朗读当前页时下一页已经准备好，翻页不再等待提取。
+        - update(current_page, page_count) 设置预读窗口，窗口外的结果和排队任务立即丢弃
+          (正在提取的页完成后若已不在窗口内也会丢弃)
+        - cancel() 清空窗口，用于跳页/重新加载文档
+        - get() 取的页正在提取或渲染时，该页被标记为已认领，后台线程完成后把结果直接交给等待方
+        - 已预取内容(文本 + 语音)的总字节数不超过 max_bytes，达到上限时暂停预取，
+          语音会超出上限时只保留文本
+    """
+    def __init__(
+        self,
+        extract: Callable[[int], Optional[str]],
+        render: Optional[Callable[[str], Optional[bytes]]] = None,
+        depth: int = 2,
+        max_bytes: int = 64 * 1024 * 1024
+    ):
+        self.extract = extract
+        self.render = render
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger('page_prefetcher')
+
+        self._cond = threading.Condition()
+        self._window: List[int] = []
+        self._ready: Dict[int, PrefetchedPage] = {}
+        self._in_progress: Optional[int] = None
+        # 被 get() 认领的正在处理的页，完成后结果放入 _handoff 交给等待方(不计入 _bytes)
+        self._claimed: Set[int] = set()
+        self._handoff: Dict[int, PrefetchedPage] = {}
+        self._bytes = 0
+        # cancel() 时递增，取消前开始提取的页即使仍在新窗口内也会丢弃(可能属于已卸载的文档)
+        self._epoch = 0
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    # ---------- 控制 ----------
+
+    def start(self):
+        """启动预取线程"""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='page-prefetch', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """停止预取线程(正在提取的页会先完成)"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def update(self, current_page: int, page_count: int):
+        """把预读窗口设为 current_page 之后的 depth 页"""
+        window = list(range(current_page + 1, min(current_page + 1 + self.depth, page_count)))
+        with self._cond:
+            self._set_window(window)
+
+    def cancel(self):
+        """取消全部预取"""
+        with self._cond:
+            self._epoch += 1
+            self._set_window([])
+
+    def _set_window(self, window: List[int]):
+        self._window = window
+        for page_number in [n for n in self._ready if n not in window]:
+            self._bytes -= self._ready.pop(page_number).nbytes
+            self.discarded += 1
+        self._cond.notify_all()
+
+    # ---------- 读取 ----------
+
+    def get(self, page_number: int, timeout: float = 30.0) -> Optional[PrefetchedPage]:
+        """
+        取出预取的页面
+
+        该页正在提取或渲染时认领它并等待后台线程交付结果，未预取时返回 None(由调用方同步提取)。
+        """
+        with self._cond:
+            # 取走的页由调用方处理，不再预取
+            if page_number in self._window:
+                self._window.remove(page_number)
+            page = self._ready.pop(page_number, None)
+            if page is not None:
+                self._bytes -= page.nbytes
+            elif self._in_progress == page_number:
+                self._claimed.add(page_number)
+                self._cond.wait_for(
+                    lambda: page_number in self._handoff or self._in_progress != page_number
+                    or self._stopped,
+                    timeout
+                )
+                self._claimed.discard(page_number)
+                page = self._handoff.pop(page_number, None)
+            if page is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._cond.notify_all()
+            return page
+
+    # ---------- 后台线程 ----------
+
+    def _next_page(self) -> Optional[int]:
+        if self._bytes >= self.max_bytes:
+            return None
+        for page_number in self._window:
+            if page_number not in self._ready:
+                return page_number
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._stopped or self._next_page() is not None)
+                if self._stopped:
+                    return
+                page_number = self._next_page()
+                self._in_progress = page_number
+                epoch = self._epoch
+
+            try:
+                text = self.extract(page_number)
+            except Exception as e:
+                self.logger.error(f"Prefetch of page {page_number} failed: {str(e)}")
+                text = None
+
+            audio = None
+            with self._cond:
+                wanted = page_number in self._window and epoch == self._epoch
+                text_bytes = len(text.encode('utf-8')) if text else 0
+            if wanted and text and self.render is not None:
+                try:
+                    audio = self.render(text)
+                except Exception as e:
+                    self.logger.error(f"Speech pre-render of page {page_number} failed: {str(e)}")
+
+            with self._cond:
+                self._in_progress = None
+                if epoch != self._epoch:
+                    self.discarded += 1
+                elif page_number in self._claimed:
+                    # 等待方已认领：直接交付(认领发生在渲染期间时包含预渲染的语音)
+                    self._claimed.discard(page_number)
+                    nbytes = text_bytes + (len(audio) if audio else 0)
+                    self._handoff[page_number] = PrefetchedPage(page_number, text, audio, nbytes)
+                elif page_number in self._window:
+                    if audio is not None and self._bytes + text_bytes + len(audio) > self.max_bytes:
+                        audio = None
+                    nbytes = text_bytes + (len(audio) if audio else 0)
+                    self._ready[page_number] = PrefetchedPage(page_number, text, audio, nbytes)
+                    self._bytes += nbytes
+                else:
+                    self.discarded += 1
+                self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                'window': list(self._window),
+                'ready': sorted(self._ready),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'discarded': self.discarded
+            }
@@ -8,10 +8,12 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'  # 禁用 TensorFlow 警告
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'  # 禁用 oneDNN 消息
 import numpy as np
 import time
+import asyncio
 import logging
+import threading
 from typing import Dict, Optional, Any  # 添加这行
-import tensorflow as tf # type: ignore
-from models.autonomous_learning.learning_robot import AutonomousLearningRobot # type: ignore
+from core.event_loop import EventScheduler, EventPriority
+# TensorFlow 和学习机器人只在需要时导入(见 RealTimeLearningSystem.robot)
 # 只在需要时导入
 # from voice_interface import VoiceInterface  # 暂时注释掉
 
@@ -61,11 +63,8 @@ class RealTimeLearningSystem:
     def __init__(self):
         print("初始化实时学习系统...")
         try:
-            print("- 创建机器人...")
-            self.robot = AutonomousLearningRobot(
-                state_space=10,  # 状态空间大小
-                action_space=4   # 动作空间大小
-            )
+            # 机器人首次使用时才创建，避免启动时导入 TensorFlow
+            self._robot = None
             print("- 创建监控器...")
             self.monitor = LearningMonitor()
             print("- 创建修复系统...")
@@ -76,6 +75,11 @@ class RealTimeLearningSystem:
             # 语音接口相关
             self.voice = None
             self.voice_enabled = False
+
+            # 事件调度器在 run 期间创建
+            self.scheduler: Optional[EventScheduler] = None
+            self.monitor_interval = 1.0
+            self.last_results: Dict[str, Any] = {}
             
             print("- 设置日志...")
             self._setup_logging()
@@ -84,6 +88,18 @@ class RealTimeLearningSystem:
             print(f"初始化错误: {str(e)}")
             raise
 
+    @property
+    def robot(self):
+        """学习机器人(首次访问时创建)"""
+        if self._robot is None:
+            print("- 创建机器人...")
+            from models.autonomous_learning.learning_robot import AutonomousLearningRobot
+            self._robot = AutonomousLearningRobot(
+                state_space=10,  # 状态空间大小
+                action_space=4   # 动作空间大小
+            )
+        return self._robot
+
     def _setup_logging(self):
         """设置日志系统"""
         logging.basicConfig(
@@ -108,14 +124,85 @@ class RealTimeLearningSystem:
             return True
         return False
 
+    # ---------- 事件处理 ----------
+
+    def submit_text(self, text: str) -> bool:
+        """提交文本交互(线程安全，可由 API 线程调用)"""
+        return self.scheduler is not None and self.scheduler.submit('api', text)
+
+    def submit_experience(self, *experience) -> bool:
+        """提交一次学习步骤(state, action, reward, next_state)"""
+        return self.scheduler is not None and self.scheduler.submit('learn', experience)
+
+    def stop(self):
+        """请求停止主循环(线程安全)"""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+    def _handle_text(self, text: str):
+        """处理语音或 API 文本输入"""
+        self.last_results['text'] = self.nlp.process_text(text)
+
+    def _handle_learning_step(self, experience):
+        """执行一次学习步骤"""
+        self.robot.learn(*experience)
+
+    def _monitor_tick(self, _=None):
+        """监控心跳：汇总调度器指标并检查系统健康"""
+        self.monitor.update_metrics({
+            'uptime': time.time() - self.monitor.start_time,
+            'event_loop': self.scheduler.get_metrics()
+        })
+        self.repair.repair_if_needed()
+
+    def _voice_listener(self, scheduler: EventScheduler, stopped: threading.Event):
+        """语音监听线程：阻塞监听，识别结果投递为高优先级事件"""
+        while not stopped.is_set() and self.voice_enabled and self.voice is not None:
+            text = self.voice.start_listening()
+            if text and not stopped.is_set():
+                scheduler.submit('voice', text)
+
+    async def _voice_source(self):
+        """
+        语音事件源
+
+        监听在守护线程中进行：listen() 无法取消，放在 asyncio.to_thread 中会让
+        asyncio.run 退出时一直等待默认线程池。停止时只通知线程，不等待它返回。
+        """
+        stopped = threading.Event()
+        listener = threading.Thread(
+            target=self._voice_listener,
+            args=(self.scheduler, stopped),
+            name='voice-listener',
+            daemon=True
+        )
+        listener.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            stopped.set()
+
+    async def run_async(self):
+        """事件驱动的主循环，直到 stop() 或收到 SIGINT/SIGTERM"""
+        self.scheduler = EventScheduler()
+        # 语音和 API 输入都调用 nlp.process_text，共用一把锁
+        self.scheduler.register('voice', self._handle_text, EventPriority.VOICE, resource='nlp')
+        self.scheduler.register('api', self._handle_text, EventPriority.API, resource='nlp')
+        self.scheduler.register('learn', self._handle_learning_step, EventPriority.LEARNING)
+        self.scheduler.add_periodic('monitor', self.monitor_interval, self._monitor_tick)
+        if self.voice_enabled:
+            self.scheduler.add_source(self._voice_source)
+        try:
+            await self.scheduler.run()
+        finally:
+            self.scheduler = None
+
     def run(self):
         """运行系统"""
         try:
             print("系统开始运行...")
-            # 主要学习逻辑
-            while True:
-                # 系统主循环
-                time.sleep(1)  # 防止CPU占用过高
+            asyncio.run(self.run_async())
+            print("系统已停止")
                 
         except KeyboardInterrupt:
             print("\n系统收到停止信号，正在关闭...")
@@ -393,6 +480,7 @@ if __name__ == "__main__":
 
 from api.core.api_manager import APIManager
 from api.routes.api_routes import APIRoutes
+from api.voice_interaction_api import VoiceInteractionAPI
 from core.system_manager import SystemManager
 import asyncio
 import signal
@@ -403,9 +491,11 @@ class MainSystem:
         self.system_manager = SystemManager()
         self.api_manager = APIManager()
         self.api_routes = APIRoutes(self.system_manager)
+        self.voice_api = VoiceInteractionAPI(self.system_manager)
         
         # 注册由
-        self.api_manager.app.include_router(self.api_routes.router)
+        self.api_manager.include_router(self.api_routes.router)
+        self.api_manager.include_router(self.voice_api.router)
         
         # 注册信号处理
         signal.signal(signal.SIGINT, self.handle_shutdown)
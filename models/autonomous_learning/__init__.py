@@ -1,3 +1,4 @@
 from .learning_core import AutonomousLearner
+from .replay_buffer import ReplayBuffer, PrioritizedReplayBuffer, Batch
 
-__all__ = ['AutonomousLearner']
+__all__ = ['AutonomousLearner', 'ReplayBuffer', 'PrioritizedReplayBuffer', 'Batch']
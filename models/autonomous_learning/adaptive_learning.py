@@ -1,22 +1,40 @@
 import numpy as np # type: ignore
 from typing import Dict, List, Optional
-import tensorflow as tf # type: ignore
-from sklearn.cluster import KMeans # type: ignore
+from utils.lazy_imports import lazy_import
+
+tf = lazy_import('tensorflow')
+sklearn_cluster = lazy_import('sklearn.cluster')
 
 class AdaptiveLearner:
-    def __init__(self):
+    def __init__(self, streaming: bool = True, n_clusters: int = 8, reservoir_size: int = 5000):
         self.clusters = None
         self.learning_rate = 0.01
+        # 流式模式下为触发完整重训的质心相对漂移阈值
         self.adaptation_threshold = 0.7
+        self.streaming = streaming
+        self.n_clusters = n_clusters
         self.model = self._build_adaptive_model()
+
+        # 上次完整重训时的质心，漂移相对于它计算
+        self.reference_centers: Optional[np.ndarray] = None
+        self.reference_scale = 1.0
+        self.last_drift = 0.0
+        self.retrain_count = 0
+        self.batches_seen = 0
+        # 蓄水池采样保存有界的历史样本，漂移时用于重训
+        self.reservoir_size = reservoir_size
+        self.reservoir: Optional[np.ndarray] = None
+        self.reservoir_count = 0
+        self.samples_seen = 0
+        self.rng = np.random.default_rng()
         
-    def _build_adaptive_model(self) -> tf.keras.Model:
+    def _build_adaptive_model(self) -> 'tf.keras.Model':
         """构建自适应模型"""
         model = tf.keras.Sequential([
             tf.keras.layers.Dense(64, activation='relu', input_shape=(50,)),
             tf.keras.layers.Dense(32, activation='relu'),
             tf.keras.layers.Dense(16, activation='relu'),
-            tf.keras.layers.Dense(8, activation='softmax')
+            tf.keras.layers.Dense(self.n_clusters, activation='softmax')
         ])
         
         model.compile(
@@ -29,20 +47,115 @@ class AdaptiveLearner:
         
     def adapt_to_new_data(self, data: np.ndarray, labels: np.ndarray):
         """适应新数据"""
+        if self.streaming:
+            return self._adapt_streaming(data)
+
         # 聚类分析
         if self.clusters is None:
-            self.clusters = KMeans(n_clusters=8)
+            self.clusters = sklearn_cluster.KMeans(n_clusters=self.n_clusters)
             self.clusters.fit(data)
             
         # 更新模型
         cluster_labels = self.clusters.predict(data)
         self.model.fit(
             data,
-            tf.keras.utils.to_categorical(cluster_labels),
+            tf.keras.utils.to_categorical(cluster_labels, num_classes=self.n_clusters),
             epochs=5,
             batch_size=32,
             verbose=0
         )
+
+    def _adapt_streaming(self, data: np.ndarray) -> Dict:
+        """
+        流式适应：MiniBatchKMeans.partial_fit 增量更新质心，
+        质心漂移未超过 adaptation_threshold 时新数据只训练一个 epoch，
+        超过时在蓄水池样本上完整重训并重置参照质心。每批开销与历史数据量无关。
+        """
+        data = np.asarray(data, dtype=np.float32)
+        self.batches_seen += 1
+        if self.clusters is None:
+            self._update_reservoir(data)
+            if self.reservoir_count < self.n_clusters:
+                return {'status': 'warming_up', 'samples': self.reservoir_count}
+            self._retrain()
+            return {'status': 'initialized', 'drift': 0.0}
+
+        # 样本数少于簇数时簇均值噪声过大，不做漂移判断
+        if len(data) >= self.n_clusters:
+            self.last_drift = self._centroid_drift(data)
+        if len(data) >= self.n_clusters and self.last_drift > self.adaptation_threshold:
+            # 分布已变化：蓄水池只保留新分布的数据，重建聚类并完整重训
+            self.reservoir_count = 0
+            self.samples_seen = 0
+            self._update_reservoir(data)
+            self._retrain()
+            return {'status': 'retrained', 'drift': self.last_drift}
+
+        self._update_reservoir(data)
+        self.clusters.partial_fit(data)
+        self._fit(data, epochs=1)
+        return {'status': 'incremental', 'drift': self.last_drift}
+
+    def _retrain(self):
+        """在蓄水池样本上重建聚类、记录参照质心并完整训练模型"""
+        samples = self.reservoir[:self.reservoir_count]
+        self.clusters = sklearn_cluster.MiniBatchKMeans(n_clusters=self.n_clusters, n_init=3)
+        self.clusters.partial_fit(samples)
+        self._set_reference()
+        self._fit(samples, epochs=5)
+        self.retrain_count += 1
+
+    def _set_reference(self):
+        """记录参照质心和簇的典型半径(样本到最近质心的均方根距离)"""
+        self.reference_centers = self.clusters.cluster_centers_.copy()
+        samples = self.reservoir[:self.reservoir_count]
+        self.reference_scale = float(np.sqrt(-self.clusters.score(samples) / len(samples))) + 1e-8
+
+    def _centroid_drift(self, data: np.ndarray) -> float:
+        """
+        新批次的簇质心相对参照质心的加权平均位移，以簇半径为单位
+
+        直接用本批数据计算各簇均值，不受 MiniBatchKMeans 累计计数导致的
+        质心更新越来越慢的影响，分布变化在一两个批次内即可检测到。
+        """
+        distances = ((data[:, None, :] - self.reference_centers[None, :, :]) ** 2).sum(axis=2)
+        assignments = distances.argmin(axis=1)
+        counts = np.bincount(assignments, minlength=self.n_clusters)
+        sums = np.zeros_like(self.reference_centers)
+        np.add.at(sums, assignments, data)
+        present = counts > 0
+        means = sums[present] / counts[present, None]
+        shift = np.linalg.norm(means - self.reference_centers[present], axis=1)
+        return float((shift * counts[present]).sum() / counts.sum() / self.reference_scale)
+
+    def _fit(self, data: np.ndarray, epochs: int):
+        cluster_labels = self.clusters.predict(data)
+        self.model.fit(
+            data,
+            tf.keras.utils.to_categorical(cluster_labels, num_classes=self.n_clusters),
+            epochs=epochs,
+            batch_size=32,
+            verbose=0
+        )
+
+    def _update_reservoir(self, data: np.ndarray):
+        """蓄水池采样(Algorithm R)，保持对全部历史数据的均匀样本"""
+        if self.reservoir is None:
+            self.reservoir = np.empty((self.reservoir_size, data.shape[1]), dtype=np.float32)
+        free = self.reservoir_size - self.reservoir_count
+        head = data[:free]
+        self.reservoir[self.reservoir_count:self.reservoir_count + len(head)] = head
+        self.reservoir_count += len(head)
+        self.samples_seen += len(head)
+
+        rest = data[free:] if free > 0 else data
+        if len(rest) == 0:
+            return
+        positions = self.samples_seen + np.arange(1, len(rest) + 1)
+        slots = (self.rng.random(len(rest)) * positions).astype(np.int64)
+        keep = slots < self.reservoir_size
+        self.reservoir[slots[keep]] = rest[keep]
+        self.samples_seen += len(rest)
         
     def evaluate_adaptation(self, test_data: np.ndarray) -> float:
         """评估适应性"""
@@ -55,5 +168,10 @@ class AdaptiveLearner:
         return {
             'learning_rate': self.learning_rate,
             'adaptation_threshold': self.adaptation_threshold,
-            'cluster_centers': self.clusters.cluster_centers_.tolist() if self.clusters else None
+            'cluster_centers': self.clusters.cluster_centers_.tolist() if self.clusters else None,
+            'streaming': self.streaming,
+            'last_drift': self.last_drift,
+            'retrain_count': self.retrain_count,
+            'batches_seen': self.batches_seen,
+            'samples_seen': self.samples_seen
         } 
\ No newline at end of file
@@ -0,0 +1,233 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import threading
+import logging
+import shutil
+import json
+import time
+import os
+import numpy as np # type: ignore
+from models.autonomous_learning.replay_buffer import PrioritizedReplayBuffer
+
+_REPLAY_FIELDS = ('states', 'actions', 'rewards', 'next_states', 'dones')
+
+class CheckpointManager:
+    """
+    学习机器人的检查点管理
+
+    每个检查点是 root 下的一个目录 ckpt-<step>，包含:
+        weights.npz / optimizer.npz    模型权重和优化器状态
+        replay/<field>.npy             回放缓冲区各字段(PER 还有 priorities.npy)
+        meta.json                      探索率、步数、缓冲区位置等
+    先写入临时目录再 rename，最后原子替换 latest 指针，崩溃时不会留下半个检查点。
+    同一步数的旧检查点先改名移到一边，latest 指针更新后才删除；淘汰按写入顺序进行，
+    不会删除 latest 指向的检查点(恢复到较早步数后重新保存的检查点也会保留)。
+    恢复时回放数组以 mmap_mode='c'(写时复制)打开，不需要把整个缓冲区读进内存。
+    """
+    def __init__(self, root: str, keep: int = 3):
+        self.root = root
+        self.keep = keep
+        self.logger = logging.getLogger('checkpoint_manager')
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='checkpoint')
+        self._pending: Optional[Future] = None
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    # ---------- 保存 ----------
+
+    def _capture(self, robot) -> Dict[str, Any]:
+        """在调用线程中复制需要保存的状态(只做内存拷贝，很快)"""
+        memory = robot.memory
+        size = len(memory)
+        replay = {name: np.array(getattr(memory, name)[:size]) for name in _REPLAY_FIELDS}
+        meta = {
+            'step': robot.steps,
+            'epsilon': robot.epsilon,
+            'state_space': robot.state_space,
+            'action_space': robot.action_space,
+            'replay': {
+                'capacity': memory.capacity,
+                'position': memory.position,
+                'size': size,
+                'prioritized': isinstance(memory, PrioritizedReplayBuffer)
+            },
+            'timestamp': time.time()
+        }
+        if isinstance(memory, PrioritizedReplayBuffer):
+            replay['priorities'] = memory.tree.get(np.arange(size))
+            meta['replay'].update({'beta': memory.beta, 'max_priority': memory.max_priority})
+        return {'model': robot.learner.get_state(), 'replay': replay, 'meta': meta}
+
+    def _write(self, snapshot: Dict[str, Any]) -> str:
+        step = snapshot['meta']['step']
+        final_path = os.path.join(self.root, f"ckpt-{step:010d}")
+        tmp_path = os.path.join(self.root, f".tmp-ckpt-{step:010d}-{os.getpid()}-{threading.get_ident()}")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(os.path.join(tmp_path, 'replay'))
+
+        np.savez(os.path.join(tmp_path, 'weights.npz'), *snapshot['model']['weights'])
+        np.savez(os.path.join(tmp_path, 'optimizer.npz'), *snapshot['model']['optimizer'])
+        for name, array in snapshot['replay'].items():
+            np.save(os.path.join(tmp_path, 'replay', f'{name}.npy'), array)
+        with open(os.path.join(tmp_path, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(snapshot['meta'], f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+        old_path = None
+        if os.path.exists(final_path):
+            old_path = os.path.join(
+                self.root, f".old-{os.path.basename(final_path)}-{os.getpid()}-{threading.get_ident()}"
+            )
+            os.rename(final_path, old_path)
+        os.rename(tmp_path, final_path)
+        self._set_latest(os.path.basename(final_path))
+        if old_path is not None:
+            shutil.rmtree(old_path, ignore_errors=True)
+        self._prune()
+        return final_path
+
+    def _set_latest(self, name: str):
+        pointer = os.path.join(self.root, 'latest')
+        tmp = pointer + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, pointer)
+
+    def _prune(self):
+        """按写入顺序保留最近 keep 个检查点，latest 指向的检查点始终保留"""
+        if not self.keep:
+            return
+        current = self._read_latest()
+        for name in self.list_checkpoints()[:-self.keep]:
+            if name != current:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def save(self, robot) -> str:
+        """同步保存检查点，返回检查点目录"""
+        return self._write(self._capture(robot))
+
+    def save_async(self, robot) -> Optional[Future]:
+        """
+        异步保存检查点
+
+        状态在调用线程中复制后交给后台线程写盘，训练无需等待 I/O。
+        上一个快照仍在写入时跳过本次，返回 None。
+        """
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return None
+            snapshot = self._capture(robot)
+            self._pending = self.executor.submit(self._write_logged, snapshot)
+            return self._pending
+
+    def _write_logged(self, snapshot: Dict[str, Any]) -> Optional[str]:
+        try:
+            return self._write(snapshot)
+        except Exception as e:
+            self.logger.error(f"Checkpoint write failed: {str(e)}")
+            return None
+
+    def wait(self, timeout: Optional[float] = None):
+        """等待正在进行的异步快照完成"""
+        if self._pending is not None:
+            self._pending.result(timeout)
+
+    # ---------- 恢复 ----------
+
+    def _written_at(self, name: str) -> float:
+        """检查点的写入时间(meta.json 最后写入)"""
+        path = os.path.join(self.root, name)
+        try:
+            return os.path.getmtime(os.path.join(path, 'meta.json'))
+        except OSError:
+            return os.path.getmtime(path)
+
+    def list_checkpoints(self) -> List[str]:
+        """全部检查点目录名，按写入顺序排列(最新的在最后)"""
+        names = [name for name in os.listdir(self.root) if name.startswith('ckpt-')]
+        written = {}
+        for name in names:
+            try:
+                written[name] = self._written_at(name)
+            except OSError:
+                continue
+        return sorted(written, key=lambda name: (written[name], name))
+
+    def _read_latest(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, 'latest'), 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def latest(self) -> Optional[str]:
+        """最近一个完整检查点的目录"""
+        name = self._read_latest()
+        if name is not None:
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                return path
+            # 替换同名检查点时在两次 rename 之间崩溃：移回被移到一边的旧版本
+            for aside in sorted(os.listdir(self.root)):
+                if aside.startswith(f".old-{name}-"):
+                    os.rename(os.path.join(self.root, aside), path)
+                    return path
+        checkpoints = self.list_checkpoints()
+        return os.path.join(self.root, checkpoints[-1]) if checkpoints else None
+
+    def restore(self, robot, path: Optional[str] = None) -> Optional[Dict]:
+        """把检查点恢复到机器人，没有检查点时返回 None"""
+        path = path or self.latest()
+        if path is None:
+            return None
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta['state_space'] != robot.state_space:
+            raise ValueError(
+                f"状态维度不匹配: 检查点 {meta['state_space']}, 机器人 {robot.state_space}"
+            )
+
+        robot.learner.load_model(path)
+        self._restore_replay(robot.memory, os.path.join(path, 'replay'), meta['replay'])
+        robot.epsilon = meta['epsilon']
+        robot.steps = meta['step']
+        self.logger.info(f"Restored checkpoint {path}")
+        return meta
+
+    def _restore_replay(self, memory, directory: str, info: Dict):
+        size = info['size']
+        capacity = memory.capacity
+        priorities_path = os.path.join(directory, 'priorities.npy')
+        if size == capacity and info['capacity'] == capacity:
+            # 缓冲区已满且容量一致：直接映射文件，按页按需读入
+            for name in _REPLAY_FIELDS:
+                setattr(memory, name, np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='c'))
+            memory.position = info['position']
+            memory.size = size
+            order = np.arange(size)
+        else:
+            # 容量不同或未满：按时间顺序拷贝最新的部分
+            chronological = np.arange(size)
+            if size == info['capacity']:
+                chronological = (info['position'] + chronological) % size
+            order = chronological[max(0, size - capacity):]
+            for name in _REPLAY_FIELDS:
+                source = np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+                getattr(memory, name)[:len(order)] = source[order]
+            memory.position = len(order) % capacity
+            memory.size = len(order)
+
+        if isinstance(memory, PrioritizedReplayBuffer):
+            memory.tree.tree[:] = 0.0
+            if os.path.exists(priorities_path):
+                memory.tree.update(np.arange(memory.size), np.load(priorities_path)[order])
+                memory.beta = info.get('beta', memory.beta)
+                memory.max_priority = info.get('max_priority', memory.max_priority)
+            else:
+                memory.tree.update(
+                    np.arange(memory.size),
+                    np.full(memory.size, memory.max_priority ** memory.alpha)
+                )
@@ -0,0 +1,31 @@
+from typing import Optional, Tuple
+import numpy as np # type: ignore
+
+class ContextualBanditEnv:
+    """
+    上下文老虎机环境(用于驱动和基准测试学习机器人)
+
+    状态为 [0, 1) 均匀随机向量，选中 argmax(state[:action_space]) 对应的动作时奖励为 1，
+    否则为 0。每 episode_length 步结束一个回合。
+
+    环境接口: reset() -> state，step(action) -> (next_state, reward, done)
+    """
+    def __init__(self, state_dim: int = 10, action_space: int = 4,
+                 episode_length: int = 100, seed: Optional[int] = None):
+        self.state_dim = state_dim
+        self.action_space = action_space
+        self.episode_length = episode_length
+        self.rng = np.random.default_rng(seed)
+        self.state = np.zeros(state_dim, dtype=np.float32)
+        self.steps = 0
+
+    def reset(self) -> np.ndarray:
+        self.steps = 0
+        self.state = self.rng.random(self.state_dim, dtype=np.float32)
+        return self.state
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool]:
+        reward = float(int(action) == int(np.argmax(self.state[:self.action_space])))
+        self.steps += 1
+        self.state = self.rng.random(self.state_dim, dtype=np.float32)
+        return self.state, reward, self.steps >= self.episode_length
@@ -1,45 +1,156 @@
-import tensorflow as tf # type: ignore
 import numpy as np # type: ignore
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Any
+import os
+from utils.lazy_imports import lazy_import
+
+tf = lazy_import('tensorflow')
 
 class AutonomousLearner:
     def __init__(self, config: Optional[Dict] = None):
         self.config = config or {}
+        # jit_compile=True 时训练步骤使用 XLA 编译(CPU 上同样可用)
+        self.jit_compile = self.config.get('jit_compile', False)
         self._build_model()
-        self.loss_fn = tf.compat.v1.losses.sparse_softmax_cross_entropy
+        # 模型输出为 softmax 概率，逐样本损失用于奖励加权
+        self.loss_fn = tf.keras.losses.SparseCategoricalCrossentropy(reduction='none')
         self.optimizer = tf.keras.optimizers.Adam(learning_rate=0.001)
-        
+        self._train_step = None
+        self._state_dim: Optional[int] = None
+        # 最近一批的逐样本(奖励加权)损失，供优先经验回放更新优先级
+        self.last_sample_losses: Optional[np.ndarray] = None
+
     def _build_model(self):
         self.model = tf.keras.Sequential([
             tf.keras.layers.Dense(64, activation='relu'),
             tf.keras.layers.Dense(32, activation='relu'),
             tf.keras.layers.Dense(4, activation='softmax')
         ])
-        
+
+    def _build_train_step(self, state_dim: int):
+        """按状态维度构建固定签名的图编译训练步骤(只追踪一次)"""
+        if not self.model.built:
+            self.model.build((None, state_dim))
+        self.optimizer.build(self.model.trainable_variables)
+        model, loss_fn, optimizer = self.model, self.loss_fn, self.optimizer
+
+        @tf.function(
+            input_signature=[
+                tf.TensorSpec([None, state_dim], tf.float32),
+                tf.TensorSpec([None], tf.int32),
+                tf.TensorSpec([None], tf.float32),
+                tf.TensorSpec([None], tf.float32)
+            ],
+            jit_compile=self.jit_compile
+        )
+        def train_step(states, actions, rewards, weights):
+            with tf.GradientTape() as tape:
+                probs = model(states, training=True)
+                sample_losses = loss_fn(actions, probs) * rewards
+                loss = tf.reduce_mean(sample_losses * weights)
+            grads = tape.gradient(loss, model.trainable_variables)
+            optimizer.apply_gradients(zip(grads, model.trainable_variables))
+            return loss, sample_losses
+
+        self._state_dim = state_dim
+        self._train_step = train_step
+
     def predict_action(self, state: np.ndarray) -> int:
         if state.ndim == 1:
             state = state[np.newaxis, ...]
         logits = self.model(state)
         return np.argmax(logits.numpy())
-        
-    def train_on_batch(self, experiences: List[Tuple]):
-        """批量训练"""
-        states = np.array([exp[0] for exp in experiences])
-        actions = np.array([exp[1] for exp in experiences])
-        rewards = np.array([exp[2] for exp in experiences])
-        next_states = np.array([exp[3] for exp in experiences])
-        
-        with tf.GradientTape() as tape:
-            logits = self.model(states)
-            # 计算每个样本的损失
-            losses = self.loss_fn(actions, logits)
-            # 应用奖励权重并计算平均损失
-            weighted_losses = losses * tf.cast(rewards, tf.float32)
-            loss = tf.reduce_mean(weighted_losses)  # 添加这行，计算平均损失
-            
-        # 计算梯度并应用
-        grads = tape.gradient(loss, self.model.trainable_variables)
-        self.optimizer.apply_gradients(zip(grads, self.model.trainable_variables))
-        
+
+    def predict_actions(self, states: np.ndarray) -> np.ndarray:
+        """批量预测动作，一次前向传播"""
+        probs = self.model(np.asarray(states, dtype=np.float32), training=False)
+        return np.argmax(probs.numpy(), axis=1).astype(np.int32)
+
+    @staticmethod
+    def _is_per_experience(experiences: Any) -> bool:
+        """
+        判断经验是逐条形式 [(state, action, reward, ...), ...] 还是按字段形式 (states, actions, rewards, ...)
+
+        按形状区分(列表、元组、数组均可)：逐条形式的第一项至少有 3 个字段且第二个字段(动作)是标量；
+        按字段形式的第一项是 states，其元素是状态向量。
+        """
+        if not isinstance(experiences, (list, tuple)) or not experiences:
+            return False
+        first = experiences[0]
+        try:
+            return len(first) >= 3 and np.ndim(first[1]) == 0
+        except TypeError:
+            return False
+
+    def _as_arrays(self, experiences: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """把经验转换为 (states, actions, rewards) 数组，已是数组时不复制"""
+        if self._is_per_experience(experiences):
+            states = np.asarray([exp[0] for exp in experiences], dtype=np.float32)
+            actions = np.asarray([exp[1] for exp in experiences], dtype=np.int32)
+            rewards = np.asarray([exp[2] for exp in experiences], dtype=np.float32)
+        else:
+            states, actions, rewards = experiences[0], experiences[1], experiences[2]
+            states = np.asarray(states, dtype=np.float32)
+            actions = np.asarray(actions, dtype=np.int32)
+            rewards = np.asarray(rewards, dtype=np.float32)
+        return states, actions, rewards
+
+    def train_on_batch(self, experiences: Any, weights: Optional[np.ndarray] = None):
+        """
+        批量训练
+
+        Args:
+            experiences: (state, action, reward, next_state) 元组列表，
+                或按字段组织的数组 (states, actions, rewards, next_states)
+            weights: 逐样本权重(如优先经验回放的重要性采样权重)，
+                默认取 experiences.weights，两者都没有时为 1
+        """
+        states, actions, rewards = self._as_arrays(experiences)
+        if weights is None:
+            weights = getattr(experiences, 'weights', None)
+        if weights is None:
+            weights = np.ones(len(actions), dtype=np.float32)
+        if self._train_step is None:
+            self._build_train_step(states.shape[1])
+        loss, sample_losses = self._train_step(
+            states, actions, rewards, np.asarray(weights, dtype=np.float32)
+        )
+        self.last_sample_losses = sample_losses.numpy()
         # 返回标量损失值
-        return float(loss.numpy())  # 现在 loss 是一个标量
\ No newline at end of file
+        return float(loss)
+
+    def get_state(self) -> Dict[str, List[np.ndarray]]:
+        """获取模型权重和优化器状态(均为副本)"""
+        return {
+            'weights': [np.array(w) for w in self.model.get_weights()],
+            'optimizer': [np.array(v) for v in self.optimizer.variables]
+        }
+
+    def set_state(self, state: Dict[str, List[np.ndarray]]):
+        """恢复模型权重和优化器状态"""
+        weights = state['weights']
+        if self._train_step is None:
+            # 第一层权重的输入维度即状态维度
+            self._build_train_step(weights[0].shape[0])
+        self.model.set_weights(weights)
+        optimizer_values = state.get('optimizer') or []
+        if optimizer_values:
+            variables = self.optimizer.variables
+            if len(variables) != len(optimizer_values):
+                raise ValueError("Optimizer state does not match the model")
+            for variable, value in zip(variables, optimizer_values):
+                variable.assign(value)
+
+    def save_model(self, directory: str):
+        """保存权重和优化器状态到目录"""
+        os.makedirs(directory, exist_ok=True)
+        state = self.get_state()
+        np.savez(os.path.join(directory, 'weights.npz'), *state['weights'])
+        np.savez(os.path.join(directory, 'optimizer.npz'), *state['optimizer'])
+
+    def load_model(self, directory: str):
+        """从目录加载权重和优化器状态"""
+        state = {}
+        for name in ('weights', 'optimizer'):
+            with np.load(os.path.join(directory, f'{name}.npz')) as data:
+                state[name] = [data[f'arr_{i}'] for i in range(len(data.files))]
+        self.set_state(state)
@@ -0,0 +1,180 @@
+from typing import Dict, Optional
+import time
+import os
+import numpy as np # type: ignore
+
+class LearningHistory:
+    """
+    定长学习历史
+
+    最近 capacity 步的经验保存在预分配的 NumPy 环形数组中，旧记录被覆盖；
+    奖励均值/方差(Welford 算法)、最近 window 步的滑动均值和回合统计均为每步 O(1) 增量更新。
+    指定 spill_dir 时，环形数组每写满一轮就把这一轮压缩保存到磁盘，不丢失完整历史。
+    """
+    def __init__(self, capacity: int = 10000, state_dim: int = 10, window: int = 100,
+                 spill_dir: Optional[str] = None):
+        if window > capacity:
+            raise ValueError("window must not exceed capacity")
+        self.capacity = capacity
+        self.window = window
+        self.spill_dir = spill_dir
+        self.states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.next_states = np.zeros((capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.position = 0
+        self.size = 0
+        self.spilled_chunks = 0
+
+        # 全部历史的奖励统计(Welford)
+        self.total_steps = 0
+        self.reward_mean = 0.0
+        self._reward_m2 = 0.0
+        # 最近 window 步的奖励和
+        self._window_sum = 0.0
+        # 回合统计
+        self.episodes = 0
+        self.episode_reward = 0.0
+        self.last_episode_reward: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def record(self, state: np.ndarray, action: int, reward: float,
+               next_state: np.ndarray, done: bool = False):
+        """记录一步经验"""
+        reward = float(reward)
+        index = self.position
+        if self.size >= self.window:
+            self._window_sum -= float(self.rewards[(index - self.window) % self.capacity])
+        self._window_sum += reward
+
+        self.states[index] = state
+        self.next_states[index] = next_state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.dones[index] = done
+        self.timestamps[index] = time.time()
+
+        self.total_steps += 1
+        delta = reward - self.reward_mean
+        self.reward_mean += delta / self.total_steps
+        self._reward_m2 += delta * (reward - self.reward_mean)
+
+        self.episode_reward += reward
+        if done:
+            self._end_episode()
+
+        self._advance(1)
+
+    def record_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                     next_states: np.ndarray, dones: Optional[np.ndarray] = None):
+        """批量记录经验(向量化采集时使用)"""
+        rewards = np.asarray(rewards, dtype=np.float64)
+        count = len(rewards)
+        if count == 0:
+            return
+        dones = np.zeros(count, dtype=np.bool_) if dones is None else np.asarray(dones, dtype=np.bool_)
+
+        # 合并批次的均值和方差(Chan 并行算法)
+        batch_mean = float(rewards.mean())
+        batch_m2 = float(((rewards - batch_mean) ** 2).sum())
+        total = self.total_steps + count
+        delta = batch_mean - self.reward_mean
+        self.reward_mean += delta * count / total
+        self._reward_m2 += batch_m2 + delta * delta * self.total_steps * count / total
+        self.total_steps = total
+
+        # 回合统计：按 done 切分奖励
+        ends = np.flatnonzero(dones)
+        if len(ends):
+            cumulative = np.cumsum(rewards)
+            self.episode_reward += float(cumulative[ends[0]])
+            self._end_episode()
+            for previous, end in zip(ends[:-1], ends[1:]):
+                self.episode_reward = float(cumulative[end] - cumulative[previous])
+                self._end_episode()
+            self.episode_reward = float(cumulative[-1] - cumulative[ends[-1]])
+        else:
+            self.episode_reward += float(rewards.sum())
+
+        # 分段写入环形数组，每写满一轮先溢出到磁盘再覆盖
+        now = time.time()
+        start = 0
+        while start < count:
+            end = min(count, start + self.capacity - self.position)
+            rows = slice(self.position, self.position + end - start)
+            self.states[rows] = states[start:end]
+            self.next_states[rows] = next_states[start:end]
+            self.actions[rows] = actions[start:end]
+            self.rewards[rows] = rewards[start:end]
+            self.dones[rows] = dones[start:end]
+            self.timestamps[rows] = now
+            self._advance(end - start)
+            start = end
+
+        # 批量写入后重新计算滑动窗口的和(O(window))
+        self._window_sum = float(self.recent(self.window)['rewards'].sum(dtype=np.float64))
+
+    def _end_episode(self):
+        self.episodes += 1
+        self.last_episode_reward = self.episode_reward
+        self.episode_reward = 0.0
+
+    def _advance(self, count: int):
+        self.position += count
+        self.size = min(self.size + count, self.capacity)
+        if self.position >= self.capacity:
+            if self.spill_dir:
+                self.spill()
+            self.position %= self.capacity
+
+    def spill(self):
+        """把当前整轮环形数组压缩保存到 spill_dir"""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, f"history_{self.spilled_chunks:06d}.npz")
+        np.savez_compressed(
+            path,
+            states=self.states,
+            next_states=self.next_states,
+            actions=self.actions,
+            rewards=self.rewards,
+            dones=self.dones,
+            timestamps=self.timestamps
+        )
+        self.spilled_chunks += 1
+
+    def recent(self, n: int) -> Dict[str, np.ndarray]:
+        """按时间顺序返回最近 n 步的记录"""
+        n = min(n, self.size)
+        indices = (self.position - n + np.arange(n)) % self.capacity
+        return {
+            'states': self.states[indices],
+            'actions': self.actions[indices],
+            'rewards': self.rewards[indices],
+            'next_states': self.next_states[indices],
+            'dones': self.dones[indices],
+            'timestamps': self.timestamps[indices]
+        }
+
+    @property
+    def reward_variance(self) -> float:
+        return self._reward_m2 / self.total_steps if self.total_steps else 0.0
+
+    @property
+    def window_mean(self) -> float:
+        count = min(self.size, self.window)
+        return self._window_sum / count if count else 0.0
+
+    def get_statistics(self) -> Dict:
+        """获取统计信息"""
+        return {
+            'total_steps': self.total_steps,
+            'reward_mean': self.reward_mean,
+            'reward_std': float(np.sqrt(self.reward_variance)),
+            'recent_reward_mean': self.window_mean,
+            'episodes': self.episodes,
+            'last_episode_reward': self.last_episode_reward
+        }
@@ -1,39 +1,44 @@
 from typing import Optional, Dict, Any, Tuple, List
 import numpy as np # type: ignore
 import time
-import tensorflow as tf # type: ignore
 from models.autonomous_learning import AutonomousLearner
-
-class Memory:
-    def __init__(self, capacity: int = 1000):
-        self.capacity = capacity
-        self.memory: List[Tuple] = []
-        self.position = 0
-        
-    def store(self, experience: Tuple):
-        """存储经验 (state, action, reward, next_state)"""
-        if len(self.memory) < self.capacity:
-            self.memory.append(experience)
-        else:
-            self.memory[self.position] = experience
-        self.position = (self.position + 1) % self.capacity
-        
-    def sample(self, batch_size: int) -> List[Tuple]:
-        """随机采样经验"""
-        if len(self.memory) >= batch_size:
-            indices = np.random.choice(len(self.memory), batch_size, replace=False)
-            return [self.memory[i] for i in indices]
-        return self.memory
+from models.autonomous_learning.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from models.autonomous_learning.learning_history import LearningHistory
+from models.autonomous_learning.checkpoint import CheckpointManager
 
 class AutonomousLearningRobot:
-    def __init__(self, state_space: int = 10, action_space: int = 4):
+    def __init__(
+        self,
+        state_space: int = 10,
+        action_space: int = 4,
+        prioritized: bool = False,
+        train_every: int = 1,
+        batch_size: int = 32,
+        memory_capacity: int = 100000,
+        history_capacity: int = 10000,
+        history_spill_dir: Optional[str] = None,
+        checkpoint_dir: Optional[str] = None,
+        checkpoint_every: Optional[int] = None
+    ):
         self.learner = AutonomousLearner()
         self.state_space = state_space
         self.action_space = action_space
         self.current_state = np.zeros(state_space)
-        self.memory = Memory()
-        self.learning_history = []
+        # prioritized=True 时按训练误差优先采样；环形缓冲区预分配，容量可到数百万条
+        buffer_cls = PrioritizedReplayBuffer if prioritized else ReplayBuffer
+        self.memory = buffer_cls(capacity=memory_capacity, state_dim=state_space)
+        self.learning_history = LearningHistory(
+            capacity=history_capacity, state_dim=state_space, spill_dir=history_spill_dir
+        )
         self.epsilon = 0.1  # 探索率
+        # 每存储 train_every 条经验训练一次
+        self.train_every = train_every
+        self.batch_size = batch_size
+        self.steps = 0
+        self.rng = np.random.default_rng()
+        # 每 checkpoint_every 步在后台保存一次检查点
+        self.checkpoints = CheckpointManager(checkpoint_dir) if checkpoint_dir else None
+        self.checkpoint_every = checkpoint_every
         
     def choose_action(self, state: np.ndarray) -> int:
         """
@@ -50,8 +55,28 @@ class AutonomousLearningRobot:
         # 更新当前状态
         self.current_state = state
         return action
+
+    def choose_actions(self, states: np.ndarray) -> np.ndarray:
+        """批量 epsilon-greedy：一次前向传播为多个状态选择动作"""
+        states = np.asarray(states, dtype=np.float32)
+        actions = self.learner.predict_actions(states)
+        explore = self.rng.random(len(states)) < self.epsilon
+        if explore.any():
+            actions[explore] = self.rng.integers(0, self.action_space, int(explore.sum()))
+        return actions
+
+    def train_step(self) -> Optional[float]:
+        """从记忆中采样一批并训练"""
+        if len(self.memory) < self.batch_size:
+            return None
+        batch = self.memory.sample(self.batch_size)
+        loss = self.learner.train_on_batch(batch)
+        if isinstance(self.memory, PrioritizedReplayBuffer):
+            self.memory.update_priorities(batch.indices, self.learner.last_sample_losses)
+        return loss
         
-    def learn(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray):
+    def learn(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray,
+              done: bool = False):
         """学习过程"""
         if not isinstance(state, np.ndarray):
             state = np.array(state)
@@ -62,78 +87,59 @@ class AutonomousLearningRobot:
         if not 0 <= action < self.action_space:
             raise ValueError(f"动作值出范围: {action}")
             
-        self.memory.store((state, action, reward, next_state))
+        self.memory.store(state, action, reward, next_state, done)
         self.current_state = next_state
-        self.learning_history.append({
-            'state': state.tolist(),
-            'action': action,
-            'reward': reward,
-            'next_state': next_state.tolist(),
-            'timestamp': time.time()
-        })
+        self.learning_history.record(state, action, reward, next_state, done)
         
-        # 从记忆中学习
-        if len(self.memory.memory) >= 32:  # 批量大小为32
-            experiences = self.memory.sample(32)
-            self.learner.train_on_batch(experiences)
+        # 按节奏从记忆中学习
+        self.steps += 1
+        if self.steps % self.train_every == 0:
+            self.train_step()
+        self._maybe_checkpoint(self.steps - 1)
+
+    def learn_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                    next_states: np.ndarray, dones: Optional[np.ndarray] = None,
+                    train: bool = True):
+        """批量学习(向量化采集时使用)，train=False 时只存储不训练"""
+        states = np.asarray(states, dtype=np.float32)
+        if states.ndim != 2 or states.shape[1] != self.state_space:
+            raise ValueError(f"状态维度不匹配: 期望 (K, {self.state_space}), 实际 {states.shape}")
+        self.memory.store_batch(states, actions, rewards, next_states, dones)
+        self.current_state = next_states[-1]
+        self.learning_history.record_batch(states, actions, rewards, next_states, dones)
+
+        previous = self.steps
+        self.steps += len(actions)
+        if train and self.steps // self.train_every > previous // self.train_every:
+            self.train_step()
+        self._maybe_checkpoint(previous)
+
+    def _maybe_checkpoint(self, previous_steps: int):
+        if self.checkpoints is None or not self.checkpoint_every:
+            return
+        if self.steps // self.checkpoint_every > previous_steps // self.checkpoint_every:
+            self.checkpoints.save_async(self)
     
     def get_learning_statistics(self) -> Dict:
         """获取学习统计信息"""
-        if not self.learning_history:
+        if not len(self.learning_history):
             return {"error": "No learning history available"}
             
-        recent_rewards = [h['reward'] for h in self.learning_history[-100:]]
+        stats = self.learning_history.get_statistics()
         return {
-            "average_reward": np.mean(recent_rewards),
-            "total_experiences": len(self.memory.memory),
+            "average_reward": stats['recent_reward_mean'],
+            "reward_mean": stats['reward_mean'],
+            "reward_std": stats['reward_std'],
+            "episodes": stats['episodes'],
+            "total_steps": stats['total_steps'],
+            "total_experiences": len(self.memory),
             "exploration_rate": self.epsilon
         }
     
-    def save_state(self, filepath: str):
-        """保存模型状态"""
-        self.learner.save_model(filepath)
-        
-    def load_state(self, filepath: str):
-        """加载模型状态"""
-        self.learner.load_model(filepath)
-        
-class AutonomousLearningRobot:
-    def learn(self):
-        print("=== 开始机器学习过程 ===")
-        print("1. 数据预处理...")
-        # 添加数据预处理代码
-        print("2. 开始训练模型...")
-        for epoch in range(self.epochs):
-            # 训练代码
-            print(f"Epoch {epoch+1}/{self.epochs}")
-            print(f"- 损失值: {loss:.4f}") # type: ignore
-            print(f"- 准确率: {accuracy:.2%}") # type: ignore
-        
-        print("3. 模型评估...")
-        # 评估代码
-        
-        print("4. 自我优化...")
-        # 初始化机器人类
-class AutonomousLearningRobot:
-    def __init__(self, state_space=10, action_space=4):
-        self.state_space = state_space
-        self.action_space = action_space
-        
-        # 初始化其他参数
-        self.learning_rate = 0.001
-        self.epochs = 100
-        self.batch_size = 32
-        
-        print(f"初始化机器人: 状态空间={state_space}, 动作空间={action_space}")
-        
-    def learn(self):
-        print("\n=== 开始机器学习过程 ===")
-        print(f"- 状态空间: {self.state_space}")
-        print(f"- 动作空间: {self.action_space}")
-        print(f"- 学习率: {self.learning_rate}")
+    def save_state(self, filepath: str) -> str:
+        """保存检查点(模型、优化器、回放缓冲区、探索率)到目录，返回检查点路径"""
+        return CheckpointManager(filepath).save(self)
         
-        # 学习逻辑
-        for epoch in range(self.epochs):
-            # 训练代码
-            pass
-        # 优化代码
\ No newline at end of file
+    def load_state(self, filepath: str) -> bool:
+        """从目录中最新的检查点恢复，没有检查点时返回 False"""
+        return CheckpointManager(filepath).restore(self) is not None
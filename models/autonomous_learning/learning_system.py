@@ -1,54 +1,78 @@
 # models/autonomous_learning/learning_system.py
 
+from typing import Any, Dict, List, Optional
 import numpy as np
+from models.autonomous_learning.reinforcement_learning import ReinforcementLearner
+from models.autonomous_learning.adaptive_learning import AdaptiveLearner
+from models.online_learning import OnlineLearningEngine
 
 class LearningSystem:
-    def __init__(self):
-        self.memory_system = MemorySystem() # type: ignore
-        self.autonomous_learner = AutonomousLearner() # type: ignore
-        self.reinforcement_learner = ReinforcementLearner() # type: ignore
-        self.adaptive_learner = AdaptiveLearner() # type: ignore
+    def __init__(self, state_size: int = 10, action_size: int = 4,
+                 replay_batch_size: int = 32, adaptive_batch_size: int = 64,
+                 engine_options: Optional[Dict] = None):
+        self.reinforcement_learner = ReinforcementLearner(state_size=state_size, action_size=action_size)
+        self.adaptive_learner = AdaptiveLearner()
+        self.replay_batch_size = replay_batch_size
+        # 特征向量攒够 adaptive_batch_size 条再交给自适应学习器
+        self.adaptive_batch_size = adaptive_batch_size
+        self._pending_features: List[np.ndarray] = []
+        # 交互事件由在线学习引擎在后台线程中批量训练
+        self.engine = OnlineLearningEngine(
+            train_fn=self._train_on_events,
+            snapshot_fn=self.reinforcement_learner.model.get_weights,
+            **(engine_options or {})
+        )
 
     def start_learning(self):
-        """启动学习系统"""
+        """启动学习系统(非阻塞)"""
         try:
             self._initialize_learning_components()
-            self._continuous_learning_loop()
+            self.engine.start()
         except Exception as e:
             print(f"Learning system error: {str(e)}")
 
+    def stop_learning(self, drain: bool = True):
+        """停止学习系统"""
+        self.engine.stop(drain=drain)
+
     def _initialize_learning_components(self):
         """初始化学习组件"""
+        self.engine.publish_snapshot()
         print("学习组件初始化完成")
 
-    def _continuous_learning_loop(self):
-        """持续学习循环"""
-        while True:
-            try:
-                input_data = self.memory_system.get_system_status()  # 获取状态信息
-                self.autonomous_learner.learn_from_interaction(input_data)
-                state = self._get_current_state()
-                action = self.reinforcement_learner.act(state)
-                self.adaptive_learner.adapt_to_new_data(input_data, None)
-            except Exception as e:
-                print(f"Learning loop error: {str(e)}")
-                continue
-
-    def _get_current_state(self) -> np.ndarray: # type: ignore
-        """获取当前状态"""
-        return np.random.rand(10)  # type: ignore # 示例状态
-class LearningSystem:
-    def start_learning(self):
-        print("\n=== 启动深度学习系统 ===")
-        print("1. 初始化神经网络...")
-        
-        # 添加训练循环
-        for iteration in range(self.max_iterations):
-            print(f"\n迭代 {iteration+1}/{self.max_iterations}")
-            print("- 收集环境数据...")
-            print("- 更新模型参数...")
-            print("- 验证学习效果...")
-            
-            # 显示关键指标
-            print(f"- 学习进度: {(iteration+1)/self.max_iterations:.1%}")
-            print(f"- 当前性能指标: {performance_metric:.4f}") # type: ignore
\ No newline at end of file
+    def submit_interaction(self, event: Dict[str, Any]) -> bool:
+        """
+        提交一次交互
+
+        event 可包含 state/action/reward/next_state/done(强化学习经验)
+        和 features(自适应学习的特征向量)。队列已满时返回 False。
+        """
+        return self.engine.submit(event)
+
+    def _train_on_events(self, events: List[Dict[str, Any]]):
+        """训练一个小批量的交互事件"""
+        experiences = [e for e in events if 'state' in e]
+        if experiences:
+            learner = self.reinforcement_learner
+            learner.memory.store_batch(
+                np.stack([np.reshape(e['state'], -1) for e in experiences]),
+                np.asarray([e['action'] for e in experiences]),
+                np.asarray([e['reward'] for e in experiences]),
+                np.stack([np.reshape(e['next_state'], -1) for e in experiences]),
+                np.asarray([e.get('done', False) for e in experiences])
+            )
+            learner.replay(self.replay_batch_size)
+
+        self._pending_features.extend(e['features'] for e in events if 'features' in e)
+        if len(self._pending_features) >= self.adaptive_batch_size:
+            features, self._pending_features = self._pending_features, []
+            self.adaptive_learner.adapt_to_new_data(np.stack(features), None)
+
+    def get_policy_weights(self) -> Optional[List[np.ndarray]]:
+        """推理线程读取最新发布的策略权重(无锁)"""
+        snapshot = self.engine.snapshot
+        return snapshot.model if snapshot else None
+
+    def get_learning_metrics(self) -> Dict:
+        """获取在线学习指标"""
+        return self.engine.get_metrics()
@@ -1,60 +1,100 @@
 import numpy as np # type: ignore
-from typing import Dict, List, Tuple
-import tensorflow as tf # type: ignore
-from collections import deque
+from typing import Dict, List, Tuple, Optional
+from utils.lazy_imports import lazy_import
+from models.autonomous_learning.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
 import random
 
+tf = lazy_import('tensorflow')
+
 class ReinforcementLearner:
-    def __init__(self):
-        self.memory = deque(maxlen=2000)
+    def __init__(
+        self,
+        state_size: int = 4,
+        action_size: int = 2,
+        memory_size: int = 2000,
+        target_update_interval: Optional[int] = None,
+        prioritized: bool = False
+    ):
+        self.state_size = state_size
+        self.action_size = action_size
+        buffer_cls = PrioritizedReplayBuffer if prioritized else ReplayBuffer
+        self.memory = buffer_cls(capacity=memory_size, state_dim=state_size)
         self.gamma = 0.95    # 折扣因子
         self.epsilon = 1.0   # 探索率
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
         self.learning_rate = 0.001
         self.model = self._build_model()
-        
-    def _build_model(self) -> tf.keras.Model:
+
+        # 目标网络：每 target_update_interval 次回放同步一次权重，None 时直接用在线网络
+        self.target_update_interval = target_update_interval
+        self.target_model = None
+        self.replay_count = 0
+        if target_update_interval:
+            self.target_model = self._build_model()
+            self.update_target_model()
+
+    def _build_model(self) -> 'tf.keras.Model':
         """构建DQN模型"""
         model = tf.keras.Sequential([
-            tf.keras.layers.Dense(24, input_dim=4, activation='relu'),
+            tf.keras.Input(shape=(self.state_size,)),
+            tf.keras.layers.Dense(24, activation='relu'),
             tf.keras.layers.Dense(24, activation='relu'),
-            tf.keras.layers.Dense(2, activation='linear')
+            tf.keras.layers.Dense(self.action_size, activation='linear')
         ])
-        
+
         model.compile(
             loss='mse',
-            optimizer=tf.keras.optimizers.Adam(lr=self.learning_rate)
+            optimizer=tf.keras.optimizers.Adam(learning_rate=self.learning_rate)
         )
-        
+
         return model
-        
-    def remember(self, state: np.ndarray, action: int, reward: float, 
+
+    def update_target_model(self):
+        """把在线网络权重同步到目标网络"""
+        if self.target_model is not None:
+            self.target_model.set_weights(self.model.get_weights())
+
+    def remember(self, state: np.ndarray, action: int, reward: float,
                 next_state: np.ndarray, done: bool):
         """记忆经验"""
-        self.memory.append((state, action, reward, next_state, done))
-        
+        self.memory.store(np.reshape(state, -1), action, reward, np.reshape(next_state, -1), done)
+
     def act(self, state: np.ndarray) -> int:
         """选择动作"""
         if np.random.rand() <= self.epsilon:
-            return random.randrange(2)
-        act_values = self.model.predict(state)
-        return np.argmax(act_values[0])
-        
-    def replay(self, batch_size: int):
-        """经验回放"""
+            return random.randrange(self.action_size)
+        act_values = self.model(np.reshape(state, (1, -1)), training=False)
+        return int(np.argmax(act_values[0]))
+
+    def replay(self, batch_size: int) -> Optional[float]:
+        """
+        经验回放
+
+        整批计算 DQN 目标：next_states 和 states 各做一次前向传播，
+        向量化更新所选动作的目标值，再调用一次 train_on_batch。
+        """
         if len(self.memory) < batch_size:
-            return
-            
-        minibatch = random.sample(self.memory, batch_size)
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                target = reward + self.gamma * \
-                    np.amax(self.model.predict(next_state)[0])
-            target_f = self.model.predict(state)
-            target_f[0][action] = target
-            self.model.fit(state, target_f, epochs=1, verbose=0)
-            
+            return None
+
+        batch = self.memory.sample(batch_size)
+        target_model = self.target_model if self.target_model is not None else self.model
+        next_q = target_model(batch.next_states, training=False).numpy()
+        q_values = self.model(batch.states, training=False).numpy()
+
+        targets = batch.rewards + self.gamma * next_q.max(axis=1) * (~batch.dones)
+        rows = np.arange(len(batch.actions))
+        td_errors = targets - q_values[rows, batch.actions]
+        q_values[rows, batch.actions] = targets
+
+        loss = self.model.train_on_batch(batch.states, q_values, sample_weight=batch.weights)
+        if isinstance(self.memory, PrioritizedReplayBuffer):
+            self.memory.update_priorities(batch.indices, td_errors)
+
+        self.replay_count += 1
+        if self.target_update_interval and self.replay_count % self.target_update_interval == 0:
+            self.update_target_model()
+
         if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay 
\ No newline at end of file
+            self.epsilon *= self.epsilon_decay
+        return float(np.mean(loss))
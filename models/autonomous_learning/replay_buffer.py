@@ -0,0 +1,202 @@
+from typing import NamedTuple, Optional
+import numpy as np # type: ignore
+
+class Batch(NamedTuple):
+    """按字段组织的训练批次，可直接传给 AutonomousLearner.train_on_batch"""
+    states: np.ndarray
+    actions: np.ndarray
+    rewards: np.ndarray
+    next_states: np.ndarray
+    dones: np.ndarray
+    indices: np.ndarray
+    weights: Optional[np.ndarray] = None
+
+class ReplayBuffer:
+    """
+    预分配连续数组的环形经验回放缓冲区
+
+    每个字段一个定长数组，写入覆盖最旧的经验，采样通过花式索引一次完成，
+    没有逐条的 Python 对象开销。np.zeros 只在写入时才真正占用物理内存，
+    容量可以设到数百万条。
+    """
+    def __init__(
+        self,
+        capacity: int = 100000,
+        state_dim: int = 10,
+        state_dtype=np.float32,
+        seed: Optional[int] = None
+    ):
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.states = np.zeros((capacity, state_dim), dtype=state_dtype)
+        self.next_states = np.zeros((capacity, state_dim), dtype=state_dtype)
+        self.actions = np.zeros(capacity, dtype=np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.position = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def store(self, state: np.ndarray, action: int, reward: float,
+              next_state: np.ndarray, done: bool = False) -> int:
+        """存储一条经验，返回写入位置"""
+        index = self.position
+        self.states[index] = state
+        self.actions[index] = action
+        self.rewards[index] = reward
+        self.next_states[index] = next_state
+        self.dones[index] = done
+        self.position = (index + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return index
+
+    def store_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                    next_states: np.ndarray, dones: Optional[np.ndarray] = None) -> np.ndarray:
+        """批量存储经验，返回写入位置"""
+        count = len(actions)
+        if count > self.capacity:
+            # 超出容量时只保留最新的部分
+            start = count - self.capacity
+            states, actions, rewards, next_states = (
+                states[start:], actions[start:], rewards[start:], next_states[start:]
+            )
+            dones = dones[start:] if dones is not None else None
+            count = self.capacity
+        indices = (self.position + np.arange(count)) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones if dones is not None else False
+        self.position = int((self.position + count) % self.capacity)
+        self.size = min(self.size + count, self.capacity)
+        return indices
+
+    def _gather(self, indices: np.ndarray, weights: Optional[np.ndarray] = None) -> Batch:
+        return Batch(
+            states=self.states[indices],
+            actions=self.actions[indices],
+            rewards=self.rewards[indices],
+            next_states=self.next_states[indices],
+            dones=self.dones[indices],
+            indices=indices,
+            weights=weights
+        )
+
+    def sample(self, batch_size: int) -> Batch:
+        """均匀随机采样(有放回)；经验不足 batch_size 时返回全部"""
+        if self.size < batch_size:
+            return self._gather(np.arange(self.size))
+        return self._gather(self.rng.integers(0, self.size, size=batch_size))
+
+    def clear(self):
+        """清空缓冲区(保留已分配的数组)"""
+        self.position = 0
+        self.size = 0
+
+class SumTree:
+    """
+    数组实现的求和树
+
+    叶子数补齐到 2 的幂，节点 i 的子节点为 2i 和 2i+1(根为 1)。
+    批量更新和批量采样都按层向量化，每层一次 NumPy 运算，复杂度 O(log n)。
+    """
+    def __init__(self, capacity: int):
+        self.leaves = 1 << max(0, int(np.ceil(np.log2(max(capacity, 1)))))
+        self.depth = int(np.log2(self.leaves))
+        self.tree = np.zeros(2 * self.leaves, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray):
+        """设置叶子优先级并逐层更新父节点"""
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaves
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes >> 1)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def get(self, indices: np.ndarray) -> np.ndarray:
+        return self.tree[np.asarray(indices, dtype=np.int64) + self.leaves]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """按前缀和查找叶子下标(向量化自顶向下)"""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values -= left_sum * go_right
+            nodes = left + go_right
+        return nodes - self.leaves
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    优先经验回放
+
+    采样概率 P(i) = p_i^alpha / sum(p^alpha)，返回的 weights 为归一化的重要性采样权重
+    (N * P(i))^-beta / max，beta 随采样逐步增加到 1。新经验以当前最大优先级写入，
+    保证至少被采样一次；训练后调用 update_priorities 以新的误差更新优先级。
+    """
+    def __init__(
+        self,
+        capacity: int = 100000,
+        state_dim: int = 10,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        beta_increment: float = 1e-4,
+        epsilon: float = 1e-3,
+        state_dtype=np.float32,
+        seed: Optional[int] = None
+    ):
+        super().__init__(capacity, state_dim, state_dtype, seed)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+        self.tree = SumTree(capacity)
+        self.max_priority = 1.0
+
+    def store(self, state: np.ndarray, action: int, reward: float,
+              next_state: np.ndarray, done: bool = False) -> int:
+        index = super().store(state, action, reward, next_state, done)
+        self.tree.update(np.array([index]), np.array([self.max_priority ** self.alpha]))
+        return index
+
+    def store_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                    next_states: np.ndarray, dones: Optional[np.ndarray] = None) -> np.ndarray:
+        indices = super().store_batch(states, actions, rewards, next_states, dones)
+        self.tree.update(indices, np.full(len(indices), self.max_priority ** self.alpha))
+        return indices
+
+    def sample(self, batch_size: int) -> Batch:
+        """分层按优先级采样，返回带重要性采样权重的批次"""
+        if self.size == 0:
+            return self._gather(np.arange(0), np.ones(0, dtype=np.float32))
+        total = self.tree.total
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = np.minimum(self.tree.find(values), self.size - 1)
+
+        probabilities = self.tree.get(indices) / total
+        weights = (self.size * np.maximum(probabilities, 1e-12)) ** -self.beta
+        weights = (weights / weights.max()).astype(np.float32)
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return self._gather(indices, weights)
+
+    def update_priorities(self, indices: np.ndarray, errors: np.ndarray):
+        """以训练误差更新优先级"""
+        priorities = np.abs(np.asarray(errors, dtype=np.float64)) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def clear(self):
+        super().clear()
+        self.tree.tree[:] = 0.0
+        self.max_priority = 1.0
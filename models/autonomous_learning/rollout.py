@@ -0,0 +1,158 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import multiprocessing
+import time
+import numpy as np # type: ignore
+
+class SyncVectorEnv:
+    """
+    在当前进程中顺序推进 K 个环境
+
+    step 返回按环境堆叠的数组；回合结束的环境自动 reset，
+    返回的 next_states 为真实的下一状态，新回合的初始状态通过 states 属性获取。
+    """
+    def __init__(self, env_fns: Sequence[Callable]):
+        self.envs = [fn() for fn in env_fns]
+        self.num_envs = len(self.envs)
+        self.states: Optional[np.ndarray] = None
+
+    def reset(self) -> np.ndarray:
+        self.states = np.stack([env.reset() for env in self.envs])
+        return self.states
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        next_states, rewards, dones, states = _step_envs(self.envs, actions)
+        self.states = states
+        return next_states, rewards, dones
+
+    def close(self):
+        pass
+
+def _step_envs(envs: List, actions: np.ndarray):
+    next_states, rewards, dones, states = [], [], [], []
+    for env, action in zip(envs, actions):
+        next_state, reward, done = env.step(action)
+        next_states.append(next_state)
+        rewards.append(reward)
+        dones.append(done)
+        states.append(env.reset() if done else next_state)
+    return (np.stack(next_states), np.asarray(rewards, dtype=np.float32),
+            np.asarray(dones, dtype=np.bool_), np.stack(states))
+
+def _subproc_worker(remote, parent_remote, env_fns):
+    parent_remote.close()
+    envs = [fn() for fn in env_fns]
+    try:
+        while True:
+            command, data = remote.recv()
+            if command == 'step':
+                remote.send(_step_envs(envs, data))
+            elif command == 'reset':
+                remote.send(np.stack([env.reset() for env in envs]))
+            elif command == 'close':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        remote.close()
+
+class SubprocVectorEnv:
+    """
+    在多个子进程中并行推进 K 个环境
+
+    环境按块分配给 num_workers 个进程(默认 CPU 核数)，每个进程每步只通信一次，
+    适合单步计算较重的环境。env_fns 需要可以被 pickle(使用 spawn 启动方式时)。
+    """
+    def __init__(self, env_fns: Sequence[Callable], num_workers: Optional[int] = None,
+                 context: Optional[str] = None):
+        self.num_envs = len(env_fns)
+        num_workers = min(num_workers or multiprocessing.cpu_count(), self.num_envs)
+        self.chunks = np.array_split(np.arange(self.num_envs), num_workers)
+        ctx = multiprocessing.get_context(context)
+        self.remotes, self.processes = [], []
+        for chunk in self.chunks:
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_subproc_worker,
+                args=(worker_remote, remote, [env_fns[i] for i in chunk]),
+                daemon=True
+            )
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.states: Optional[np.ndarray] = None
+        self.closed = False
+
+    def reset(self) -> np.ndarray:
+        for remote in self.remotes:
+            remote.send(('reset', None))
+        self.states = np.concatenate([remote.recv() for remote in self.remotes])
+        return self.states
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        for remote, chunk in zip(self.remotes, self.chunks):
+            remote.send(('step', actions[chunk]))
+        results = [remote.recv() for remote in self.remotes]
+        next_states, rewards, dones, states = (np.concatenate(parts) for parts in zip(*results))
+        self.states = states
+        return next_states, rewards, dones
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            try:
+                remote.send(('close', None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+        self.closed = True
+
+    def __del__(self):
+        self.close()
+
+class RolloutDriver:
+    """
+    向量化数据采集驱动
+
+    每一步对 K 个环境的状态做一次批量前向传播选择动作(NumPy epsilon-greedy)，
+    整批写入回放缓冲区，并按 train_every 的节奏训练，而不是每条经验训练一次。
+    """
+    def __init__(self, robot, vec_env, train_every: int = 1, train_steps: int = 1):
+        self.robot = robot
+        self.vec_env = vec_env
+        self.train_every = train_every
+        self.train_steps = train_steps
+        self.total_steps = 0
+
+    def run(self, steps: int) -> Dict:
+        """推进 steps 次向量步(共 steps * K 条经验)"""
+        states = self.vec_env.states if self.vec_env.states is not None else self.vec_env.reset()
+        start = time.perf_counter()
+        reward_sum = 0.0
+        losses = []
+        for _ in range(steps):
+            actions = self.robot.choose_actions(states)
+            next_states, rewards, dones = self.vec_env.step(actions)
+            self.robot.learn_batch(states, actions, rewards, next_states, dones, train=False)
+            reward_sum += float(rewards.sum())
+            states = self.vec_env.states
+
+            self.total_steps += 1
+            if self.total_steps % self.train_every == 0:
+                for _ in range(self.train_steps):
+                    loss = self.robot.train_step()
+                    if loss is not None:
+                        losses.append(loss)
+
+        elapsed = time.perf_counter() - start
+        transitions = steps * self.vec_env.num_envs
+        return {
+            'transitions': transitions,
+            'seconds': elapsed,
+            'transitions_per_second': transitions / elapsed if elapsed > 0 else 0.0,
+            'mean_reward': reward_sum / transitions if transitions else 0.0,
+            'train_steps': len(losses),
+            'mean_loss': float(np.mean(losses)) if losses else None
+        }
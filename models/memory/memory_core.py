@@ -5,6 +5,7 @@ import json
 import pickle
 import os
 from collections import deque
+from utils.logging import get_logger
 import logging
 from dataclasses import dataclass
 from enum import Enum
@@ -46,17 +47,7 @@ class MemoryCore:
 
     def _setup_logger(self) -> logging.Logger:
         """设置日志系统"""
-        logger = logging.getLogger('memory_core')
-        logger.setLevel(logging.DEBUG)
-        
-        handler = logging.FileHandler('logs/memory.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
+        return get_logger('memory_core', 'memory.log')
 
     def store_memory(self, content: Any, memory_type: MemoryType, 
                     importance: float = 0.5, tags: List[str] = None) -> bool:
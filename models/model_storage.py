@@ -1 +1,356 @@
- 
+"""
+本地模型仓库
+
+按内容寻址保存模型权重：每个版本的权重写成一个 safetensors(多个张量)或 .npy(单个数组)文件，
+以 SHA-256 命名存放在 objects/ 下，相同内容只存一份；refs/<name>/<version>.json 记录版本清单。
+加载时直接内存映射文件，不复制数据，冷启动只需 mmap；已加载的模型保存在进程内 LRU 缓存中。
+save 写入对象和清单期间持有仓库锁文件的共享锁，gc 持有排他锁，
+gc 不会删除已写入但清单尚未引用的对象(多个进程共用一个仓库也成立)。
+
+HuggingFace 预训练模型通过 pretrained_path 下载到仓库的 hf/ 目录，之后都从本地路径加载。
+离线模式(配置 models.offline 或环境变量 MODEL_STORE_OFFLINE=1)下从不访问网络，
+本地没有的模型直接报错。
+"""
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from collections import OrderedDict
+from contextlib import contextmanager
+import threading
+import hashlib
+import logging
+import struct
+import json
+import time
+import os
+import numpy as np # type: ignore
+
+try:
+    import fcntl
+except ImportError:  # Windows 下只有进程内的锁
+    fcntl = None
+
+_DEFAULT_CONFIG = {
+    'store_dir': 'models/store',
+    'offline': False,
+    'cache_size': 8
+}
+
+# safetensors 数据类型与 NumPy 的对应关系
+_DTYPES = {
+    'F64': np.float64, 'F32': np.float32, 'F16': np.float16,
+    'I64': np.int64, 'I32': np.int32, 'I16': np.int16, 'I8': np.int8,
+    'U64': np.uint64, 'U32': np.uint32, 'U16': np.uint16, 'U8': np.uint8,
+    'BOOL': np.bool_
+}
+_DTYPE_NAMES = {np.dtype(dtype): name for name, dtype in _DTYPES.items()}
+
+def _load_config() -> Dict:
+    config = dict(_DEFAULT_CONFIG)
+    try:
+        with open('config/system_config.json', 'r', encoding='utf-8') as f:
+            config.update(json.load(f).get('models', {}))
+    except Exception:
+        pass
+    if os.environ.get('MODEL_STORE_OFFLINE', '').lower() in ('1', 'true', 'yes'):
+        config['offline'] = True
+    return config
+
+def write_safetensors(path: str, tensors: Dict[str, np.ndarray], metadata: Optional[Dict[str, str]] = None):
+    """
+    写入 safetensors 文件
+
+    头部补齐到 8 字节，张量按元素大小降序排列，保证每个张量的起始偏移都按其元素大小对齐，
+    内存映射后得到的数组是对齐的。
+    """
+    ordered = sorted(tensors.items(), key=lambda item: -np.asarray(item[1]).dtype.itemsize)
+    header: Dict[str, Any] = {}
+    offset = 0
+    arrays = []
+    for name, tensor in ordered:
+        array = np.ascontiguousarray(tensor)
+        if array.dtype not in _DTYPE_NAMES:
+            raise ValueError(f"Unsupported dtype for safetensors: {array.dtype}")
+        header[name] = {
+            'dtype': _DTYPE_NAMES[array.dtype],
+            'shape': list(array.shape),
+            'data_offsets': [offset, offset + array.nbytes]
+        }
+        offset += array.nbytes
+        arrays.append(array)
+    if metadata:
+        header['__metadata__'] = {str(k): str(v) for k, v in metadata.items()}
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header_bytes += b' ' * (-len(header_bytes) % 8)
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<Q', len(header_bytes)))
+        f.write(header_bytes)
+        for array in arrays:
+            f.write(memoryview(array.reshape(-1)).cast('B'))
+
+def read_safetensors(path: str) -> Dict[str, np.ndarray]:
+    """内存映射读取 safetensors 文件，返回只读数组(不复制数据)"""
+    with open(path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+    data_start = 8 + header_size
+    buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        if info['dtype'] not in _DTYPES:
+            raise ValueError(f"Unsupported safetensors dtype: {info['dtype']}")
+        dtype = np.dtype(_DTYPES[info['dtype']])
+        begin, end = info['data_offsets']
+        count = (end - begin) // dtype.itemsize
+        tensors[name] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + begin
+        ).reshape(info['shape'])
+    return tensors
+
+class ModelStore:
+    """按内容寻址、带版本的本地模型仓库"""
+    def __init__(self, root: Optional[str] = None, offline: Optional[bool] = None,
+                 cache_size: Optional[int] = None):
+        config = _load_config()
+        self.root = root or config['store_dir']
+        self.offline = config['offline'] if offline is None else offline
+        self.cache_size = cache_size or config['cache_size']
+        self.logger = logging.getLogger('model_store')
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.refs_dir = os.path.join(self.root, 'refs')
+        self.hf_dir = os.path.join(self.root, 'hf')
+        for directory in (self.objects_dir, self.refs_dir, self.hf_dir):
+            os.makedirs(directory, exist_ok=True)
+        self._cache: 'OrderedDict[str, Any]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._lock_path = os.path.join(self.root, '.lock')
+
+    @contextmanager
+    def _store_lock(self, exclusive: bool) -> Iterator[None]:
+        """
+        跨进程的仓库锁：save 取共享锁，gc 取排他锁
+
+        每次单独打开锁文件，flock 按打开的文件描述生效，同一进程的不同线程之间也互斥。
+        没有 fcntl 时只靠调用方持有的 self._lock 在进程内互斥。
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(self._lock_path, 'a+b') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # ---------- 内容寻址存储 ----------
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _store_object(self, tmp_path: str) -> str:
+        """计算临时文件的哈希并移入 objects/，内容已存在时直接丢弃临时文件"""
+        sha = hashlib.sha256()
+        with open(tmp_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        return digest
+
+    def _manifest_path(self, name: str, version: int) -> str:
+        return os.path.join(self.refs_dir, name, f"{version:06d}.json")
+
+    # ---------- 保存 / 加载 ----------
+
+    def save(self, name: str, weights: Union[np.ndarray, Dict[str, np.ndarray], List[np.ndarray]],
+             metadata: Optional[Dict] = None) -> int:
+        """
+        保存一个新版本，返回版本号
+
+        weights 为单个数组时存为 .npy，为字典或列表时存为 safetensors
+        (列表按 "0", "1", ... 命名，加载时按顺序返回列表)。
+        """
+        tmp_path = os.path.join(self.objects_dir, f".tmp-{os.getpid()}-{threading.get_ident()}")
+        if isinstance(weights, np.ndarray):
+            kind = 'npy'
+            np.save(tmp_path + '.npy', weights)
+            os.replace(tmp_path + '.npy', tmp_path)
+            tensor_names = None
+        else:
+            kind = 'safetensors'
+            tensors = weights if isinstance(weights, dict) else {str(i): w for i, w in enumerate(weights)}
+            write_safetensors(tmp_path, tensors)
+            tensor_names = list(tensors)
+
+        with self._store_lock(exclusive=False), self._lock:
+            digest = self._store_object(tmp_path)
+            directory = os.path.join(self.refs_dir, name)
+            os.makedirs(directory, exist_ok=True)
+            version = max(self.list_versions(name), default=0) + 1
+            manifest = {
+                'name': name,
+                'version': version,
+                'format': kind,
+                'sha256': digest,
+                'tensors': tensor_names,
+                'is_list': isinstance(weights, (list, tuple)),
+                'metadata': metadata or {},
+                'created': time.time()
+            }
+            tmp_manifest = self._manifest_path(name, version) + '.tmp'
+            with open(tmp_manifest, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_manifest, self._manifest_path(name, version))
+        self.logger.info(f"Saved model {name} v{version} ({digest[:12]})")
+        return version
+
+    def manifest(self, name: str, version: Optional[int] = None) -> Dict:
+        """读取版本清单，version 为 None 时取最新版本"""
+        if version is None:
+            versions = self.list_versions(name)
+            if not versions:
+                raise KeyError(f"Model not found in store: {name}")
+            version = versions[-1]
+        try:
+            with open(self._manifest_path(name, version), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"Model version not found in store: {name} v{version}")
+
+    def load(self, name: str, version: Optional[int] = None) -> Any:
+        """内存映射加载权重(只读)，结果缓存在进程内"""
+        manifest = self.manifest(name, version)
+        key = f"{name}@{manifest['version']}"
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        path = self._object_path(manifest['sha256'])
+        if manifest['format'] == 'npy':
+            weights: Any = np.load(path, mmap_mode='r')
+        else:
+            tensors = read_safetensors(path)
+            weights = [tensors[n] for n in manifest['tensors']] if manifest['is_list'] else tensors
+        return self.cache(key, weights)
+
+    def cache(self, key: str, value: Any) -> Any:
+        """放入进程内 LRU 缓存"""
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """从缓存获取对象，未命中时调用 loader 加载并缓存"""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return self.cache(key, loader())
+
+    def list_models(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.refs_dir)
+                      if os.path.isdir(os.path.join(self.refs_dir, name)))
+
+    def list_versions(self, name: str) -> List[int]:
+        directory = os.path.join(self.refs_dir, name)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(entry[:-5]) for entry in os.listdir(directory)
+                      if entry.endswith('.json') and entry[:-5].isdigit())
+
+    def delete(self, name: str, version: int):
+        """删除一个版本的清单(对象文件由 gc 回收)"""
+        with self._lock:
+            os.remove(self._manifest_path(name, version))
+            self._cache.pop(f"{name}@{version}", None)
+
+    def gc(self) -> int:
+        """删除没有被任何版本引用的对象文件，返回删除数量(期间阻塞 save)"""
+        with self._store_lock(exclusive=True), self._lock:
+            referenced = set()
+            for name in self.list_models():
+                for version in self.list_versions(name):
+                    referenced.add(self.manifest(name, version)['sha256'])
+            removed = 0
+            for prefix in os.listdir(self.objects_dir):
+                directory = os.path.join(self.objects_dir, prefix)
+                if not os.path.isdir(directory):
+                    continue
+                for digest in os.listdir(directory):
+                    if digest not in referenced:
+                        os.remove(os.path.join(directory, digest))
+                        removed += 1
+            return removed
+
+    # ---------- Keras 模型 ----------
+
+    def save_keras(self, name: str, model, metadata: Optional[Dict] = None) -> int:
+        """保存 Keras 模型权重"""
+        return self.save(name, [np.asarray(w) for w in model.get_weights()], metadata)
+
+    def load_keras(self, model, name: str, version: Optional[int] = None):
+        """把仓库中的权重加载到已构建的 Keras 模型"""
+        model.set_weights(self.load(name, version))
+        return model
+
+    # ---------- HuggingFace 预训练模型 ----------
+
+    def pretrained_path(self, repo_id: str, revision: Optional[str] = None) -> str:
+        """
+        返回预训练模型的本地目录
+
+        在线模式下首次使用时下载到仓库的 hf/ 目录(之后命中本地缓存)，
+        离线模式只查本地，找不到时抛出异常而不会访问网络。
+        """
+        key = f"hf:{repo_id}@{revision or 'main'}"
+
+        def resolve() -> str:
+            from huggingface_hub import snapshot_download # type: ignore
+            try:
+                return snapshot_download(
+                    repo_id, revision=revision, cache_dir=self.hf_dir,
+                    local_files_only=self.offline
+                )
+            except Exception as e:
+                if self.offline:
+                    raise FileNotFoundError(
+                        f"Model {repo_id} is not available locally and the store is offline"
+                    ) from e
+                raise
+
+        return self.get_or_load(key, resolve)
+
+    def pretrained(self, loader: Any, repo_id: str, **kwargs) -> Any:
+        """
+        用 from_pretrained 从本地目录加载 transformers 对象并缓存
+
+        例如 store.pretrained(transformers.AutoTokenizer, "bert-base-chinese")
+        """
+        # 不同的加载参数(如 num_labels、torch_dtype)得到不同的对象，参数计入缓存键
+        options = json.dumps(kwargs, sort_keys=True, default=repr)
+        key = f"obj:{getattr(loader, '__name__', loader)}:{repo_id}:{options}"
+        return self.get_or_load(
+            key, lambda: loader.from_pretrained(self.pretrained_path(repo_id), **kwargs)
+        )
+
+_default_store: Optional[ModelStore] = None
+_default_lock = threading.Lock()
+
+def get_model_store() -> ModelStore:
+    """进程内共享的默认模型仓库"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = ModelStore()
+        return _default_store
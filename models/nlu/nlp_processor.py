@@ -1,14 +1,17 @@
 from typing import Dict, List, Optional
 from .nlu_core import NLUCore, NLUResult
 import re
-import jieba # type: ignore
 import numpy as np # type: ignore
-from sklearn.feature_extraction.text import TfidfVectorizer # type: ignore
+from utils.lazy_imports import lazy_import
+
+jieba = lazy_import('jieba')
+jieba_analyse = lazy_import('jieba.analyse')
+sklearn_text = lazy_import('sklearn.feature_extraction.text')
 
 class NLPProcessor:
     def __init__(self):
         self.nlu_core = NLUCore()
-        self.tfidf_vectorizer = TfidfVectorizer()
+        self.tfidf_vectorizer = sklearn_text.TfidfVectorizer()
         self.word_vectors = {}  # 词向量存储
         
         # 加载停用词
@@ -73,7 +76,7 @@ class NLPProcessor:
         """提取关键词"""
         try:
             # 使用TF-IDF提取关键词
-            keywords = jieba.analyse.extract_tags(text, topK=10, withWeight=True)
+            keywords = jieba_analyse.extract_tags(text, topK=10, withWeight=True)
             
             return [{'word': word, 'weight': weight} for word, weight in keywords]
             
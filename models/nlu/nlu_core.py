@@ -1,12 +1,15 @@
-import spacy # type: ignore
-import nltk # type: ignore
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification # type: ignore
 from typing import Dict, List, Tuple, Optional
+from utils.lazy_imports import lazy_import
 import json
+from utils.logging import get_logger
+from models.model_storage import get_model_store
 import logging
 from dataclasses import dataclass
 from enum import Enum
 
+spacy = lazy_import('spacy')
+transformers = lazy_import('transformers')
+
 class IntentType(Enum):
     QUERY = "query"
     COMMAND = "command"
@@ -26,12 +29,19 @@ class NLUResult:
 class NLUCore:
     def __init__(self):
         self.logger = self._setup_logger()
+        # 预训练模型从本地模型仓库加载，离线模式下不访问网络
+        self.model_store = get_model_store()
         
         # 加载模型和工具
         self.nlp = spacy.load("zh_core_web_sm")
-        self.tokenizer = AutoTokenizer.from_pretrained("bert-base-chinese")
-        self.sentiment_analyzer = pipeline("sentiment-analysis", 
-                                         model="uer/roberta-base-finetuned-jd-binary-chinese")
+        self.tokenizer = self.model_store.pretrained(transformers.AutoTokenizer, "bert-base-chinese")
+        self.sentiment_analyzer = self.model_store.get_or_load(
+            "pipeline:sentiment-analysis",
+            lambda: transformers.pipeline(
+                "sentiment-analysis",
+                model=self.model_store.pretrained_path("uer/roberta-base-finetuned-jd-binary-chinese")
+            )
+        )
         
         # 加载意图分类器
         self.intent_classifier = self._load_intent_classifier()
@@ -44,17 +54,7 @@ class NLUCore:
 
     def _setup_logger(self) -> logging.Logger:
         """设置日志系统"""
-        logger = logging.getLogger('nlu_core')
-        logger.setLevel(logging.DEBUG)
-        
-        handler = logging.FileHandler('logs/nlu.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        
-        return logger
+        return get_logger('nlu_core', 'nlu.log')
 
     def _load_config(self) -> Dict:
         """加载配置"""
@@ -69,9 +69,9 @@ class NLUCore:
         """加载意图分类器"""
         try:
             model_name = "uer/roberta-base-chinese-cluener2020"
-            model = AutoModelForSequenceClassification.from_pretrained(model_name)
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            return pipeline("text-classification", model=model, tokenizer=tokenizer)
+            model = self.model_store.pretrained(transformers.AutoModelForSequenceClassification, model_name)
+            tokenizer = self.model_store.pretrained(transformers.AutoTokenizer, model_name)
+            return transformers.pipeline("text-classification", model=model, tokenizer=tokenizer)
         except Exception as e:
             self.logger.error(f"Failed to load intent classifier: {str(e)}")
             return None
@@ -79,7 +79,11 @@ class NLUCore:
     def _load_ner_model(self):
         """加载命名实体识别模型"""
         try:
-            return pipeline("ner", model="uer/roberta-base-chinese-cluener2020")
+            model_name = "uer/roberta-base-chinese-cluener2020"
+            return self.model_store.get_or_load(
+                "pipeline:ner",
+                lambda: transformers.pipeline("ner", model=self.model_store.pretrained_path(model_name))
+            )
         except Exception as e:
             self.logger.error(f"Failed to load NER model: {str(e)}")
             return None
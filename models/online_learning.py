@@ -1 +1,201 @@
- 
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from collections import deque
+import threading
+import logging
+import queue
+import time
+
+class ModelSnapshot(NamedTuple):
+    """已发布的模型快照(不可变，推理线程可以直接读取)"""
+    version: int
+    model: Any
+    created: float
+    events_trained: int
+
+class OnlineLearningEngine:
+    """
+    在线学习引擎
+
+    交互事件进入有界队列，由专用工作线程按数量或时间凑成小批量并执行训练步骤:
+        - 批量大小自适应：队列积压超过当前批量时翻倍(不超过 max_batch)以摊薄每步开销，
+          没有积压且单步耗时超过 target_step_time 时减半(不低于 min_batch)以降低延迟
+        - 每 snapshot_every 步调用 snapshot_fn 生成模型快照，
+          以单次引用赋值发布，推理线程读取 engine.snapshot 无需加锁
+        - 统计吞吐量(事件/秒)、事件从入队到被训练的延迟，以及快照相对最新训练的滞后
+    """
+    def __init__(
+        self,
+        train_fn: Callable[[List[Any]], Any],
+        snapshot_fn: Optional[Callable[[], Any]] = None,
+        max_queue: int = 10000,
+        min_batch: int = 1,
+        max_batch: int = 256,
+        max_wait: float = 0.05,
+        target_step_time: float = 0.1,
+        snapshot_every: int = 1
+    ):
+        self.train_fn = train_fn
+        self.snapshot_fn = snapshot_fn
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.target_step_time = target_step_time
+        self.snapshot_every = snapshot_every
+        self.logger = logging.getLogger('online_learning')
+
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = min_batch
+        self.thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._snapshot: Optional[ModelSnapshot] = None
+
+        self.events_received = 0
+        self.events_dropped = 0
+        self.events_trained = 0
+        self.steps = 0
+        self.failed_steps = 0
+        self._step_times = deque(maxlen=100)
+        self._latencies = deque(maxlen=1000)
+        self._throughput = deque(maxlen=100)  # (完成时间, 事件数)
+
+    # ---------- 生产者 ----------
+
+    def submit(self, event: Any, block: bool = False, timeout: Optional[float] = None) -> bool:
+        """提交交互事件，队列已满时(非阻塞模式)丢弃并返回 False"""
+        try:
+            self.queue.put((time.monotonic(), event), block=block, timeout=timeout)
+        except queue.Full:
+            self.events_dropped += 1
+            return False
+        self.events_received += 1
+        return True
+
+    # ---------- 推理侧 ----------
+
+    @property
+    def snapshot(self) -> Optional[ModelSnapshot]:
+        """最新发布的模型快照"""
+        return self._snapshot
+
+    def publish_snapshot(self):
+        """立即生成并发布模型快照"""
+        if self.snapshot_fn is None:
+            return
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        self._snapshot = ModelSnapshot(
+            version=version,
+            model=self.snapshot_fn(),
+            created=time.monotonic(),
+            events_trained=self.events_trained
+        )
+
+    # ---------- 工作线程 ----------
+
+    def start(self):
+        """启动训练工作线程"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, name='online-learning', daemon=True)
+        self.thread.start()
+
+    def stop(self, drain: bool = True, timeout: Optional[float] = None):
+        """停止工作线程，drain 为 True 时先训练完队列中剩余的事件"""
+        if self.thread is None:
+            return
+        if drain:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self.queue.empty() and self.thread.is_alive():
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                time.sleep(0.01)
+        self._stop.set()
+        self.thread.join(timeout)
+        self.thread = None
+
+    def _collect(self) -> List[tuple]:
+        """凑批：等待第一个事件，然后在 max_wait 内继续收集直到达到批量大小"""
+        try:
+            batch = [self.queue.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0
+                             else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if not batch:
+                continue
+            self._train(batch)
+
+    def _train(self, batch: List[tuple]):
+        start = time.monotonic()
+        try:
+            self.train_fn([event for _, event in batch])
+        except Exception as e:
+            self.failed_steps += 1
+            self.logger.error(f"Online training step failed: {str(e)}")
+            return
+        end = time.monotonic()
+
+        step_time = end - start
+        self.steps += 1
+        self.events_trained += len(batch)
+        self._step_times.append(step_time)
+        self._latencies.extend(end - enqueued for enqueued, _ in batch)
+        self._throughput.append((end, len(batch)))
+        self._adapt_batch_size(step_time)
+
+        if self.snapshot_fn is not None and self.steps % self.snapshot_every == 0:
+            try:
+                self.publish_snapshot()
+            except Exception as e:
+                self.logger.error(f"Snapshot publish failed: {str(e)}")
+
+    def _adapt_batch_size(self, step_time: float):
+        if self.queue.qsize() > self.batch_size:
+            self.batch_size = min(self.max_batch, self.batch_size * 2)
+        elif step_time > self.target_step_time:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+
+    # ---------- 指标 ----------
+
+    def get_metrics(self) -> Dict:
+        """吞吐量和滞后指标"""
+        now = time.monotonic()
+        throughput = 0.0
+        if len(self._throughput) > 1:
+            span = self._throughput[-1][0] - self._throughput[0][0]
+            events = sum(count for _, count in list(self._throughput)[1:])
+            throughput = events / span if span > 0 else 0.0
+        latencies = sorted(self._latencies)
+        snapshot = self._snapshot
+        return {
+            'events_received': self.events_received,
+            'events_trained': self.events_trained,
+            'events_dropped': self.events_dropped,
+            'queue_depth': self.queue.qsize(),
+            'steps': self.steps,
+            'failed_steps': self.failed_steps,
+            'batch_size': self.batch_size,
+            'events_per_second': throughput,
+            'step_time_ms': 1000 * sum(self._step_times) / len(self._step_times) if self._step_times else 0.0,
+            'event_latency_ms': {
+                'p50': 1000 * latencies[len(latencies) // 2] if latencies else 0.0,
+                'max': 1000 * latencies[-1] if latencies else 0.0
+            },
+            'snapshot': {
+                'version': snapshot.version if snapshot else 0,
+                'age_seconds': now - snapshot.created if snapshot else None,
+                # 已训练但尚未反映到快照中的事件数
+                'events_behind': self.events_trained - snapshot.events_trained if snapshot else self.events_trained
+            }
+        }
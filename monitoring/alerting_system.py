@@ -1,4 +1,5 @@
 import logging
+from utils.logging import get_logger
 from typing import Dict, List, Optional
 from datetime import datetime
 import smtplib
@@ -7,8 +8,7 @@ from email.mime.multipart import MIMEMultipart
 
 class AlertSystem:
     def __init__(self):
-        self.logger = logging.getLogger('alert_system')
-        self._setup_logging()
+        self.logger = get_logger('alert_system', 'alert_system.log')
         
         self.alert_levels = {
             'INFO': 0,
@@ -25,16 +25,6 @@ class AlertSystem:
             'password': 'your-password'
         }
 
-    def _setup_logging(self):
-        """设置日志系统"""
-        self.logger.setLevel(logging.DEBUG)
-        handler = logging.FileHandler('logs/alert_system.log')
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
-
     def trigger_alert(self, level: str, message: str, component: str):
         """触发警报"""
         alert = {
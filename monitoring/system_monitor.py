@@ -2,6 +2,7 @@ import psutil # type: ignore
 import time
 import threading
 import logging
+from utils.logging import get_logger
 from typing import Dict, List, Optional
 from datetime import datetime
 import json
@@ -9,8 +10,7 @@ import os
 
 class SystemMonitor:
     def __init__(self):
-        self.logger = logging.getLogger('system_monitor')
-        self._setup_logging()
+        self.logger = get_logger('system_monitor', 'system_monitor.log', console=True)
         
         self.metrics: Dict[str, Dict] = {
             'system': {},
@@ -31,23 +31,6 @@ class SystemMonitor:
             'response_time': 2.0
         }
 
-    def _setup_logging(self):
-        """设置日志系统"""
-        self.logger.setLevel(logging.DEBUG)
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        
-        # 文件处理器
-        file_handler = logging.FileHandler('logs/system_monitor.log')
-        file_handler.setFormatter(formatter)
-        self.logger.addHandler(file_handler)
-        
-        # 控制台处理器
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
-
     def start_monitoring(self):
         """启动监控"""
         self.is_monitoring = True
@@ -4,21 +4,23 @@ from sklearn.metrics.pairwise import cosine_similarity # type: ignore
 import torch # type: ignore
 import jieba # type: ignore
 from typing import List, Dict, Any, Tuple
+from models.model_storage import get_model_store
 
 class NaturalLanguageUnderstanding:
     def __init__(self):
-        # 加载预训练模型和分词器
+        # 加载预训练模型和分词器(从本地模型仓库加载，离线模式下不访问网络)
+        store = get_model_store()
         self.model_name = "bert-base-chinese"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModel.from_pretrained(self.model_name)
+        self.tokenizer = store.pretrained(AutoTokenizer, self.model_name)
+        self.model = store.pretrained(AutoModel, self.model_name)
         
         # 情感分析pipeline
         self.sentiment_analyzer = pipeline("sentiment-analysis", 
-                                         model="uer/roberta-base-finetuned-jd-binary-chinese")
+                                         model=store.pretrained_path("uer/roberta-base-finetuned-jd-binary-chinese"))
         
         # 问答系统
         self.qa_pipeline = pipeline("question-answering", 
-                                  model="uer/roberta-base-chinese-extractive-qa")
+                                  model=store.pretrained_path("uer/roberta-base-chinese-extractive-qa"))
         
         self.context_history = []
         self.embedding_cache = {}
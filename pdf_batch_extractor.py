@@ -0,0 +1,337 @@
+import multiprocessing
+import logging
+import time
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+ENGINES = ('pdfplumber', 'pypdf2')
+
+class PageResult(NamedTuple):
+    """单页提取结果，失败时 text 为 None、error 为错误信息"""
+    path: str
+    page_number: int
+    text: Optional[str]
+    engine: Optional[str]
+    error: Optional[str] = None
+
+# ---------- 工作进程 ----------
+
+_plumber_reader = None
+_probe_reader = None
+_use_cache = True
+_pypdf2_readers: 'OrderedDict[Tuple[str, int], object]' = OrderedDict()
+
+def _init_worker(use_cache: bool):
+    global _use_cache
+    _use_cache = use_cache
+
+def _get_plumber_reader():
+    global _plumber_reader
+    if _plumber_reader is None:
+        from pdf_reader import PDFReader
+        _plumber_reader = PDFReader(use_cache=_use_cache)
+    return _plumber_reader
+
+def _pdfplumber_page(path: str, page_number: int) -> str:
+    for _, text in _get_plumber_reader().iter_pages(path, page_number, page_number + 1):
+        return text
+    raise IndexError(f"page {page_number} out of range")
+
+def _pypdf2_reader(path: str):
+    """按 (路径, mtime) 缓存 PyPDF2 文档，同一进程处理同一文档的多个页段时不重复解析"""
+    import PyPDF2 # type: ignore
+    key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    reader = _pypdf2_readers.get(key)
+    if reader is None:
+        reader = PyPDF2.PdfReader(key[0])
+        _pypdf2_readers[key] = reader
+        while len(_pypdf2_readers) > 4:
+            _pypdf2_readers.popitem(last=False)
+    _pypdf2_readers.move_to_end(key)
+    return reader
+
+def _pypdf2_page(path: str, page_number: int) -> str:
+    return (_pypdf2_reader(path).pages[page_number].extract_text() or '').strip()
+
+_EXTRACTORS: Dict[str, Callable[[str, int], str]] = {
+    'pdfplumber': _pdfplumber_page,
+    'pypdf2': _pypdf2_page
+}
+
+def _page_count(path: str) -> int:
+    try:
+        return len(_pypdf2_reader(path).pages)
+    except Exception:
+        return _get_plumber_reader().page_count(path)
+
+def _probe_plumber_page(path: str, page_number: int) -> str:
+    """探测计时用的 pdfplumber 提取，不读写页面文本缓存(否则缓存命中会偏向 pdfplumber)"""
+    global _probe_reader
+    if _probe_reader is None:
+        from pdf_reader import PDFReader
+        _probe_reader = PDFReader(max_open_documents=1, use_cache=False)
+    for _, text in _probe_reader.iter_pages(path, page_number, page_number + 1):
+        return text
+    raise IndexError(f"page {page_number} out of range")
+
+_PROBE_EXTRACTORS: Dict[str, Callable[[str, int], str]] = {
+    'pdfplumber': _probe_plumber_page,
+    'pypdf2': _pypdf2_page
+}
+
+def probe_document(path: str, engine: str) -> Tuple[int, str]:
+    """
+    获取页数并选择提取引擎
+
+    engine 为 'auto' 时用两种引擎分别提取中间一页，选择能提取出文本且更快的引擎。
+    两种引擎都先提取一次(打开文档、确认有文本)，再计时第二次提取，
+    比较的是打开文档之后的单页提取耗时，不受打开顺序和缓存的影响。
+    """
+    count = _page_count(path)
+    if engine != 'auto' or count == 0:
+        return count, engine if engine != 'auto' else ENGINES[0]
+    sample = count // 2
+    timings = []
+    for name in ENGINES:
+        extract = _PROBE_EXTRACTORS[name]
+        try:
+            if not extract(path, sample):
+                continue
+            start = time.perf_counter()
+            extract(path, sample)
+        except Exception:
+            continue
+        timings.append((time.perf_counter() - start, name))
+    return count, min(timings)[1] if timings else ENGINES[0]
+
+def extract_range(path: str, start: int, end: int, engine: str, fallback: bool) -> List[PageResult]:
+    """提取 [start, end) 页，单页失败只影响该页"""
+    results = []
+    for page_number in range(start, end):
+        engines = [engine] + ([name for name in ENGINES if name != engine] if fallback else [])
+        errors = []
+        for name in engines:
+            try:
+                text = _EXTRACTORS[name](path, page_number)
+                results.append(PageResult(path, page_number, text, name))
+                break
+            except Exception as e:
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+        else:
+            results.append(PageResult(path, page_number, None, None, '; '.join(errors)))
+    return results
+
+# ---------- 主进程 ----------
+
+class BatchPDFExtractor:
+    """
+    多进程 PDF 批量文本提取
+
+    每个文档先在工作进程中探测页数并选择引擎，再按 pages_per_task 切分为页段分发到进程池。
+    结果以流的形式返回：ordered=True 时按文档顺序和页码顺序输出(乱序完成的页段在主进程缓冲)，
+    否则按完成顺序输出。同时在途的任务数受 max_in_flight 限制，按序输出时缓冲的页段数
+    达到 max_buffered 后只提交阻塞输出的任务，处理上千个文档时内存有界。
+    """
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        pages_per_task: int = 8,
+        engine: str = 'auto',
+        fallback: bool = True,
+        max_in_flight: Optional[int] = None,
+        mp_context: str = 'spawn',
+        use_cache: bool = True,
+        max_buffered: Optional[int] = None
+    ):
+        if engine not in ENGINES + ('auto',):
+            raise ValueError(f"Unknown engine: {engine}")
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = pages_per_task
+        self.engine = engine
+        self.fallback = fallback
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.max_buffered = max_buffered or self.max_in_flight
+        self.mp_context = mp_context
+        # 工作进程中的 pdfplumber 引擎是否使用页面文本磁盘缓存
+        self.use_cache = use_cache
+        self.logger = logging.getLogger('pdf_batch_extractor')
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+                initializer=_init_worker,
+                initargs=(self.use_cache,)
+            )
+        return self._pool
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        """提交任务；工作进程崩溃导致进程池不可用时重建进程池"""
+        try:
+            return self._get_pool().submit(fn, *args)
+        except BrokenProcessPool:
+            self.logger.warning("Process pool broken, restarting workers")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            return self._get_pool().submit(fn, *args)
+
+    def close(self):
+        """关闭进程池"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def iter_pages(self, paths: Iterable[str], ordered: bool = True) -> Iterator[PageResult]:
+        """
+        流式提取多个文档的全部页面
+
+        无法打开的文档输出一条 page_number 为 -1 的错误结果。
+        """
+        paths = list(paths)
+        # 任务: ('probe', 文档序号) 或 ('range', 文档序号, 页段序号, 起始页, 结束页, 引擎)
+        pending: Deque[tuple] = deque(('probe', index) for index in range(len(paths)))
+        in_flight: Dict[Future, tuple] = {}
+        chunk_counts: Dict[int, int] = {}
+        done_chunks: Dict[Tuple[int, int], List[PageResult]] = {}
+        cursor = [0, 0]  # 下一个按序输出的 (文档序号, 页段序号)
+
+        def emit_ready() -> Iterator[PageResult]:
+            while cursor[0] < len(paths) and cursor[0] in chunk_counts:
+                if cursor[1] >= chunk_counts[cursor[0]]:
+                    cursor[0] += 1
+                    cursor[1] = 0
+                    continue
+                key = (cursor[0], cursor[1])
+                if key not in done_chunks:
+                    return
+                yield from done_chunks.pop(key)
+                cursor[1] += 1
+
+        def take_blocking() -> Optional[tuple]:
+            """取出按序输出正在等待的任务(当前文档的探测或当前页段)，不在队列中时返回 None"""
+            for position, task in enumerate(pending):
+                if task[1] == cursor[0] and (task[0] == 'probe' or task[2] == cursor[1]):
+                    del pending[position]
+                    return task
+            return None
+
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < self.max_in_flight:
+                    if ordered and len(done_chunks) >= self.max_buffered:
+                        # 缓冲已满：只提交阻塞输出的任务，其余任务等缓冲输出后再提交
+                        task = take_blocking()
+                        if task is None:
+                            break
+                    else:
+                        task = pending.popleft()
+                    if task[0] == 'probe':
+                        future = self._submit(probe_document, paths[task[1]], self.engine)
+                    else:
+                        _, index, _, start, end, engine = task
+                        future = self._submit(extract_range, paths[index], start, end, engine, self.fallback)
+                    in_flight[future] = task
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = in_flight.pop(future)
+                    index = task[1]
+                    path = paths[index]
+                    if task[0] == 'probe':
+                        try:
+                            count, engine = future.result()
+                        except Exception as e:
+                            self.logger.error(f"Failed to open PDF {path}: {str(e)}")
+                            chunk_counts[index] = 1
+                            done_chunks[(index, 0)] = [PageResult(path, -1, None, None, f"{type(e).__name__}: {e}")]
+                        else:
+                            ranges = [(start, min(start + self.pages_per_task, count))
+                                      for start in range(0, count, self.pages_per_task)]
+                            chunk_counts[index] = len(ranges)
+                            # 页段插到队首，先完成已开始的文档，按序输出时缓冲更少
+                            for chunk, (start, end) in reversed(list(enumerate(ranges))):
+                                pending.appendleft(('range', index, chunk, start, end, engine))
+                    else:
+                        _, _, chunk, start, end, engine = task
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            # 工作进程崩溃等整段失败，逐页记录错误
+                            error = f"{type(e).__name__}: {e}"
+                            results = [PageResult(path, n, None, engine, error) for n in range(start, end)]
+                        done_chunks[(index, chunk)] = results
+
+                    if not ordered:
+                        for key in [k for k in done_chunks if k[0] == index]:
+                            yield from done_chunks.pop(key)
+                if ordered:
+                    yield from emit_ready()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def extract(self, paths: Iterable[str]) -> Dict[str, List[PageResult]]:
+        """提取多个文档，返回 路径 -> 按页码排序的结果列表"""
+        documents: Dict[str, List[PageResult]] = {}
+        for result in self.iter_pages(paths, ordered=True):
+            documents.setdefault(result.path, []).append(result)
+        return documents
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="多进程 PDF 批量文本提取")
+    parser.add_argument('paths', nargs='+', help="PDF 文件或目录")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--pages-per-task', type=int, default=8)
+    parser.add_argument('--engine', choices=ENGINES + ('auto',), default='auto')
+    parser.add_argument('--output-dir', default=None, help="每个文档写出一个 .txt 文件")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    files = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(root, name) for root, _, names in os.walk(path)
+                                for name in names if name.lower().endswith('.pdf')))
+        else:
+            files.append(path)
+
+    start = time.perf_counter()
+    pages = errors = 0
+    engines: Dict[str, int] = {}
+    with BatchPDFExtractor(args.workers, args.pages_per_task, args.engine) as extractor:
+        output = None
+        current = None
+        for result in extractor.iter_pages(files):
+            if args.output_dir and result.path != current:
+                if output:
+                    output.close()
+                current = result.path
+                os.makedirs(args.output_dir, exist_ok=True)
+                name = os.path.splitext(os.path.basename(result.path))[0] + '.txt'
+                output = open(os.path.join(args.output_dir, name), 'w', encoding='utf-8')
+            if result.error:
+                errors += 1
+                print(f"{result.path} page {result.page_number}: {result.error}")
+            else:
+                pages += 1
+                engines[result.engine] = engines.get(result.engine, 0) + 1
+                if output:
+                    output.write(result.text + '\n\f\n')
+        if output:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(f"{len(files)} documents, {pages} pages, {errors} errors in {elapsed:.1f}s "
+          f"({pages / elapsed:.1f} pages/s), engines: {engines}")
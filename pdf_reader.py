@@ -1,26 +1,149 @@
 import pdfplumber # type: ignore
+import threading
 import logging
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Iterator, List, Optional, Tuple
 from pathlib import Path
+from utils.caching import PageTextCache, get_page_cache
+
+class _Handle:
+    """已打开的 PDF 文档及其使用计数"""
+    def __init__(self, pdf):
+        self.pdf = pdf
+        self.users = 0
+        self.evicted = False
 
 class PDFReader:
-    def __init__(self):
+    def __init__(self, max_open_documents: int = 4, use_cache: bool = True,
+                 text_cache: Optional[PageTextCache] = None):
+        """
+        Args:
+            max_open_documents: 缓存的已打开文档数量上限，超出时关闭最久未使用的文档
+            use_cache: 是否使用页面文本磁盘缓存，命中时不需要打开和解析 PDF
+            text_cache: 自定义缓存，默认使用进程内共享的 pdfplumber 缓存
+        """
         self._setup_logging()
-    
+        self.max_open_documents = max_open_documents
+        self.text_cache = (text_cache or get_page_cache('pdfplumber')) if use_cache else None
+        # (绝对路径, mtime_ns, 文件大小) -> 已打开的文档，文件被修改后键变化，自动重新解析
+        self._handles: 'OrderedDict[Tuple[str, int, int], _Handle]' = OrderedDict()
+        self._lock = threading.RLock()
+
     def _setup_logging(self):
         """设置日志记录"""
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
-    
+
+    def _acquire(self, file_path: str) -> Tuple[Tuple[str, int, int], _Handle]:
+        """从缓存获取已打开的文档，未命中时打开并放入缓存"""
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is None:
+                # 同一路径的旧版本不会再被命中，直接淘汰
+                for stale in [k for k in self._handles if k[0] == key[0]]:
+                    self._evict(stale)
+                handle = _Handle(pdfplumber.open(str(path)))
+                self._handles[key] = handle
+                while len(self._handles) > self.max_open_documents:
+                    self._evict(next(iter(self._handles)))
+            self._handles.move_to_end(key)
+            handle.users += 1
+            return key, handle
+
+    def _release(self, handle: _Handle):
+        with self._lock:
+            handle.users -= 1
+            if handle.evicted and handle.users == 0:
+                handle.pdf.close()
+
+    def _evict(self, key: Tuple[str, int, int]):
+        """移出缓存；仍在被生成器使用的文档在最后一个使用者释放时关闭"""
+        handle = self._handles.pop(key)
+        handle.evicted = True
+        if handle.users == 0:
+            handle.pdf.close()
+
+    def close(self):
+        """关闭所有缓存的文档"""
+        with self._lock:
+            for key in list(self._handles):
+                self._evict(key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def page_count(self, file_path: str) -> int:
+        """获取PDF页数"""
+        if self.text_cache is not None:
+            count = self.text_cache.page_count(file_path)
+            if count is not None:
+                return count
+        _, handle = self._acquire(file_path)
+        try:
+            return len(handle.pdf.pages)
+        finally:
+            self._release(handle)
+
+    def iter_pages(self, file_path: str, start: int = 0,
+                   end: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        逐页惰性提取PDF文本
+
+        所有页面共用一个打开的文档句柄，每页提取后立即释放该页的解析缓存，
+        内存占用与文档总页数无关。已缓存的页面直接从磁盘缓存读取，全部命中时不打开 PDF。
+
+        Args:
+            file_path: PDF文件路径
+            start: 起始页码（从0开始）
+            end: 结束页码（不包含），None 表示到最后一页
+
+        Raises:
+            ValueError: 页码为负数
+
+        Yields:
+            (页码, 页面文本)，页面没有文本时为空字符串
+        """
+        if start < 0 or (end is not None and end < 0):
+            raise ValueError(f"页码不能为负数: start={start}, end={end}")
+        count = self.page_count(file_path)
+        handle = None
+        try:
+            for page_number in range(start, count if end is None else min(end, count)):
+                text = self.text_cache.get(file_path, page_number) if self.text_cache else None
+                if text is None:
+                    if handle is None:
+                        _, handle = self._acquire(file_path)
+                    text = self._page_text(handle.pdf, page_number)
+                    if self.text_cache is not None:
+                        self.text_cache.put(file_path, page_number, text, count)
+                yield page_number, text
+        finally:
+            if handle is not None:
+                self._release(handle)
+
+    def _page_text(self, pdf, page_number: int) -> str:
+        """提取单页文本并释放该页的解析缓存"""
+        page = pdf.pages[page_number]
+        try:
+            return (page.extract_text() or '').strip()
+        finally:
+            page.close()
+
     def read_pdf(self, file_path: str) -> Optional[List[str]]:
         """
         读取PDF文件内容
-        
+
         Args:
             file_path: PDF文件路径
-            
+
         Returns:
             List[str]: PDF中的文本内容列表，每个元素为一页内容
             如果读取失败返回 None
@@ -29,52 +152,46 @@ class PDFReader:
             if not Path(file_path).exists():
                 logging.error(f"PDF文件不存在: {file_path}")
                 return None
-                
-            text_content = []
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_content.append(text.strip())
-            
+
+            text_content = [text for _, text in self.iter_pages(file_path) if text]
+
             if not text_content:
                 logging.warning(f"PDF文件 {file_path} 没有可提取的文本内容")
                 return None
-                
+
             logging.info(f"成功读取PDF文件: {file_path}")
             return text_content
-            
+
         except Exception as e:
             logging.error(f"读取PDF文件时发生错误: {str(e)}")
             return None
-    
+
     def extract_text_from_page(self, file_path: str, page_number: int) -> Optional[str]:
         """
-        提取PDF特定页面的文本
-        
+        提取PDF特定页面的文本(优先读取磁盘缓存，否则复用缓存的文档句柄，不重新解析整个文件)
+
         Args:
             file_path: PDF文件路径
             page_number: 页码（从0开始）
-            
+
         Returns:
             str: 页面文本内容
             如果提取失败返回 None
         """
         try:
-            with pdfplumber.open(file_path) as pdf:
-                if page_number >= len(pdf.pages):
-                    logging.error(f"页码 {page_number} 超出PDF页数范围")
-                    return None
-                    
-                page = pdf.pages[page_number]
-                text = page.extract_text()
-                
-                if not text:
-                    logging.warning(f"页面 {page_number} 没有可提取的文本内容")
-                    return None
-                    
-                return text.strip()
-                
+            if not 0 <= page_number < self.page_count(file_path):
+                logging.error(f"页码 {page_number} 超出PDF页数范围")
+                return None
+            text = ''
+            for _, text in self.iter_pages(file_path, page_number, page_number + 1):
+                pass
+
+            if not text:
+                logging.warning(f"页面 {page_number} 没有可提取的文本内容")
+                return None
+
+            return text
+
         except Exception as e:
             logging.error(f"提取页面文本时发生错误: {str(e)}")
             return None
@@ -82,15 +199,19 @@ class PDFReader:
 if __name__ == "__main__":
     # 测试代码
     reader = PDFReader()
-    
+
     # 测试读取整个PDF
     test_pdf = "test.pdf"  # 替换为实际的PDF文件路径
     content = reader.read_pdf(test_pdf)
     if content:
         print(f"PDF总页数: {len(content)}")
         print("第一页内容预览:", content[0][:200])
-    
+
+    # 测试逐页读取
+    for page_number, text in reader.iter_pages(test_pdf) if Path(test_pdf).exists() else []:
+        print(f"第 {page_number + 1} 页: {text[:50]}")
+
     # 测试读取特定页面
     page_text = reader.extract_text_from_page(test_pdf, 0)
     if page_text:
-        print("第一页内容:", page_text[:200]) 
\ No newline at end of file
+        print("第一页内容:", page_text[:200])
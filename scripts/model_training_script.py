@@ -1 +1,224 @@
- 
+"""
+学习模型超参数搜索
+
+在进程池中并行评估 AutonomousLearner、AdaptiveLearner、ReinforcementLearner 的
+learning_rate / batch_size / epochs 组合，采用逐次减半(successive halving)提前淘汰差的试验:
+第一轮所有配置以最少的 epochs 训练，每轮只保留得分前 1/eta 的配置并把 epochs 乘以 eta，
+直到达到 config/system_config.json 中 learning.epochs。
+
+每个工作进程绑定到一个 CPU 核，并把 TensorFlow/BLAS 线程数限制为 --threads，
+进程数 x 线程数等于核数时可以占满整机而不会相互抢占。
+每次评估的结果追加写入 JSONL 文件。
+
+用法:
+    python scripts/model_training_script.py --model autonomous --trials 27
+    python scripts/model_training_script.py --model reinforcement --workers 8 --threads 1 --eta 3
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List
+import multiprocessing
+import argparse
+import json
+import math
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BATCH_SIZES = [16, 32, 64, 128]
+
+def load_learning_config(path: str = 'config/system_config.json') -> Dict:
+    """读取 learning 配置，作为搜索空间的中心"""
+    defaults = {'learning_rate': 0.01, 'batch_size': 32, 'epochs': 10}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            defaults.update(json.load(f).get('learning', {}))
+    except FileNotFoundError:
+        pass
+    return defaults
+
+def sample_configs(count: int, base: Dict, seed: int) -> List[Dict]:
+    """在基准学习率上下一个数量级内对数均匀采样，batch_size 从候选中选择"""
+    import numpy as np # type: ignore
+    rng = np.random.default_rng(seed)
+    log_lr = math.log10(base['learning_rate'])
+    configs = [{'learning_rate': base['learning_rate'], 'batch_size': base['batch_size']}]
+    while len(configs) < count:
+        configs.append({
+            'learning_rate': float(10 ** rng.uniform(log_lr - 1, log_lr + 1)),
+            'batch_size': int(rng.choice(BATCH_SIZES))
+        })
+    return configs
+
+# ---------- 工作进程 ----------
+
+def _init_worker(counter, threads: int):
+    """绑定 CPU 核并限制线程数(必须在导入 TensorFlow 之前)"""
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                 'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'):
+        os.environ[name] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+    if hasattr(os, 'sched_setaffinity'):
+        cpus = sorted(os.sched_getaffinity(0))
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        start = (index * threads) % len(cpus)
+        os.sched_setaffinity(0, {cpus[(start + i) % len(cpus)] for i in range(threads)})
+
+    import tensorflow as tf # type: ignore
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+def _evaluate_autonomous(params: Dict, epochs: int, seed: int) -> float:
+    """上下文老虎机数据上的动作准确率"""
+    import numpy as np # type: ignore
+    from models.autonomous_learning import AutonomousLearner
+    rng = np.random.default_rng(seed)
+    states = rng.random((4096, 10), dtype=np.float32)
+    actions = states[:, :4].argmax(axis=1).astype(np.int32)
+    rewards = np.ones(len(states), dtype=np.float32)
+    test = rng.random((1024, 10), dtype=np.float32)
+
+    learner = AutonomousLearner()
+    learner.optimizer.learning_rate = params['learning_rate']
+    batch_size = params['batch_size']
+    for _ in range(epochs):
+        order = rng.permutation(len(states))
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            learner.train_on_batch((states[rows], actions[rows], rewards[rows]))
+    return float((learner.predict_actions(test) == test[:, :4].argmax(axis=1)).mean())
+
+def _evaluate_adaptive(params: Dict, epochs: int, seed: int) -> float:
+    """高斯簇数据上预测簇标签的准确率"""
+    import numpy as np # type: ignore
+    import tensorflow as tf # type: ignore
+    from models.autonomous_learning.adaptive_learning import AdaptiveLearner
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=3.0, size=(8, 50))
+    labels = rng.integers(0, 8, 4096 + 1024)
+    data = (centers[labels] + rng.normal(size=(len(labels), 50))).astype(np.float32)
+
+    learner = AdaptiveLearner(streaming=False)
+    learner.model.optimizer.learning_rate = params['learning_rate']
+    learner.model.fit(
+        data[:4096], tf.keras.utils.to_categorical(labels[:4096], num_classes=8),
+        epochs=epochs, batch_size=params['batch_size'], verbose=0
+    )
+    predictions = learner.model(data[4096:], training=False).numpy().argmax(axis=1)
+    return float((predictions == labels[4096:]).mean())
+
+def _evaluate_reinforcement(params: Dict, epochs: int, seed: int) -> float:
+    """单步决策任务上贪心策略的准确率，每个 epoch 为 100 次回放"""
+    import numpy as np # type: ignore
+    from models.autonomous_learning.reinforcement_learning import ReinforcementLearner
+    rng = np.random.default_rng(seed)
+    learner = ReinforcementLearner()
+    learner.model.optimizer.learning_rate = params['learning_rate']
+    states = rng.random((4096, 4), dtype=np.float32)
+    actions = rng.integers(0, 2, len(states))
+    rewards = (actions == (states[:, 0] > states[:, 1])).astype(np.float32)
+    learner.memory.store_batch(states[:2000], actions[:2000], rewards[:2000],
+                               states[:2000], np.ones(2000, dtype=np.bool_))
+    for _ in range(epochs * 100):
+        learner.replay(params['batch_size'])
+    test = rng.random((1024, 4), dtype=np.float32)
+    greedy = learner.model(test, training=False).numpy().argmax(axis=1)
+    return float((greedy == (test[:, 0] > test[:, 1])).mean())
+
+EVALUATORS = {
+    'autonomous': _evaluate_autonomous,
+    'adaptive': _evaluate_adaptive,
+    'reinforcement': _evaluate_reinforcement
+}
+
+def run_trial(model: str, trial_id: int, params: Dict, epochs: int, seed: int) -> Dict:
+    """在工作进程中训练并评估一个配置"""
+    start = time.perf_counter()
+    score = EVALUATORS[model](params, epochs, seed)
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None
+    return {
+        'trial_id': trial_id,
+        'model': model,
+        'params': params,
+        'epochs': epochs,
+        'score': score,
+        'seconds': time.perf_counter() - start,
+        'pid': os.getpid(),
+        'cpus': cpus
+    }
+
+# ---------- 主进程 ----------
+
+def successive_halving(args) -> List[Dict]:
+    base = load_learning_config(args.config)
+    max_epochs = args.max_epochs or int(base['epochs'])
+    configs = sample_configs(args.trials, base, args.seed)
+    # 轮数同时受试验数和 epochs 上限限制，最后一轮恰好训练 max_epochs
+    rungs = max(1, min(int(math.log(len(configs), args.eta) + 1e-9),
+                       int(math.log(max_epochs, args.eta) + 1e-9)) + 1)
+    schedule = [max(1, round(max_epochs / args.eta ** (rungs - 1 - rung))) for rung in range(rungs)]
+
+    ctx = multiprocessing.get_context('spawn')
+    counter = ctx.Value('i', 0)
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+
+    survivors = list(enumerate(configs))
+    history = []
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(counter, args.threads)) as pool, \
+            open(args.results, 'a', encoding='utf-8') as results_file:
+        for rung, epochs in enumerate(schedule):
+            print(f"rung {rung}: {len(survivors)} trials x {epochs} epochs")
+            futures = [
+                pool.submit(run_trial, args.model, trial_id, params, epochs, args.seed)
+                for trial_id, params in survivors
+            ]
+            results = []
+            for future in as_completed(futures):
+                result = future.result()
+                result['rung'] = rung
+                results.append(result)
+                results_file.write(json.dumps(result, ensure_ascii=False) + '\n')
+                results_file.flush()
+                print(f"  trial {result['trial_id']:>3} score={result['score']:.4f} "
+                      f"lr={result['params']['learning_rate']:.5f} "
+                      f"batch={result['params']['batch_size']} {result['seconds']:.1f}s")
+            history.extend(results)
+
+            if rung == rungs - 1 or len(results) <= 1:
+                break
+            results.sort(key=lambda r: r['score'], reverse=True)
+            keep = max(1, len(results) // args.eta)
+            survivors = [(r['trial_id'], r['params']) for r in results[:keep]]
+    return history
+
+def main():
+    parser = argparse.ArgumentParser(description="学习模型超参数搜索(逐次减半)")
+    parser.add_argument('--model', choices=sorted(EVALUATORS), default='autonomous')
+    parser.add_argument('--trials', type=int, default=27)
+    parser.add_argument('--eta', type=int, default=3, help="每轮保留 1/eta 的试验")
+    parser.add_argument('--max-epochs', type=int, default=None, help="默认读取 learning.epochs")
+    parser.add_argument('--workers', type=int, default=None, help="默认 CPU 核数 / threads")
+    parser.add_argument('--threads', type=int, default=1, help="每个工作进程的线程数")
+    parser.add_argument('--results', default='results/hparam_sweep.jsonl')
+    parser.add_argument('--config', default='config/system_config.json')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    args.workers = args.workers or max(1, cores // args.threads)
+
+    start = time.perf_counter()
+    history = successive_halving(args)
+    best = max(history, key=lambda r: (r['epochs'], r['score']))
+    print(f"\n{len(history)} evaluations in {time.perf_counter() - start:.1f}s "
+          f"on {args.workers} workers x {args.threads} threads")
+    print(f"best: {json.dumps(best['params'])} score={best['score']:.4f} at {best['epochs']} epochs")
+    print(f"results appended to {args.results}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+流式语音接口测试客户端
+
+读取录制好的 WAV 文件(16-bit 单声道)，按帧推送到 /api/v1/voice/stream，
+并打印服务端返回的 partial / final 结果。
+
+用法:
+    python scripts/voice_stream_client.py recording.wav --url ws://localhost:8000/api/v1/voice/stream
+"""
+import argparse
+import asyncio
+import json
+import time
+import wave
+import aiohttp # type: ignore
+
+async def stream_wav(url: str, wav_path: str, frame_ms: int = 30,
+                     realtime: bool = True, user_id: str = None):
+    """按帧发送 WAV 音频并打印识别结果"""
+    with wave.open(wav_path, 'rb') as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError("仅支持 16-bit 单声道 WAV 文件")
+        sample_rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+
+    frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+    start = time.perf_counter()
+
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(url) as ws:
+
+            async def receiver():
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    data = json.loads(msg.data)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if data['type'] == 'final':
+                        print(f"[{elapsed:8.1f}ms] final #{data['segment_id']}: {data['text']} "
+                              f"latency={data['latency_ms']}")
+                    elif data['type'] == 'partial':
+                        print(f"[{elapsed:8.1f}ms] partial #{data['segment_id']}: {data['text']}")
+                    else:
+                        print(f"[{elapsed:8.1f}ms] {data}")
+
+            receive_task = asyncio.create_task(receiver())
+            await ws.send_str(json.dumps({
+                'type': 'start',
+                'sample_rate': sample_rate,
+                'user_id': user_id
+            }))
+
+            for offset in range(0, len(frames), frame_bytes):
+                await ws.send_bytes(frames[offset:offset + frame_bytes])
+                if realtime:
+                    await asyncio.sleep(frame_ms / 1000)
+
+            await ws.send_str(json.dumps({'type': 'end'}))
+            await receive_task
+
+    print(f"音频时长: {len(frames) / 2 / sample_rate:.2f}s, "
+          f"总耗时: {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="流式语音接口测试客户端")
+    parser.add_argument('wav', help="WAV 文件路径(16-bit 单声道)")
+    parser.add_argument('--url', default="ws://localhost:8000/api/v1/voice/stream")
+    parser.add_argument('--frame-ms', type=int, default=30)
+    parser.add_argument('--fast', action='store_true', help="不按实时速度发送")
+    parser.add_argument('--user-id', default=None)
+    args = parser.parse_args()
+
+    asyncio.run(stream_wav(args.url, args.wav, args.frame_ms,
+                           realtime=not args.fast, user_id=args.user_id))
@@ -0,0 +1,57 @@
+import os
+import time
+import numpy as np
+from models.autonomous_learning.checkpoint import CheckpointManager
+
+def _snapshot(step, value=1.0):
+    return {
+        'model': {'weights': [np.full(3, value, dtype=np.float32)], 'optimizer': []},
+        'replay': {'states': np.zeros((2, 3), dtype=np.float32)},
+        'meta': {'step': step}
+    }
+
+def _set_written(manager, name, timestamp):
+    os.utime(os.path.join(manager.root, name, 'meta.json'), (timestamp, timestamp))
+
+def test_rewriting_a_step_replaces_it_atomically(tmp_path):
+    manager = CheckpointManager(str(tmp_path), keep=3)
+    manager._write(_snapshot(5, value=1.0))
+    path = manager._write(_snapshot(5, value=2.0))
+    assert manager.latest() == path
+    with np.load(os.path.join(path, 'weights.npz')) as weights:
+        assert weights['arr_0'][0] == 2.0
+    # 被替换的旧目录和临时目录都不会残留
+    assert sorted(os.listdir(tmp_path)) == ['ckpt-0000000005', 'latest']
+
+def test_latest_recovers_checkpoint_moved_aside(tmp_path):
+    manager = CheckpointManager(str(tmp_path))
+    path = manager._write(_snapshot(7))
+    # 模拟替换时在两次 rename 之间崩溃：旧版本已移到一边，新版本尚未就位
+    os.rename(path, os.path.join(tmp_path, '.old-ckpt-0000000007-1-2'))
+    assert manager.latest() == path
+    assert os.path.isfile(os.path.join(path, 'meta.json'))
+    assert not any(name.startswith('.old-') for name in os.listdir(tmp_path))
+
+def test_prune_follows_write_order(tmp_path):
+    manager = CheckpointManager(str(tmp_path), keep=2)
+    now = time.time()
+    for offset, step in enumerate((10, 20, 30)):
+        manager._write(_snapshot(step))
+        _set_written(manager, f'ckpt-{step:010d}', now - 300 + offset * 100)
+    assert manager.list_checkpoints() == ['ckpt-0000000020', 'ckpt-0000000030']
+
+    # 恢复到较早步数后继续训练：步数更小但写入更晚的检查点被保留
+    manager._write(_snapshot(5))
+    assert manager.list_checkpoints() == ['ckpt-0000000030', 'ckpt-0000000005']
+    assert os.path.basename(manager.latest()) == 'ckpt-0000000005'
+
+def test_prune_never_removes_latest(tmp_path):
+    manager = CheckpointManager(str(tmp_path), keep=1)
+    manager._write(_snapshot(10))
+    _set_written(manager, 'ckpt-0000000010', time.time() - 1000)
+    # 目录中出现写入时间更晚但不是 latest 的检查点(例如其他进程留下的)
+    other = CheckpointManager(str(tmp_path / 'other'))
+    os.rename(other._write(_snapshot(99)), os.path.join(tmp_path, 'ckpt-0000000099'))
+    manager._prune()
+    assert manager.list_checkpoints() == ['ckpt-0000000010', 'ckpt-0000000099']
+    assert os.path.basename(manager.latest()) == 'ckpt-0000000010'
@@ -0,0 +1,85 @@
+import threading
+import time
+from data.storage.page_prefetcher import PagePrefetcher
+
+class SlowSource:
+    """提取/渲染耗时可控的假数据源，记录每页被提取的次数"""
+    def __init__(self, extract_delay=0.0, render_delay=0.0):
+        self.extract_delay = extract_delay
+        self.render_delay = render_delay
+        self.extracted = {}
+        self.extracting = {}
+        self.rendering = threading.Event()
+
+    def extract(self, page_number):
+        self.extracted[page_number] = self.extracted.get(page_number, 0) + 1
+        self.extracting.setdefault(page_number, threading.Event()).set()
+        time.sleep(self.extract_delay)
+        return f"page {page_number}"
+
+    def render(self, text):
+        self.rendering.set()
+        time.sleep(self.render_delay)
+        return b'audio:' + text.encode('utf-8')
+
+    def wait_extracting(self, page_number, timeout=5.0):
+        event = self.extracting.setdefault(page_number, threading.Event())
+        assert event.wait(timeout)
+
+def test_get_during_extraction_hands_off_result():
+    source = SlowSource(extract_delay=0.4)
+    prefetcher = PagePrefetcher(source.extract, depth=2)
+    prefetcher.start()
+    try:
+        prefetcher.update(0, 10)
+        source.wait_extracting(1)
+        page = prefetcher.get(1)
+        assert page is not None
+        assert page.text == "page 1"
+        assert source.extracted[1] == 1
+        assert prefetcher.get_stats()['discarded'] == 0
+    finally:
+        prefetcher.stop()
+
+def test_get_during_render_keeps_audio():
+    source = SlowSource(render_delay=0.4)
+    prefetcher = PagePrefetcher(source.extract, source.render, depth=1)
+    prefetcher.start()
+    try:
+        prefetcher.update(0, 10)
+        assert source.rendering.wait(5.0)
+        page = prefetcher.get(1)
+        assert page is not None
+        assert page.audio == b'audio:page 1'
+        assert prefetcher.get_stats()['discarded'] == 0
+    finally:
+        prefetcher.stop()
+
+def test_ready_page_is_returned_without_waiting():
+    source = SlowSource()
+    prefetcher = PagePrefetcher(source.extract, depth=2)
+    prefetcher.start()
+    try:
+        prefetcher.update(0, 10)
+        deadline = time.monotonic() + 5.0
+        while prefetcher.get_stats()['ready'] != [1, 2] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        page = prefetcher.get(2)
+        assert page is not None and page.text == "page 2"
+        assert prefetcher.get(5) is None
+    finally:
+        prefetcher.stop()
+
+def test_cancel_discards_in_flight_page():
+    source = SlowSource(extract_delay=0.3)
+    prefetcher = PagePrefetcher(source.extract, depth=1)
+    prefetcher.start()
+    try:
+        prefetcher.update(0, 10)
+        source.wait_extracting(1)
+        prefetcher.cancel()
+        prefetcher.update(0, 10)  # 同一页重新进入窗口，取消前的结果仍不能使用
+        page = prefetcher.get(1)
+        assert page is None
+    finally:
+        prefetcher.stop()
@@ -0,0 +1,94 @@
+import os
+import pytest
+from utils.caching import PageTextCache
+
+def _document(directory, name, content):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+def test_round_trip_and_page_count(tmp_path):
+    cache = PageTextCache('test', cache_dir=str(tmp_path / 'cache'))
+    path = _document(tmp_path, 'a.pdf', b'document a')
+    assert cache.page_count(path) is None
+    assert cache.get(path, 0) is None
+
+    cache.put(path, 1, '第二页', 3)
+    cache.put(path, 0, 'page one', 3)
+    assert cache.page_count(path) == 3
+    assert cache.get(path, 0) == 'page one'
+    assert cache.get(path, 1) == '第二页'
+    assert cache.get(path, 2) is None
+
+    calls = []
+    text = cache.get_or_extract(path, 2, 3, lambda: calls.append(1) or 'page three')
+    assert text == 'page three' and cache.get_or_extract(path, 2, 3, lambda: 'other') == 'page three'
+    assert calls == [1]
+
+def test_modified_file_misses(tmp_path):
+    cache = PageTextCache('test', cache_dir=str(tmp_path / 'cache'))
+    path = _document(tmp_path, 'a.pdf', b'version 1')
+    cache.put(path, 0, 'old text', 1)
+    _document(tmp_path, 'a.pdf', b'version 2 (different size)')
+    assert cache.get(path, 0) is None
+
+@pytest.mark.parametrize('page_number', [-1, 3, 10])
+def test_out_of_range_pages_are_rejected(tmp_path, page_number):
+    cache = PageTextCache('test', cache_dir=str(tmp_path / 'cache'))
+    path = _document(tmp_path, 'a.pdf', b'document a')
+    cache.put(path, 0, 'page one', 3)
+    with pytest.raises(ValueError):
+        cache.put(path, page_number, 'bad', 3)
+    with pytest.raises(ValueError):
+        cache.get_or_extract(path, page_number, 3, lambda: 'bad')
+    # 索引头没有被覆盖
+    assert cache.page_count(path) == 3
+    assert cache.get(path, 0) == 'page one'
+
+def test_corrupt_index_is_rebuilt(tmp_path):
+    cache = PageTextCache('test', cache_dir=str(tmp_path / 'cache'))
+    path = _document(tmp_path, 'a.pdf', b'document a')
+    cache.put(path, 0, 'page one', 2)
+    _, idx_path = cache._paths(cache.document_key(path))
+    with open(idx_path, 'r+b') as f:
+        f.write(b'XXXXXXXX')
+    assert cache.page_count(path) is None
+    assert cache.get(path, 0) is None
+
+    cache.put(path, 1, 'page two', 2)
+    assert cache.page_count(path) == 2
+    assert cache.get(path, 1) == 'page two'
+    assert cache.get(path, 0) is None  # 损坏前的条目随索引一起丢弃
+
+def test_eviction_removes_least_recently_used_documents(tmp_path):
+    # 每个文档: 索引 16 + 16 字节，数据 1000 字节
+    cache = PageTextCache('test', cache_dir=str(tmp_path / 'cache'), max_bytes=2500)
+    paths = [_document(tmp_path, f'{name}.pdf', name.encode()) for name in 'abc']
+    keys = [cache.document_key(path) for path in paths]
+
+    for age, (path, key) in zip((300, 200), zip(paths, keys)):
+        cache.put(path, 0, 'x' * 1000, 1)
+        idx_path = cache._paths(key)[1]
+        stat = os.stat(idx_path)
+        os.utime(idx_path, (stat.st_atime, stat.st_mtime - age))
+
+    cache.put(paths[2], 0, 'x' * 1000, 1)  # 超出上限，淘汰最久未访问的 a
+    assert cache.page_count(paths[0]) is None
+    assert cache.get(paths[1], 0) == 'x' * 1000
+    assert cache.get(paths[2], 0) == 'x' * 1000
+
+def test_eviction_keeps_document_being_written(tmp_path):
+    cache = PageTextCache('test', cache_dir=str(tmp_path / 'cache'), max_bytes=2500)
+    paths = [_document(tmp_path, f'{name}.pdf', name.encode()) for name in 'ab']
+    for path in paths:
+        cache.put(path, 0, 'x' * 1000, 1)
+    oldest = cache.document_key(paths[0])
+    idx_path = cache._paths(oldest)[1]
+    os.utime(idx_path, (0, 0))
+
+    cache.max_bytes = 1500
+    cache._evict(keep=oldest)
+    # 最久未访问的文档正在写入(keep)，淘汰跳过它，改为删除下一个
+    assert cache.get(paths[0], 0) == 'x' * 1000
+    assert cache.page_count(paths[1]) is None
@@ -0,0 +1,47 @@
+import numpy as np
+from models.autonomous_learning.replay_buffer import PrioritizedReplayBuffer, SumTree
+
+def test_sum_tree_totals_and_updates():
+    tree = SumTree(5)
+    assert tree.leaves == 8
+    tree.update(np.arange(5), np.array([1.0, 2.0, 3.0, 4.0, 5.0]))
+    assert tree.total == 15.0
+    tree.update(np.array([2, 2]), np.array([0.5, 0.5]))  # 重复下标只计一次
+    assert tree.total == 12.5
+    assert np.allclose(tree.get(np.arange(5)), [1.0, 2.0, 0.5, 4.0, 5.0])
+    # 每个内部节点等于两个子节点之和
+    internal = np.arange(1, tree.leaves)
+    assert np.allclose(tree.tree[internal], tree.tree[2 * internal] + tree.tree[2 * internal + 1])
+
+def test_sum_tree_find_uses_prefix_sums():
+    tree = SumTree(4)
+    tree.update(np.arange(4), np.array([1.0, 2.0, 3.0, 4.0]))
+    # 前缀和边界: [0,1] -> 0, (1,3] -> 1, (3,6] -> 2, (6,10] -> 3
+    values = np.array([0.0, 0.5, 1.0, 1.5, 3.0, 3.5, 6.0, 6.5, 9.99])
+    assert tree.find(values).tolist() == [0, 0, 0, 1, 1, 2, 2, 3, 3]
+
+def test_sum_tree_sampling_is_proportional_to_priority():
+    tree = SumTree(4)
+    tree.update(np.arange(4), np.array([1.0, 0.0, 3.0, 0.0]))
+    values = np.random.default_rng(0).random(20000) * tree.total
+    counts = np.bincount(tree.find(values), minlength=4)
+    assert counts[1] == 0 and counts[3] == 0
+    assert abs(counts[2] / counts[0] - 3.0) < 0.2
+
+def test_prioritized_buffer_prefers_high_error_samples():
+    buffer = PrioritizedReplayBuffer(capacity=8, state_dim=2, alpha=1.0, seed=0)
+    states = np.zeros((8, 2), dtype=np.float32)
+    buffer.store_batch(states, np.arange(8), np.zeros(8), states)
+    assert np.allclose(buffer.tree.get(np.arange(8)), 1.0)  # 新经验以最大优先级写入
+
+    errors = np.full(8, 0.1)
+    errors[5] = 10.0
+    buffer.update_priorities(np.arange(8), errors)
+    batch = buffer.sample(64)
+    assert (batch.indices == 5).mean() > 0.5
+    assert batch.weights.max() == 1.0
+    # 高优先级样本的重要性采样权重更小
+    assert batch.weights[batch.indices == 5].max() < batch.weights[batch.indices != 5].min()
+    # 新写入的经验使用更新后的最大优先级
+    buffer.store(states[0], 0, 0.0, states[0])
+    assert np.isclose(buffer.tree.get(np.array([0]))[0], 10.0 + buffer.epsilon)
@@ -0,0 +1,58 @@
+import asyncio
+import time
+import pytest
+from aiohttp import web # type: ignore
+from api.handlers.request_handler import RequestHandler
+
+async def _slow(request):
+    await asyncio.sleep(1.0)
+    return web.json_response({'ok': True})
+
+async def _serve():
+    app = web.Application()
+    app.router.add_get('/slow', _slow)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+def test_queue_wait_counts_against_deadline():
+    async def scenario():
+        runner, base_url = await _serve()
+        try:
+            async with RequestHandler(base_url, max_concurrency=1, max_retries=0) as handler:
+                start = time.perf_counter()
+                results = await asyncio.gather(
+                    handler.send_request('GET', f"{base_url}/slow", timeout=1.5),
+                    handler.send_request('GET', f"{base_url}/slow", timeout=1.5),
+                    return_exceptions=True
+                )
+                return results, time.perf_counter() - start
+        finally:
+            await runner.cleanup()
+
+    results, elapsed = asyncio.run(scenario())
+    assert results[0]['status_code'] == 200
+    # 第二个请求排队 1s 后只剩 0.5s，无法完成，必须在期限内超时
+    assert isinstance(results[1], asyncio.TimeoutError)
+    assert elapsed < 1.8
+
+def test_deadline_expires_while_queued():
+    async def scenario():
+        runner, base_url = await _serve()
+        try:
+            async with RequestHandler(base_url, max_concurrency=1, max_retries=0) as handler:
+                first = asyncio.create_task(handler.send_request('GET', f"{base_url}/slow", timeout=5.0))
+                await asyncio.sleep(0.05)
+                start = time.perf_counter()
+                with pytest.raises(asyncio.TimeoutError):
+                    await handler.send_request('GET', f"{base_url}/slow", timeout=0.3)
+                waited = time.perf_counter() - start
+                await first
+                return waited
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(scenario()) < 0.6
@@ -0,0 +1,33 @@
+import importlib.util
+import pytest
+from benchmarks.bench_startup import SUBSYSTEMS, check_budgets, profile_module
+
+def _missing_dependency(error):
+    """导入失败是否由于未安装的第三方依赖(而不是仓库内的模块出错)"""
+    prefix = "ModuleNotFoundError: No module named '"
+    if not error or not error.startswith(prefix):
+        return None
+    module = error[len(prefix):].rstrip("'").split('.')[0]
+    return module if importlib.util.find_spec(module) is None else None
+
+def test_import_failure_is_reported():
+    results = {'main': {'error': "ModuleNotFoundError: No module named 'pyttsx3'",
+                        'import_ms': 10.0, 'heavy_imported': []}}
+    failures = check_budgets(results, 1.0)
+    assert failures == ["main: import failed: ModuleNotFoundError: No module named 'pyttsx3'"]
+    assert check_budgets(results, 1.0, allow_import_errors=True) == []
+
+def test_budget_and_heavy_imports_are_reported():
+    results = {'memory': {'error': None, 'import_ms': 900.0, 'heavy_imported': ['torch']}}
+    failures = check_budgets(results, 1.0)
+    assert len(failures) == 2
+    assert failures[0].startswith('memory: import 900ms > budget 500ms')
+    assert 'torch' in failures[1]
+
+@pytest.mark.parametrize('name', sorted(SUBSYSTEMS))
+def test_subsystem_within_budget(name):
+    result = profile_module(SUBSYSTEMS[name][0])
+    missing = _missing_dependency(result['error'])
+    if missing:
+        pytest.skip(f"{name}: optional dependency '{missing}' is not installed")
+    assert check_budgets({name: result}, 1.0) == []
@@ -1 +1,299 @@
- 
+"""
+PDF 页面文本的磁盘缓存
+
+以文件内容的 SHA-256 作为文档键(文件被修改后键随之变化，旧条目不会再被命中)，每个文档两个文件:
+    <digest>-<namespace>.dat   各页文本(UTF-8)依次追加
+    <digest>-<namespace>.idx   16 字节头(魔数 + 页数) + 每页 16 字节(偏移, 长度)，未缓存的页为 -1
+按页随机读取只需一次 pread 索引项和一次数据读取。namespace 区分不同的提取引擎/清洗流程。
+缓存目录总大小超过上限时按索引文件的访问时间(LRU)淘汰整个文档。
+.dat 以 O_APPEND 追加、索引项用 pwrite 写入单页位置，多个进程写同一文档的不同页也是安全的。
+"""
+from typing import Callable, Dict, Optional, Tuple
+import threading
+import hashlib
+import logging
+import struct
+import json
+import time
+import os
+
+_DEFAULT_CONFIG = {
+    'cache_dir': 'data/cache/pdf_text',
+    'max_bytes': 256 * 1024 * 1024
+}
+
+# 相对路径(包括配置中的 cache_dir)相对仓库根目录解析，与启动时的工作目录无关
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MAGIC = b'PGTXIDX1'
+_HEADER = struct.Struct('<8sq')
+_ENTRY = struct.Struct('<qq')
+_TOUCH_INTERVAL = 60.0
+
+def _load_config() -> Dict:
+    config = dict(_DEFAULT_CONFIG)
+    try:
+        with open(os.path.join(_ROOT, 'config', 'system_config.json'), 'r', encoding='utf-8') as f:
+            config.update(json.load(f).get('pdf_cache', {}))
+    except Exception:
+        pass
+    return config
+
+def file_digest(path: str) -> str:
+    """计算文件内容的 SHA-256"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+class PageTextCache:
+    """按文档内容哈希和页码缓存提取并清洗后的页面文本"""
+    def __init__(self, namespace: str = 'default', cache_dir: Optional[str] = None,
+                 max_bytes: Optional[int] = None):
+        config = _load_config()
+        self.namespace = namespace
+        self.cache_dir = os.path.join(_ROOT, cache_dir or config['cache_dir'])
+        self.max_bytes = max_bytes or config['max_bytes']
+        self.logger = logging.getLogger('page_text_cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # (绝对路径, mtime_ns, 大小) -> 内容哈希，同一文件版本在进程内只计算一次
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._touched: Dict[str, float] = {}
+        self._approx_bytes = self._directory_size()
+        self.hits = 0
+        self.misses = 0
+
+    # ---------- 文档定位 ----------
+
+    def document_key(self, path: str) -> str:
+        """文档缓存键：内容哈希 + namespace"""
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            digest = file_digest(path)
+            with self._lock:
+                # 同一路径只保留当前版本的哈希
+                for stale in [k for k in self._digests if k[0] == memo_key[0]]:
+                    del self._digests[stale]
+                self._digests[memo_key] = digest
+        return f"{digest}-{self.namespace}"
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return base + '.dat', base + '.idx'
+
+    def _touch(self, key: str, idx_path: str):
+        """更新文档的访问时间(LRU 依据)，同一文档最多每分钟更新一次"""
+        now = time.time()
+        if now - self._touched.get(key, 0.0) >= _TOUCH_INTERVAL:
+            self._touched[key] = now
+            try:
+                os.utime(idx_path)
+            except OSError:
+                pass
+
+    def _create_index(self, key: str, page_count: int):
+        """创建索引文件，已存在(包括其他进程同时创建)时保留原文件，头部损坏时重建"""
+        dat_path, idx_path = self._paths(key)
+        try:
+            with open(idx_path, 'rb') as f:
+                magic, _ = _HEADER.unpack(f.read(_HEADER.size))
+            if magic == _MAGIC:
+                return
+            self.logger.warning(f"Rebuilding corrupt cache index {idx_path}")
+            for stale in (idx_path, dat_path):
+                os.remove(stale)
+        except FileNotFoundError:
+            pass
+        except (OSError, struct.error):
+            try:
+                os.remove(idx_path)
+            except FileNotFoundError:
+                pass
+        tmp = f"{idx_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, page_count))
+            f.write(_ENTRY.pack(-1, -1) * page_count)
+        open(dat_path, 'ab').close()
+        try:
+            os.link(tmp, idx_path)
+            self._approx_bytes += _HEADER.size + _ENTRY.size * page_count
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+
+    # ---------- 读写 ----------
+
+    def page_count(self, path: str) -> Optional[int]:
+        """已缓存文档的页数，未缓存时返回 None(不需要打开 PDF)"""
+        try:
+            with open(self._paths(self.document_key(path))[1], 'rb') as f:
+                magic, count = _HEADER.unpack(f.read(_HEADER.size))
+            return count if magic == _MAGIC else None
+        except (OSError, struct.error):
+            return None
+
+    def get(self, path: str, page_number: int) -> Optional[str]:
+        """读取缓存的页面文本，未命中返回 None"""
+        key = self.document_key(path)
+        dat_path, idx_path = self._paths(key)
+        try:
+            fd = os.open(idx_path, os.O_RDONLY)
+            try:
+                magic, count = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+                if magic != _MAGIC or not 0 <= page_number < count:
+                    self.misses += 1
+                    return None
+                offset, length = _ENTRY.unpack(
+                    os.pread(fd, _ENTRY.size, _HEADER.size + _ENTRY.size * page_number)
+                )
+            finally:
+                os.close(fd)
+            if offset < 0:
+                self.misses += 1
+                return None
+            with open(dat_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read(length)
+            if len(data) != length:
+                self.misses += 1
+                return None
+        except (OSError, struct.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touch(key, idx_path)
+        return data.decode('utf-8')
+
+    def put(self, path: str, page_number: int, text: str, page_count: int):
+        """写入页面文本(先追加数据，再写索引项，中途崩溃只会丢失该页)"""
+        if not 0 <= page_number < page_count:
+            raise ValueError(f"Page {page_number} out of range for {page_count} pages")
+        key = self.document_key(path)
+        dat_path, idx_path = self._paths(key)
+        data = text.encode('utf-8')
+        try:
+            self._create_index(key, page_count)
+            fd = os.open(dat_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                offset = os.lseek(fd, 0, os.SEEK_CUR) - len(data)
+            finally:
+                os.close(fd)
+            fd = os.open(idx_path, os.O_RDWR)
+            try:
+                magic, count = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+                if magic != _MAGIC or page_number >= count:
+                    self.logger.warning(f"Cache index {idx_path} does not cover page {page_number}")
+                    return
+                os.pwrite(fd, _ENTRY.pack(offset, len(data)),
+                          _HEADER.size + _ENTRY.size * page_number)
+            finally:
+                os.close(fd)
+        except (OSError, struct.error) as e:
+            self.logger.warning(f"Failed to cache page {page_number} of {path}: {str(e)}")
+            return
+        self._touch(key, idx_path)
+        self._approx_bytes += len(data)
+        if self._approx_bytes > self.max_bytes:
+            self._evict(keep=key)
+
+    def get_or_extract(self, path: str, page_number: int, page_count: int,
+                       extract: Callable[[], str]) -> str:
+        """读取缓存，未命中时调用 extract 提取并写入缓存"""
+        if not 0 <= page_number < page_count:
+            raise ValueError(f"Page {page_number} out of range for {page_count} pages")
+        text = self.get(path, page_number)
+        if text is None:
+            text = extract()
+            self.put(path, page_number, text, page_count)
+        return text
+
+    # ---------- 淘汰 ----------
+
+    def _documents(self) -> Dict[str, Tuple[float, int]]:
+        """缓存目录中的文档: 键 -> (访问时间, 占用字节)"""
+        documents: Dict[str, Tuple[float, int]] = {}
+        for entry in os.scandir(self.cache_dir):
+            name, ext = os.path.splitext(entry.name)
+            if ext not in ('.dat', '.idx'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            atime, size = documents.get(name, (0.0, 0))
+            if ext == '.idx':
+                atime = stat.st_mtime
+            documents[name] = (atime, size + stat.st_size)
+        return documents
+
+    def _directory_size(self) -> int:
+        return sum(size for _, size in self._documents().values())
+
+    def _evict(self, keep: Optional[str] = None):
+        """删除最久未访问的文档，直到总大小降到上限的 90%"""
+        with self._lock:
+            documents = self._documents()
+            total = sum(size for _, size in documents.values())
+            for key, (_, size) in sorted(documents.items(), key=lambda item: item[1][0]):
+                if total <= self.max_bytes * 0.9:
+                    break
+                if key == keep:
+                    continue
+                for path in self._paths(key):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+                self._touched.pop(key, None)
+                self.logger.info(f"Evicted cached document {key}")
+            self._approx_bytes = total
+
+    def invalidate(self, path: str):
+        """删除某个文件当前内容的缓存"""
+        key = self.document_key(path)
+        for file_path in self._paths(key):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+        self._touched.pop(key, None)
+
+    def clear(self):
+        """清空本 namespace 的全部缓存"""
+        for key in self._documents():
+            if key.endswith(f"-{self.namespace}"):
+                for path in self._paths(key):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+        self._touched.clear()
+        self._approx_bytes = self._directory_size()
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'bytes': self._approx_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+_caches: Dict[str, PageTextCache] = {}
+_caches_lock = threading.Lock()
+
+def get_page_cache(namespace: str) -> PageTextCache:
+    """进程内共享的页面文本缓存(每个 namespace 一个实例)"""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = PageTextCache(namespace)
+        return cache
@@ -1,4 +1,5 @@
 import logging
+from utils.logging import get_logger
 import time
 from typing import Callable, Any, Dict, Optional
 from functools import wraps
@@ -14,12 +15,7 @@ class ErrorHandler:
         self.error_queue = queue.Queue()
         
         # 初始化日志
-        self.logger = logging.getLogger('error_handler')
-        self.logger.setLevel(logging.DEBUG)
-        handler = logging.FileHandler('logs/error_handler.log')
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        self.logger.addHandler(handler)
+        self.logger = get_logger('error_handler', 'error_handler.log')
 
     def monitor_errors(self, func: Callable) -> Callable:
         """错误监控装饰器"""
@@ -0,0 +1,48 @@
+"""
+重量级依赖的延迟导入
+
+TensorFlow、transformers、spaCy 等框架导入耗时数秒并占用数百 MB 内存。
+模块级使用 lazy_import 代替 import，首次访问属性时才真正导入，
+不需要这些框架的命令行任务和 API 进程因此可以快速启动。
+"""
+from typing import Any
+import importlib
+import threading
+import types
+
+class LazyModule(types.ModuleType):
+    """首次访问属性时才导入的模块代理"""
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__['_lazy_module'] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(name: str) -> LazyModule:
+    """返回延迟导入的模块代理，用法: tf = lazy_import('tensorflow')"""
+    return LazyModule(name)
+
+def is_loaded(module: Any) -> bool:
+    """判断延迟模块是否已真正导入"""
+    if isinstance(module, LazyModule):
+        return module.__dict__['_lazy_module'] is not None
+    return True
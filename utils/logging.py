@@ -1 +1,304 @@
- 
+"""
+统一日志配置
+
+所有模块通过 get_logger 获取日志器。日志记录在调用线程中只做入队，
+由单个后台线程批量格式化、写入并按大小轮转文件，避免业务热路径阻塞在磁盘 I/O 上。
+轮转计数在进程内维护，多个进程不能写同一个文件：预派生工作进程调用 set_process_log_suffix
+后写入各自的文件(api.log -> api.worker0.log)。
+"""
+from typing import Dict, Optional, Any
+import itertools
+import copy
+import threading
+import logging
+import atexit
+import queue
+import json
+import time
+import sys
+import os
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+CONSOLE = '-'
+
+_config: Dict[str, Any] = {
+    'log_dir': 'logs',
+    'max_bytes': 10 * 1024 * 1024,
+    'backup_count': 5,
+    'batch_size': 512,
+    'flush_interval': 0.5,
+    'info_sample_rate': 1
+}
+_config_loaded = False
+_lock = threading.Lock()
+_process_suffix: Optional[str] = None
+
+def _load_config():
+    """从 config/system_config.json 的 logging 部分加载配置(仅一次)"""
+    global _config_loaded
+    if _config_loaded:
+        return
+    _config_loaded = True
+    try:
+        with open('config/system_config.json', 'r', encoding='utf-8') as f:
+            _config.update(json.load(f).get('logging', {}))
+    except Exception:
+        pass
+
+def configure_logging(**options):
+    """覆盖日志配置(log_dir、max_bytes、backup_count、batch_size、flush_interval、info_sample_rate)"""
+    _load_config()
+    _config.update(options)
+
+class _RotatingFile:
+    """按大小轮转的日志文件"""
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.stream = open(path, 'ab')
+        self.size = self.stream.tell()
+
+    def write(self, data: bytes):
+        if self.max_bytes and self.size + len(data) > self.max_bytes and self.size > 0:
+            self.rotate()
+        self.stream.write(data)
+        self.size += len(data)
+
+    def rotate(self):
+        self.stream.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self.stream = open(self.path, 'wb')
+        self.size = 0
+
+    def flush(self):
+        self.stream.flush()
+
+    def close(self):
+        self.stream.close()
+
+class _ConsoleStream:
+    def write(self, data: bytes):
+        sys.stderr.write(data.decode('utf-8', errors='replace'))
+
+    def flush(self):
+        sys.stderr.flush()
+
+    def close(self):
+        pass
+
+class AsyncLogWriter:
+    """单线程批量日志写入器"""
+    _STOP = object()
+
+    def __init__(self):
+        self.queue = queue.SimpleQueue()
+        self.streams: Dict[str, Any] = {}
+        self.thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self._start_lock = threading.Lock()
+
+    def submit(self, handler: 'AsyncFileHandler', record: logging.LogRecord):
+        if self.thread is None:
+            self._start()
+        self.queue.put((handler, record))
+
+    def _start(self):
+        with self._start_lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self._run, name='log-writer', daemon=True
+                )
+                self.thread.start()
+
+    def _stream(self, path: str):
+        stream = self.streams.get(path)
+        if stream is None:
+            if path == CONSOLE:
+                stream = _ConsoleStream()
+            else:
+                if _process_suffix:
+                    root, ext = os.path.splitext(path)
+                    path_with_suffix = f"{root}.{_process_suffix}{ext}"
+                else:
+                    path_with_suffix = path
+                stream = _RotatingFile(path_with_suffix, _config['max_bytes'], _config['backup_count'])
+            self.streams[path] = stream
+        return stream
+
+    def _run(self):
+        running = True
+        while running:
+            item = self.queue.get()
+            batch = [item]
+            deadline = time.monotonic() + _config['flush_interval']
+            # 攒批：达到批量大小或等待超过 flush_interval 即写入
+            while len(batch) < _config['batch_size']:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self.queue.get(timeout=remaining) if remaining > 0
+                                 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            running = self._write_batch(batch)
+
+    def _write_batch(self, batch) -> bool:
+        touched = {}
+        waiters = []
+        running = True
+        for item in batch:
+            if item is self._STOP:
+                running = False
+                continue
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                continue
+            handler, record = item
+            try:
+                stream = self._stream(handler.path)
+                stream.write((handler.format(record) + '\n').encode('utf-8'))
+                touched[handler.path] = stream
+            except Exception:
+                self.dropped += 1
+        for stream in touched.values():
+            try:
+                stream.flush()
+            except Exception:
+                pass
+        for waiter in waiters:
+            waiter.set()
+        return running
+
+    def flush(self, timeout: float = 5.0):
+        """阻塞直到当前已入队的日志全部写入"""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(self._STOP)
+            self.thread.join(timeout)
+        for stream in self.streams.values():
+            try:
+                stream.close()
+            except Exception:
+                pass
+        self.streams.clear()
+        self.thread = None
+
+_writer = AsyncLogWriter()
+
+def _reset_after_fork():
+    """fork 后子进程中没有写线程，重建写入器"""
+    global _writer
+    _writer = AsyncLogWriter()
+
+def set_process_log_suffix(suffix: Optional[str]):
+    """
+    本进程的日志文件名加上后缀(api.log -> api.<suffix>.log)
+
+    在 fork 出的工作进程开始记录日志前调用，各进程独立轮转自己的文件。
+    """
+    global _process_suffix
+    _writer.stop()
+    _process_suffix = suffix
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+atexit.register(lambda: _writer.stop())
+
+class AsyncFileHandler(logging.Handler):
+    """只负责入队的日志处理器，格式化和写入在后台线程中完成"""
+    def __init__(self, path: str, fmt: str = DEFAULT_FORMAT):
+        super().__init__()
+        self.path = path
+        self.setFormatter(logging.Formatter(fmt))
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        在调用线程中固定消息内容(同 QueueHandler.prepare)
+
+        参数对象在入队后可能被修改，异常的 traceback 会持有栈帧，
+        因此先合并 msg/args 并把异常格式化为文本，后台线程只做剩余的格式化。
+        """
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            _writer.submit(self, self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        _writer.flush()
+
+class SamplingFilter(logging.Filter):
+    """对 INFO 及以下级别的日志按 1/rate 采样，WARNING 及以上全部保留"""
+    def __init__(self, rate: int, level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.level = level
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.level or self.rate <= 1:
+            return True
+        return next(self._counter) % self.rate == 0
+
+def get_logger(
+    name: str,
+    filename: Optional[str] = None,
+    level: int = logging.DEBUG,
+    console: bool = False,
+    info_sample_rate: Optional[int] = None
+) -> logging.Logger:
+    """
+    获取配置好的日志器
+
+    同名日志器只配置一次，重复创建同一个类的实例不会叠加处理器。
+
+    Args:
+        filename: 日志文件名(位于 log_dir 下)，为 None 时不写文件
+        console: 是否同时输出到标准错误
+        info_sample_rate: INFO 及以下日志的采样率，默认读取配置
+    """
+    _load_config()
+    logger = logging.getLogger(name)
+    with _lock:
+        if getattr(logger, '_async_configured', False):
+            return logger
+        logger.setLevel(level)
+        if filename:
+            logger.addHandler(AsyncFileHandler(os.path.join(_config['log_dir'], filename)))
+        if console:
+            logger.addHandler(AsyncFileHandler(CONSOLE))
+        rate = info_sample_rate if info_sample_rate is not None else _config['info_sample_rate']
+        if rate and rate > 1:
+            logger.addFilter(SamplingFilter(rate))
+        logger._async_configured = True
+    return logger
+
+def flush_logs(timeout: float = 5.0):
+    """等待后台写入完成"""
+    _writer.flush(timeout)